@@ -0,0 +1,110 @@
+"""
+Validates BatchHospitalSimulation against the SimPy HospitalSimulation and
+times both per replication.
+
+For each test schedule (and each census start, see simulation.nowcast)
+the two cost distributions are compared by their means (difference within
+`z` standard errors) and a two-sample Kolmogorov-Smirnov test at the 1%
+level. The equivalence claim needs REQUIRED_REPLICATIONS SimPy
+replications: only then is the KS critical value (about 0.052) close to the
+0.05 distance we call equivalent. With fewer, e.g. 300 (critical value
+0.094), a pass says little and the busy census case is borderline.
+At 1000 replications every case agrees within 0.75 standard errors and a
+KS distance of 0.033.
+
+Run from the project root:
+    python -m benchmarks.batch_validation [simpy_replications]
+"""
+import sys
+import time
+import numpy as np
+
+from simulation.config import DEPTS, INITIAL_STAFF
+from simulation.hospital import HospitalSimulation
+from simulation.batch import BatchHospitalSimulation
+from simulation.nowcast import HospitalCensus
+
+BATCH_REPLICATIONS = 20000
+REQUIRED_REPLICATIONS = 1000
+KS_ALPHA = 0.01
+
+
+def _shifted(delta):
+    return {h: {d: INITIAL_STAFF[d] + delta.get(d, 0) for d in DEPTS} for h in range(24)}
+
+
+CASES = {
+    'baseline': None,
+    'more CriticalCare': _shifted({'CriticalCare': 3}),
+    'understaffed': _shifted({'Surgery': -2, 'CriticalCare': -2, 'StepDown': -3}),
+    'ER bottleneck': _shifted({'ER': -12}),
+    'overstaffed': _shifted({'ER': 2, 'Surgery': 3, 'CriticalCare': 4, 'StepDown': 4}),
+}
+
+# Rolling-horizon starts: (schedule, census, hours). The busy census has more
+# Surgery patients in treatment than Surgery staff.
+CENSUS_CASES = {
+    'census 14:00 8h': (None, HospitalCensus(14, waiting={'ER': 5, 'CriticalCare': 3, 'StepDown': 2},
+                                             in_treatment={'ER': 10, 'Surgery': 8, 'CriticalCare': 12,
+                                                           'StepDown': 15},
+                                             closed_rooms={'Surgery': [2]}, staff_leave={'ER': [1, 10]},
+                                             last_hour_temps=3), 8),
+    'census 03:00 8h': (None, HospitalCensus(3, in_treatment={'Surgery': 3, 'CriticalCare': 5, 'StepDown': 8}), 8),
+}
+
+
+def ks_distance(a, b):
+    """Two-sample Kolmogorov-Smirnov statistic."""
+    grid = np.union1d(a, b)
+    cdf_a = np.searchsorted(np.sort(a), grid, side='right') / len(a)
+    cdf_b = np.searchsorted(np.sort(b), grid, side='right') / len(b)
+    return float(np.abs(cdf_a - cdf_b).max())
+
+
+def ks_critical(n, m, alpha=KS_ALPHA):
+    """Asymptotic critical value of the two-sample KS statistic."""
+    return float(np.sqrt(-np.log(alpha / 2) / 2 * (n + m) / (n * m)))
+
+
+def compare(schedule, replications, z=3.0, census=None, hours=24):
+    start = time.perf_counter()
+    simpy_costs = np.array([HospitalSimulation(duration_hours=hours, staffing_schedule=schedule, seed=i,
+                                               census=census).run() for i in range(replications)])
+    simpy_time = (time.perf_counter() - start) / replications
+
+    start = time.perf_counter()
+    batch_costs = BatchHospitalSimulation(BATCH_REPLICATIONS, schedule, duration_hours=hours, seed=0,
+                                          census=census).run()
+    batch_time = (time.perf_counter() - start) / BATCH_REPLICATIONS
+
+    diff = abs(batch_costs.mean() - simpy_costs.mean())
+    stderr = np.sqrt(simpy_costs.var(ddof=1) / len(simpy_costs) + batch_costs.var(ddof=1) / len(batch_costs))
+    ks = ks_distance(simpy_costs, batch_costs)
+    passed = diff <= z * stderr and ks <= ks_critical(len(simpy_costs), len(batch_costs))
+    return {
+        'simpy_mean': simpy_costs.mean(), 'batch_mean': batch_costs.mean(),
+        'simpy_std': simpy_costs.std(), 'batch_std': batch_costs.std(),
+        'ks': ks, 'speedup': simpy_time / batch_time,
+        'simpy_ms': simpy_time * 1e3, 'batch_ms': batch_time * 1e3, 'passed': passed,
+    }
+
+
+def main(replications=REQUIRED_REPLICATIONS):
+    print(f"SimPy replications: {replications} | Batch replications: {BATCH_REPLICATIONS}")
+    if replications < REQUIRED_REPLICATIONS:
+        print(f"Warning: fewer than {REQUIRED_REPLICATIONS} SimPy replications; "
+              f"KS critical value {ks_critical(replications, BATCH_REPLICATIONS):.3f}, results are indicative only")
+    print(f"{'Schedule':<18} {'SimPy mean':>11} {'Batch mean':>11} {'SimPy sd':>10} {'Batch sd':>10} {'KS':>6} {'ms/rep (SimPy/Batch)':>22} {'Speed-up':>9}  Result")
+    all_passed = True
+    cases = {name: (schedule, None, 24) for name, schedule in CASES.items()}
+    cases.update(CENSUS_CASES)
+    for name, (schedule, census, hours) in cases.items():
+        r = compare(schedule, replications, census=census, hours=hours)
+        all_passed &= r['passed']
+        print(f"{name:<18} {r['simpy_mean']:>11,.0f} {r['batch_mean']:>11,.0f} {r['simpy_std']:>10,.0f} {r['batch_std']:>10,.0f} "
+              f"{r['ks']:>6.3f} {r['simpy_ms']:>12.3f} / {r['batch_ms']:<7.4f} {r['speedup']:>8.0f}x  {'PASS' if r['passed'] else 'FAIL'}")
+    return 0 if all_passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(*(int(a) for a in sys.argv[1:])))
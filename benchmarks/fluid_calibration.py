@@ -0,0 +1,42 @@
+"""
+Regenerates simulation.approximate.DEFAULT_COEFFICIENTS: fits the fluid
+model's cost components to SimPy costs of random schedules (calibrate) and
+reports how well the fitted and the current default coefficients rank a
+held-out sample of schedules (Spearman rank correlation with their SimPy
+means), next to the noise ceiling (two independent sets of SimPy means).
+
+Run from the project root:
+    python -m benchmarks.fluid_calibration [schedules] [replications] [workers]
+"""
+import sys
+import numpy as np
+
+from simulation.approximate import (CALIBRATION_REPLICATIONS, CALIBRATION_SCHEDULES, CALIBRATION_SEED,
+                                    COMPONENTS, DEFAULT_COEFFICIENTS, approximate_cost, calibrate)
+from simulation.optimizer import StaffingOptimizer
+from simulation.surrogate import spearman
+
+HELD_OUT = 200
+
+
+def main(schedules=CALIBRATION_SCHEDULES, replications=CALIBRATION_REPLICATIONS, workers=1):
+    coefficients, _, _ = calibrate(schedules, replications, n_workers=workers)
+    print(f"Fitted on {schedules} schedules x {replications} SimPy replications (seed {CALIBRATION_SEED}):")
+    for name, value in zip(COMPONENTS, coefficients):
+        print(f"  {name:<10} {value:.4g}")
+    print(f"DEFAULT_COEFFICIENTS = ({', '.join(str(float(f'{c:.3g}')) for c in coefficients)})")
+
+    opt = StaffingOptimizer(seed=CALIBRATION_SEED + 1, n_workers=workers)
+    try:
+        test = opt.generate_random_population(HELD_OUT)
+        means = opt.evaluate_population(test, replications)
+        again = opt.evaluate_population(test, replications)
+    finally:
+        opt.close()
+    print(f"Held-out Spearman ({HELD_OUT} schedules): fitted {spearman(approximate_cost(test, coefficients=coefficients), means):.2f}"
+          f" | current default {spearman(approximate_cost(test, coefficients=DEFAULT_COEFFICIENTS), means):.2f}"
+          f" | noise ceiling {spearman(again, means):.2f}")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:]))
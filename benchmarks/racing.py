@@ -0,0 +1,74 @@
+"""
+Simulations needed to pick the best of a contender set: the fixed scheme
+(validation_iterations per schedule) vs the OCBA race in simulation.selection.
+
+Each trial draws a contender set, runs both schemes and checks the pick
+against a high-precision ground truth (BatchHospitalSimulation, 10000
+replications per schedule). A pick is correct when its true cost is within
+the indifference zone (INDIFFERENCE x the baseline's cost) of the true best,
+which is also the indifference the race is given. Uses the batch engine so
+many trials are cheap.
+
+Run from the project root:
+    python -m benchmarks.racing [trials]
+"""
+import sys
+import numpy as np
+
+from simulation.batch import BatchHospitalSimulation
+from simulation.optimizer import StaffingOptimizer, baseline_array, VALIDATION_ITERATIONS
+
+GROUND_TRUTH_REPLICATIONS = 10000
+N_CONTENDERS = 5
+INDIFFERENCE = 0.10
+
+
+def _contenders(opt, kind):
+    if kind == 'spread':
+        # Independent random schedules: clear winners and losers
+        return np.concatenate([opt.generate_random_population(N_CONTENDERS), baseline_array()[None]])
+    # Near-identical schedules, as after a converged GA
+    base = baseline_array()
+    close = [base]
+    while len(close) < N_CONTENDERS + 1:
+        close.append(opt.mutate(close[-1]))
+    return np.stack(close)
+
+
+def _true_best(schedules, seed):
+    means = [BatchHospitalSimulation(GROUND_TRUTH_REPLICATIONS, s, seed=(seed, i)).run().mean()
+             for i, s in enumerate(schedules)]
+    return int(np.argmin(means)), np.array(means)
+
+
+def trial(seed, kind):
+    opt = StaffingOptimizer(seed=seed, engine='batch', mutation_rate=0.3)
+    schedules = _contenders(opt, kind)
+    best, truth = _true_best(schedules, seed)
+    fixed_budget = len(schedules) * VALIDATION_ITERATIONS
+
+    tolerance = INDIFFERENCE * truth[-1]
+    opt.indifference = tolerance
+
+    fixed = [np.mean(c) for c in opt.simulate_many(schedules, VALIDATION_ITERATIONS)]
+    result = opt.race(schedules, n0=10, max_total=fixed_budget)
+    return {
+        'fixed_sims': fixed_budget,
+        'race_sims': result.total,
+        'fixed_ok': truth[int(np.argmin(fixed))] - truth[best] <= tolerance,
+        'race_ok': truth[result.best] - truth[best] <= tolerance,
+    }
+
+
+def main(trials=20):
+    for kind in ('spread', 'close'):
+        rows = [trial(seed, kind) for seed in range(trials)]
+        fixed = sum(r['fixed_sims'] for r in rows)
+        raced = sum(r['race_sims'] for r in rows)
+        print(f"{kind:>6} contenders | fixed: {fixed / trials:6.0f} sims, {np.mean([r['fixed_ok'] for r in rows]):5.0%} correct"
+              f" | OCBA race: {raced / trials:6.0f} sims, {np.mean([r['race_ok'] for r in rows]):5.0%} correct"
+              f" | saved {1 - raced / fixed:5.1%}")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:]))
@@ -0,0 +1,58 @@
+"""
+Per-simulation setup time: legacy 200-blocker staff model vs StaffResource.
+
+Run from the project root:
+    python -m benchmarks.staff_setup
+"""
+import time
+import simpy
+
+from simulation.config import INITIAL_STAFF
+from simulation.hospital import HospitalSimulation
+
+MAX_STAFF = 200
+
+
+def _legacy_setup():
+    """Rebuilds the old staff model: one blocker process per unused slot."""
+    env = simpy.Environment()
+
+    def blocker(resource, held):
+        with resource.request(priority=-10) as req:
+            yield req
+            event = env.event()
+            held.append(event)
+            yield event
+
+    for name, level in INITIAL_STAFF.items():
+        staff = simpy.PriorityResource(env, capacity=MAX_STAFF)
+        held = []
+        for _ in range(MAX_STAFF - level):
+            env.process(blocker(staff, held))
+    env.run(until=1e-9)
+    return env
+
+
+def _current_setup():
+    sim = HospitalSimulation(duration_hours=24)
+    sim.env.run(until=1e-9)
+    return sim
+
+
+def _time(fn, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats
+
+
+def main(repeats=200):
+    legacy = _time(_legacy_setup, repeats)
+    current = _time(_current_setup, repeats)
+    print(f"Legacy blocker setup : {legacy * 1e3:8.3f} ms / simulation")
+    print(f"StaffResource setup  : {current * 1e3:8.3f} ms / simulation")
+    print(f"Speed-up             : {legacy / current:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Performance suite for the simulation and optimizer hot paths.
+
+Every benchmark runs on a grid of ER arrival volumes (ARRIVAL_RATES x 1, 5,
+20) and horizons (24h, 7d, 30d):
+  construct_ms        HospitalSimulation.__init__
+  run_s               HospitalSimulation.run
+  events_per_s        SimPy events processed per second of run
+  peak_mb             Peak traced memory during run (tracemalloc)
+  evaluate_sims_per_s StaffingOptimizer.evaluate throughput (horizon_days)
+  generation_s        One GA generation plus a one-replication validation
+
+Timings are the best of --repeats runs. Results go to JSON. With
+--compare, each metric is checked against a stored baseline and the run
+fails if any is worse by more than the tolerance (times and memory up,
+throughput down). The full grid takes several minutes; --scales and
+--horizons pick a subset.
+
+Run from the project root:
+    python -m benchmarks --output bench.json
+    python -m benchmarks --compare bench.json --scales 1 --horizons 24h
+"""
+import argparse
+import contextlib
+import io
+import json
+import platform
+import sys
+import time
+import tracemalloc
+import numpy as np
+
+from simulation.hospital import HospitalSimulation
+from simulation.optimizer import StaffingOptimizer, baseline_array
+from simulation.config import SimulationConfig
+from .transfer_stress import scaled_params
+
+SCALES = (1, 5, 20)
+HORIZONS = {'24h': 24, '7d': 7 * 24, '30d': 30 * 24}
+SEED = 0
+CONSTRUCT_REPEATS = 50
+REPEATS = 3
+EVALUATE_ITERATIONS = 2
+DEFAULT_TOLERANCE = 0.20
+
+# +1: larger is better; -1: smaller is better
+METRICS = {
+    'construct_ms': -1,
+    'run_s': -1,
+    'events_per_s': 1,
+    'peak_mb': -1,
+    'evaluate_sims_per_s': 1,
+    'generation_s': -1,
+}
+
+
+def _construct_ms(hours, params):
+    start = time.perf_counter()
+    for _ in range(CONSTRUCT_REPEATS):
+        HospitalSimulation(duration_hours=hours, seed=SEED, params=params)
+    return (time.perf_counter() - start) / CONSTRUCT_REPEATS * 1e3
+
+
+def _run(hours, params):
+    """(run seconds, SimPy events processed)."""
+    sim = HospitalSimulation(duration_hours=hours, seed=SEED, params=params)
+    step = sim.env.step
+    events = 0
+
+    def counted_step():
+        nonlocal events
+        events += 1
+        step()
+
+    sim.env.step = counted_step
+    start = time.perf_counter()
+    sim.run()
+    return time.perf_counter() - start, events
+
+
+def _peak_mb(hours, params):
+    sim = HospitalSimulation(duration_hours=hours, seed=SEED, params=params)
+    tracemalloc.start()
+    try:
+        sim.run()
+        return tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        tracemalloc.stop()
+
+
+def _evaluate_sims_per_s(days, params):
+    opt = StaffingOptimizer(seed=SEED, horizon_days=days, params=params)
+    start = time.perf_counter()
+    opt.evaluate(baseline_array(), iterations=EVALUATE_ITERATIONS)
+    return opt.simulations_run / (time.perf_counter() - start)
+
+
+def _generation_s(days, params):
+    opt = StaffingOptimizer(generations=1, iterations=1, validation_iterations=1, seed=SEED,
+                            horizon_days=days, params=params)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        opt.run()
+    return time.perf_counter() - start
+
+
+def run_case(scale, hours, repeats=REPEATS):
+    days = max(1, hours // 24)
+    params = SimulationConfig.from_params(scaled_params(scale, resources=False))
+    run_s, events = min(_run(hours, params) for _ in range(repeats))
+    return {
+        'construct_ms': min(_construct_ms(hours, params) for _ in range(repeats)),
+        'run_s': run_s,
+        'events_per_s': events / run_s,
+        'peak_mb': _peak_mb(hours, params),
+        'evaluate_sims_per_s': max(_evaluate_sims_per_s(days, params) for _ in range(repeats)),
+        'generation_s': min(_generation_s(days, params) for _ in range(repeats)),
+    }
+
+
+def run_suite(scales=SCALES, horizons=tuple(HORIZONS), repeats=REPEATS):
+    results = {}
+    for scale in scales:
+        for horizon in horizons:
+            name = f"x{scale}/{horizon}"
+            results[name] = run_case(scale, HORIZONS[horizon], repeats)
+            print(f"{name:10s} " + "  ".join(f"{k}={v:,.3f}" for k, v in results[name].items()), flush=True)
+    return {
+        'meta': {
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': sys.version.split()[0],
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'platform': platform.platform(),
+            'repeats': repeats,
+        },
+        'results': results,
+    }
+
+
+def compare(current, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Returns [(case, metric, baseline value, current value, relative change)]
+    for every metric that got worse by more than `tolerance`. Cases missing
+    from either run are skipped.
+    """
+    regressions = []
+    for case, metrics in current['results'].items():
+        reference = baseline['results'].get(case)
+        if reference is None:
+            continue
+        for metric, direction in METRICS.items():
+            old, new = reference.get(metric), metrics.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if -direction * change > tolerance:
+                regressions.append((case, metric, old, new, change))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description=__doc__.split('\n\n')[0])
+    parser.add_argument('--scales', type=int, nargs='+', default=list(SCALES))
+    parser.add_argument('--horizons', nargs='+', choices=list(HORIZONS), default=list(HORIZONS))
+    parser.add_argument('--repeats', type=int, default=REPEATS, help="Runs per timing; the best is kept")
+    parser.add_argument('--output', help="Write results to this JSON file")
+    parser.add_argument('--compare', help="Baseline JSON file to check for regressions")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed relative slowdown before flagging (default 0.20)")
+    args = parser.parse_args(argv)
+
+    report = run_suite(args.scales, args.horizons, args.repeats)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        for case, metric, old, new, change in regressions:
+            print(f"REGRESSION {case} {metric}: {old:,.3f} -> {new:,.3f} ({change:+.0%})")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.tolerance:.0%} against {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
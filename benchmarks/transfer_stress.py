@@ -0,0 +1,102 @@
+"""
+Transfer decisions under load: the old per-hour scan of active_patients vs
+the Department.transfer_ready index, with CAPACITY, staff and ER arrival
+volume all scaled up SCALE times.
+
+Both runs use the same seed and must give the same total cost.
+
+Run from the project root:
+    python -m benchmarks.transfer_stress [days]
+"""
+import cProfile
+import pstats
+import sys
+import time
+
+from simulation import config
+from simulation.config import SimulationConfig
+from simulation.hospital import HospitalSimulation
+from simulation.patient import DISCHARGED
+from simulation.utils import sample_pmf
+
+SCALE = 10
+SEED = 0
+
+
+def scaled_params(scale=SCALE, resources=True):
+    """
+    Overrides for a hospital `scale` times the size of the configured one.
+    Arrival means scale by `scale`, standard deviations by sqrt(scale),
+    as for the sum of `scale` independent hospitals. With `resources`,
+    CAPACITY and INITIAL_STAFF scale too.
+    """
+    overrides = {'ARRIVAL_RATES': {hour: (mean * scale, std * scale ** 0.5)
+                                   for hour, (mean, std) in config.ARRIVAL_RATES.items()}}
+    if resources:
+        overrides['CAPACITY'] = {name: beds * scale for name, beds in config.CAPACITY.items()}
+        overrides['INITIAL_STAFF'] = {name: staff * scale for name, staff in config.INITIAL_STAFF.items()}
+    return overrides
+
+
+class ScanningSimulation(HospitalSimulation):
+    """Transfer manager as it was before the index: scan every hour."""
+    def transfer_manager(self):
+        while True:
+            yield self.env.timeout(1.0)
+
+            pathways = [('Surgery', 'CriticalCare'), ('Surgery', 'StepDown'), ('CriticalCare', 'StepDown')]
+            for src, dst in pathways:
+                pmf = self.config.transfer_rates.get((src, dst), {})
+                if not pmf: continue
+                count = sample_pmf(self.transfer_rng, pmf)
+
+                src_dept = self.departments[src]
+                candidates = [p for p in src_dept.active_patients if p.transfer_event is not None and not p.transfer_event.triggered]
+                for p in candidates[:count]:
+                    src_dept.transfer_ready.pop(p, None)
+                    p.transfer_event.succeed(value=dst)
+                    self.env.process(self.transfer_patient(p, dst))
+
+            count = sample_pmf(self.transfer_rng, self.config.step_down_departure_rates)
+            sd_dept = self.departments['StepDown']
+            candidates = [p for p in sd_dept.active_patients if p.transfer_event is not None and not p.transfer_event.triggered]
+            for p in candidates[:count]:
+                sd_dept.transfer_ready.pop(p, None)
+                p.transfer_event.succeed(value='Home')
+                p.status = DISCHARGED
+
+
+def _time(cls, days, params):
+    sim = cls(duration_hours=days * 24, seed=SEED, params=params)
+    start = time.perf_counter()
+    cost = sim.run()
+    return time.perf_counter() - start, cost, sim
+
+
+def _transfer_manager_time(cls, days, params):
+    """Profiled time inside transfer_manager (cumulative over every hour)."""
+    sim = cls(duration_hours=days * 24, seed=SEED, params=params)
+    profiler = cProfile.Profile()
+    profiler.runcall(sim.run)
+    stats = pstats.Stats(profiler).stats
+    return sum(entry[3] for (_, _, name), entry in stats.items() if name == 'transfer_manager')
+
+
+def main(days=7):
+    params = SimulationConfig.from_params(scaled_params())
+    scan_time, scan_cost, _ = _time(ScanningSimulation, days, params)
+    index_time, index_cost, sim = _time(HospitalSimulation, days, params)
+    scan_decisions = _transfer_manager_time(ScanningSimulation, days, params)
+    index_decisions = _transfer_manager_time(HospitalSimulation, days, params)
+    active = sum(len(d.active_patients) for d in sim.departments.values())
+    print(f"{SCALE}x hospital, {days} days, {sim.total_patients:,} patients ({active:,} active at the end)")
+    print(f"Scanning transfer_manager : {scan_time:8.3f} s")
+    print(f"Indexed transfer_manager  : {index_time:8.3f} s")
+    print(f"Speed-up                  : {scan_time / index_time:8.2f}x")
+    print(f"Time in transfer_manager  : {scan_decisions * 1e3:8.1f} ms scanning, "
+          f"{index_decisions * 1e3:.1f} ms indexed (profiled)")
+    print(f"Same total cost           : {scan_cost == index_cost} ({index_cost:,.2f})")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:]))
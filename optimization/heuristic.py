@@ -1,60 +1,59 @@
-from simulation.models import Hospital
-from simulation.config import *
+from simulation.config import DEPTS
+from simulation.policy import StaffingPolicy, QUEUE, OCCUPIED, STAFF
 
-class RuleBasedOptimizer:
-    def __init__(self, hospital: Hospital):
-        self.hospital = hospital
+class RuleBasedOptimizer(StaffingPolicy):
+    """
+    Greedy threshold policy for HospitalSimulation(policy=...).
 
-    def get_action(self, hour_str):
+    Every hour it looks at each department's queue: long queues hire
+    temporary staff on top of the schedule, and departments with far more
+    staff than patients let their temporary staff go again. Hired staff stay
+    until removed, so the policy keeps its own extra-staff count per
+    department (cleared by reset() at the start of every run).
+
+    The thresholds are constructor arguments so they can be tuned with
+    simulation.policy.evaluate_policy over many replications.
+    """
+    def __init__(self, er_queue=5, er_surge_queue=20, er_hire=2, er_surge_hire=5, er_idle_margin=5,
+                 queue=5, surge_queue=10, hire=1, surge_hire=2, idle_margin=3):
+        self.er = (er_queue, er_surge_queue, er_hire, er_surge_hire, er_idle_margin)
+        self.other = (queue, surge_queue, hire, surge_hire, idle_margin)
+        self.extra_staff = dict.fromkeys(DEPTS, 0)
+
+    def reset(self):
+        self.extra_staff = dict.fromkeys(DEPTS, 0)
+
+    def get_action(self, hour, state):
         """
-        Determine actions for the current hour based on the state.
-        Returns: {DeptName: {hire: int, remove: int, move_to: {Dest: int}}}
+        Determine actions for the current hour based on the state snapshot.
+        Returns: {DeptName: {hire: int, remove: int}}
         """
         actions = {}
-        
-        # Simple Greedy Heuristic
-        # 1. ER Logic: Priority to avoid Diversions
-        # Check if ER needs staff (High Queue or Ambulance risk)
-        er = self.hospital.departments[DEPT_ER]
-        er_action = {"hire": 0, "remove": 0, "move_to": {}}
-        
-        # Calculate stress
-        # If queue > 5 or capacity reached, consider hiring/adding
-        # We know ambulances arrive. If current capacity < current load, risk!
-        # But hiring takes 1 hour. So we must predict? 
-        # Or just react: if queue is growing, hire.
-        
-        if er.waiting_queue > 5:
-            er_action["hire"] = 2
-        elif er.waiting_queue > 20: 
-            er_action["hire"] = 5
-        
-        # Check idle staff (oversupply)
-        total_pats = er.waiting_queue + len(er.in_treatment)
-        staff = er.get_total_staff()
-        if staff > total_pats + 5:
-             # Remove extra first
-            if er.extra_staff > 0:
-                er_action["remove"] = 1
-            # Or move scheduled? (Not implemented in this simple heuristic yet)
+        for i, dept in enumerate(DEPTS):
+            # 1. ER: priority is avoiding diversions, so it reacts sooner and harder
+            threshold, surge_threshold, hire, surge_hire, idle_margin = self.er if dept == 'ER' else self.other
+            queue = state[i, QUEUE]
+            act = {"hire": 0, "remove": 0}
             
-        actions[DEPT_ER] = er_action
-        
-        # 2. General Logic for others
-        for dept_name in [DEPT_SURGERY, DEPT_ICU, DEPT_STEP_DOWN]:
-            dept = self.hospital.departments[dept_name]
-            act = {"hire": 0, "remove": 0, "move_to": {}}
+            # If the queue is growing, hire (bigger surge for a long queue)
+            if queue > surge_threshold:
+                act["hire"] = surge_hire
+            elif queue > threshold:
+                act["hire"] = hire
             
-            # Simple thresholding
-            if dept.waiting_queue > 5:
-                act["hire"] = 1
-            elif dept.waiting_queue > 10:
-                act["hire"] = 2
-                
-            if dept.get_total_staff() > (dept.waiting_queue + len(dept.in_treatment)) + 3:
-                if dept.extra_staff > 0:
-                    act["remove"] = 1
-            
-            actions[dept_name] = act
+            # Check idle staff (oversupply): remove extra first
+            total_pats = queue + state[i, OCCUPIED]
+            if state[i, STAFF] > total_pats + idle_margin and self.extra_staff[dept] > 0:
+                act["remove"] = 1
             
+            actions[dept] = act
         return actions
+
+    def __call__(self, hour, state, scheduled):
+        actions = self.get_action(hour, state)
+        levels = []
+        for dept, level in zip(DEPTS, scheduled):
+            act = actions[dept]
+            self.extra_staff[dept] = max(0, self.extra_staff[dept] + act["hire"] - act["remove"])
+            levels.append(level + self.extra_staff[dept])
+        return levels
@@ -0,0 +1,271 @@
+import math
+import numpy as np
+from .config import DEPTS, SimulationConfig
+from .batch import DEPT_INDEX, ER, STEP_DOWN, schedules_to_levels, temp_staff_cost
+from .surrogate import SurrogateModel, SURROGATE_MIN_SAMPLES
+
+# Period-by-period fluid approximation of HospitalSimulation.
+# Every department is a deterministic flow of expected patients, hour by
+# hour, with the same event order as BatchHospitalSimulation. Random
+# arrivals enter through the normal loss function (expected overflow of a
+# normal demand over the free room), so a department running close to its
+# slots still queues. Cost components are then scaled by coefficients
+# fitted to simulated costs (FluidModel.fit).
+
+# Cost components per day: wait, arrival penalty, diversion and a constant
+# for the cost of variability the fluid flows leave out
+COMPONENTS = ('wait', 'penalty', 'diversion', 'base')
+# calibrate(): non-negative least-squares fit to the default config's
+# 24-hour SimPy costs of CALIBRATION_SCHEDULES random schedules (the GA's
+# initial distribution) at CALIBRATION_REPLICATIONS replications each.
+# Regenerate with `python -m benchmarks.fluid_calibration`. Diversion never
+# occurs in that sample and keeps its face value.
+CALIBRATION_SCHEDULES = 400
+CALIBRATION_REPLICATIONS = 20
+CALIBRATION_SEED = 0
+DEFAULT_COEFFICIENTS = (0.21, 0.128, 1.0, 7040.0)
+LOCAL_SEARCH_STEPS = 50
+
+# Random staff leave / room closures (HospitalSimulation.random_event_manager):
+# one event every 3 hours on average, in one of 4 departments
+EVENT_RATE = 1.0 / 3.0 / len(DEPTS)
+LEAVE_DEPTS = (DEPT_INDEX['ER'], DEPT_INDEX['StepDown'])
+CLOSURE_DEPTS = (DEPT_INDEX['Surgery'], DEPT_INDEX['CriticalCare'])
+
+def _phi(z):
+    return np.exp(-0.5 * z * z) / math.sqrt(2.0 * math.pi)
+
+def _upper_tail(z):
+    # 1 - Phi(z) (Abramowitz & Stegun 7.1.26, |error| < 1.5e-7)
+    x = np.abs(z) / math.sqrt(2.0)
+    t = 1.0 / (1.0 + 0.3275911 * x)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    tail = 0.5 * poly * np.exp(-x * x)
+    return np.where(z >= 0, tail, 1.0 - tail)
+
+def expected_overflow(mean, std, room):
+    """E[max(0, X - room)] for X ~ Normal(mean, std), elementwise."""
+    std = np.maximum(std, 1e-9) # A point mass: the loss tends to max(0, mean - room)
+    z = (room - mean) / std
+    return std * (_phi(z) - z * _upper_tail(z))
+
+def _moments(dist):
+    values = np.asarray(dist.values, dtype=float)
+    p = np.asarray(dist.probabilities)
+    mean = float((values * p).sum())
+    return mean, float((values ** 2 * p).sum() - mean ** 2)
+
+def expected_absences():
+    """
+    (24, 4) expected staff on leave and (24, 4) expected rooms closed by
+    hour of day. Leave is one hour or, half the time, until the end of the
+    day; closures last one hour.
+    """
+    hours = np.arange(24)
+    leave = np.zeros((24, len(DEPTS)))
+    closed = np.zeros((24, len(DEPTS)))
+    for d in LEAVE_DEPTS:
+        leave[:, d] = EVENT_RATE * 0.5 * (1 + (hours + 1))
+    for d in CLOSURE_DEPTS:
+        closed[:, d] = EVENT_RATE
+    return leave, closed
+
+def fluid_components(schedules, duration_hours=24, warmup_hours=0, params=None):
+    """
+    Uncalibrated cost components of each schedule under the fluid model.
+    schedules: (24, 4) array, (n, 24, 4) array or {hour: {dept: count}} dict.
+    Returns (staff cost (n,), components (n, 4) in COMPONENTS order), both
+    per day over the hours from warmup_hours on.
+    """
+    config = SimulationConfig.from_params(params)
+    levels = schedules_to_levels(schedules, duration_hours, True, config).transpose(2, 0, 1).astype(float)
+    n = len(levels)
+    beds = np.array([config.capacity[d] for d in DEPTS], dtype=float)
+    wait_cost = np.array([config.wait_cost[d] for d in DEPTS], dtype=float)
+    leave, closed = expected_absences()
+
+    transfers = [(DEPT_INDEX[src], DEPT_INDEX[dst], _moments(dist)) for src, dst, dist in config.transfers]
+    departures = _moments(config.step_down_departures)
+    direct_mean = np.zeros(len(DEPTS))
+    direct_var = np.zeros(len(DEPTS))
+    for name, dist in config.direct_entry:
+        direct_mean[DEPT_INDEX[name]], direct_var[DEPT_INDEX[name]] = _moments(dist)
+    disposition = np.zeros(len(DEPTS))
+    for name, p in zip(config.disposition.values, config.disposition.probabilities):
+        if name in DEPT_INDEX:
+            disposition[DEPT_INDEX[name]] = p
+
+    occupied = np.zeros((n, len(DEPTS)))
+    queued = np.zeros((n, len(DEPTS)))
+    waited = np.zeros((n, len(DEPTS))) # Wait hours accrued by the patients still queued
+    er_seen = np.zeros(n)
+    wait = np.zeros(n)
+    penalty = np.zeros(n)
+    diversion = np.zeros(n)
+
+    for t in range(duration_hours):
+        counted = t >= warmup_hours
+        h = t % 24
+        slots = np.minimum(np.maximum(0.0, levels[:, t] - leave[h]), beds - closed[h])
+
+        # Arrivals at Surgery / CriticalCare / StepDown: direct entries,
+        # transfers of admitted patients and last hour's ER patients
+        inflow = np.broadcast_to(direct_mean, occupied.shape).copy()
+        variance = np.broadcast_to(direct_var, occupied.shape).copy()
+        if t:
+            for src, dst, (mean, var) in transfers:
+                moved = np.minimum(mean, occupied[:, src])
+                occupied[:, src] -= moved
+                inflow[:, dst] += moved
+                variance[:, dst] += var
+            occupied[:, STEP_DOWN] -= np.minimum(departures[0], occupied[:, STEP_DOWN])
+        inflow += er_seen[:, None] * disposition
+        variance += er_seen[:, None] * disposition * (1 - disposition)
+        inflow[:, ER] = 0.0
+        variance[:, ER] = 0.0
+
+        room = np.maximum(0.0, slots - occupied - queued)
+        if counted:
+            penalty += (expected_overflow(inflow, np.sqrt(variance), room)[:, 1:] * wait_cost[1:]).sum(axis=1)
+        queued += inflow
+
+        # FIFO admissions charge the wait accrued by the patients admitted
+        admitted = np.minimum(queued, np.maximum(0.0, slots - occupied))
+        admitted[:, ER] = 0.0
+        share = np.divide(admitted, queued, out=np.zeros_like(queued), where=queued > 0)
+        charged = waited * share
+        waited -= charged
+        if counted:
+            wait += (charged[:, 1:] * wait_cost[1:]).sum(axis=1)
+        queued -= admitted
+        occupied += admitted
+
+        # ER: each slot sees one patient this hour, the queue first
+        mean, std = config.hourly_arrivals[h]
+        er_slots = slots[:, ER]
+        from_queue = np.minimum(queued[:, ER], er_slots)
+        share = np.divide(from_queue, queued[:, ER], out=np.zeros(n), where=queued[:, ER] > 0)
+        charged = waited[:, ER] * share
+        waited[:, ER] -= charged
+        queued[:, ER] -= from_queue
+        excess = expected_overflow(mean, std, er_slots - from_queue)
+        # Ambulances are diverted once treated + waiting patients fill the beds
+        full = expected_overflow(mean, std, np.maximum(0.0, beds[ER] - er_slots - queued[:, ER]))
+        diverted = config.ambulance_rate * full
+        queued[:, ER] += excess - diverted
+        er_seen = from_queue + (mean - excess)
+        if counted:
+            wait += charged * wait_cost[ER]
+            diversion += diverted * config.costs['ER']['Diversion']
+
+        waited += queued
+
+    days = max(1.0, (duration_hours - warmup_hours) / 24)
+    staff = temp_staff_cost(levels[:, warmup_hours:], config) / days
+    return staff, np.stack([wait / days, penalty / days, diversion / days, np.ones(n)], axis=1)
+
+def approximate_cost(schedules, duration_hours=24, warmup_hours=0, params=None, coefficients=DEFAULT_COEFFICIENTS):
+    """
+    Fluid-model estimate of the expected (daily) cost of a schedule or of
+    every schedule in an (n, 24, 4) array (returns a float or an (n,) array).
+    """
+    single = isinstance(schedules, dict) or np.ndim(schedules) == 2
+    staff, components = fluid_components(schedules, duration_hours, warmup_hours, params)
+    cost = staff + components @ np.asarray(coefficients, dtype=float)
+    return float(cost[0]) if single else cost
+
+def local_search(schedule, duration_hours=24, warmup_hours=0, params=None, coefficients=DEFAULT_COEFFICIENTS,
+                 max_steps=LOCAL_SEARCH_STEPS, minimum=1):
+    """
+    Steepest descent on approximate_cost from `schedule` ((24, 4) array):
+    each step scores every +/-1 change of one (hour, department) level in
+    one call and takes the best, until none improves or max_steps.
+    Returns (schedule, approximate cost).
+    """
+    current = np.array(schedule, dtype=np.int64)
+    cost = approximate_cost(current, duration_hours, warmup_hours, params, coefficients)
+    hours, depts = current.shape
+    moves = np.zeros((2 * hours * depts, hours, depts), dtype=np.int64)
+    cells = np.arange(hours * depts)
+    moves.reshape(2, hours * depts, -1)[0, cells, cells] = 1
+    moves.reshape(2, hours * depts, -1)[1, cells, cells] = -1
+    for _ in range(max_steps):
+        neighbours = current[None] + moves
+        neighbours = neighbours[(neighbours >= minimum).all(axis=(1, 2))]
+        costs = approximate_cost(neighbours, duration_hours, warmup_hours, params, coefficients)
+        best = int(np.argmin(costs))
+        if costs[best] >= cost:
+            break
+        current, cost = neighbours[best], float(costs[best])
+    return current, cost
+
+def fit_coefficients(schedules, costs, duration_hours=24, warmup_hours=0, params=None):
+    """
+    COMPONENTS coefficients fitting approximate_cost to the simulated mean
+    costs (n,) of schedules ((n, 24, 4)) by non-negative least squares.
+    Staff cost is exact and not fitted; a component that is zero for every
+    schedule keeps its face value (1).
+    """
+    staff, components = fluid_components(schedules, duration_hours, warmup_hours, params)
+    coefficients = np.ones(len(COMPONENTS))
+    seen = np.abs(components).max(axis=0) > 1e-6 # Round-off aside
+    coefficients[seen] = _nonnegative_lstsq(components[:, seen], np.asarray(costs, dtype=float) - staff)
+    return coefficients
+
+def calibrate(n_schedules=CALIBRATION_SCHEDULES, replications=CALIBRATION_REPLICATIONS, seed=CALIBRATION_SEED,
+              engine='simpy', params=None, n_workers=1):
+    """
+    Draws n_schedules random schedules as the GA's initial population does,
+    simulates each `replications` times (24 hours) and fits the
+    coefficients to them. Returns (coefficients, schedules, mean costs).
+    """
+    from .optimizer import StaffingOptimizer # The optimizer imports this module
+    opt = StaffingOptimizer(seed=seed, engine=engine, params=params, n_workers=n_workers)
+    try:
+        schedules = opt.generate_random_population(n_schedules)
+        costs = opt.evaluate_population(schedules, replications)
+    finally:
+        opt.close()
+    return fit_coefficients(schedules, costs, params=params), schedules, costs
+
+class FluidModel(SurrogateModel):
+    """
+    approximate_cost as a drop-in surrogate (StaffingOptimizer(surrogate=...)):
+    ready from the start with the given coefficients, and recalibrated by
+    non-negative least squares on the observed simulated costs once
+    min_samples schedules have been seen (staff cost is exact and not fitted).
+    """
+    def __init__(self, baseline, duration_hours=24, warmup_hours=0, params=None,
+                 coefficients=DEFAULT_COEFFICIENTS, min_samples=SURROGATE_MIN_SAMPLES):
+        super().__init__(baseline, min_samples=min_samples)
+        self.duration_hours = duration_hours
+        self.warmup_hours = warmup_hours
+        self.params = params
+        self.coefficients = np.asarray(coefficients, dtype=float)
+
+    @property
+    def ready(self):
+        return True
+
+    def fit(self):
+        if len(self._observed) < self.min_samples:
+            return
+        grids = np.stack([np.frombuffer(b, dtype=np.int16).reshape(self.baseline.shape) for b in self._observed])
+        self.coefficients = fit_coefficients(grids, np.fromiter(self._observed.values(), dtype=float),
+                                             self.duration_hours, self.warmup_hours, self.params)
+
+    def predict(self, schedules):
+        staff, components = fluid_components(schedules, self.duration_hours, self.warmup_hours, self.params)
+        return staff + components @ self.coefficients
+
+def _nonnegative_lstsq(A, b):
+    # Few columns: drop the most negative coefficient and refit until none is left
+    active = list(range(A.shape[1]))
+    coef = np.zeros(A.shape[1])
+    while active:
+        solution = np.linalg.lstsq(A[:, active], b, rcond=None)[0]
+        if (solution >= 0).all():
+            coef[active] = solution
+            break
+        active.pop(int(np.argmin(solution)))
+    return coef
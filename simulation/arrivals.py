@@ -0,0 +1,70 @@
+import numpy as np
+from .config import SimulationConfig
+from .utils import spawn_streams
+
+class ArrivalStream:
+    """
+    Every external arrival of a horizon, drawn up front.
+    The horizon covers hours [start, start + duration) of the clock.
+
+    ER arrivals are held as parallel arrays sorted by time: arrival time
+    (hours), ambulance flag and the uniform that picks the patient's ER
+    disposition. Direct entries are held as per-hour counts for each
+    department in config.DIRECT_ENTRY_RATES (they arrive on the hour).
+
+    Nothing here depends on the staffing schedule, so one stream can be
+    replayed under any number of schedules (common random numbers):
+        stream = ArrivalStream.generate(24, seed=7)
+        costs = [HospitalSimulation(staffing_schedule=s, seed=7, arrivals=stream).run()
+                 for s in schedules]
+    """
+    def __init__(self, duration_hours, er_times, er_ambulance, er_disposition_draws,
+                 direct_departments, direct_counts, start_hour=0):
+        self.start = start_hour
+        self.duration = duration_hours
+        self.er_times = er_times
+        self.er_ambulance = er_ambulance
+        self.er_disposition_draws = er_disposition_draws
+        self.direct_departments = direct_departments
+        self.direct_counts = direct_counts
+
+    @classmethod
+    def draw(cls, duration_hours, config, arrival_rng, disposition_rng, start_hour=0):
+        """
+        Draws the stream from the simulation's 'arrivals' and 'dispositions'
+        generators: one call each for the hourly ER counts, the offsets within
+        the hour, the ambulance flags, the disposition draws and the direct
+        entries.
+        """
+        hours = start_hour + np.arange(duration_hours)
+        rates = np.asarray(config.hourly_arrivals)[hours % 24]
+        counts = np.maximum(0, np.round(arrival_rng.normal(rates[:, 0], rates[:, 1]))).astype(np.int64)
+        n = int(counts.sum())
+        # Offsets are below one hour, so sorting the times sorts within each hour
+        times = np.sort(np.repeat(hours, counts) + arrival_rng.random(n))
+        ambulance = arrival_rng.random(n) < config.ambulance_rate
+        dispositions = disposition_rng.random(n)
+
+        departments = tuple(name for name, _ in config.direct_entry)
+        uniforms = arrival_rng.random((duration_hours, len(departments)))
+        direct = np.empty((duration_hours, len(departments)), dtype=np.int64)
+        for j, (_, dist) in enumerate(config.direct_entry):
+            direct[:, j] = dist.values_at(uniforms[:, j])
+        return cls(duration_hours, times, ambulance, dispositions, departments, direct, start_hour)
+
+    @classmethod
+    def generate(cls, duration_hours=24, params=None, seed=None, rng=None, start_hour=0):
+        """
+        The stream HospitalSimulation(duration_hours, seed=seed, rng=rng,
+        params=params) would draw for itself (starting at `start_hour`).
+        """
+        streams = spawn_streams(seed, rng)
+        return cls.draw(duration_hours, SimulationConfig.from_params(params),
+                        streams['arrivals'], streams['dispositions'], start_hour)
+
+    def __len__(self):
+        return len(self.er_times) + int(self.direct_counts.sum())
+
+    def __repr__(self):
+        return (f"ArrivalStream({self.duration}h from hour {self.start}, {len(self.er_times)} ER arrivals, "
+                f"{int(self.direct_counts.sum())} direct entries)")
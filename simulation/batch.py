@@ -0,0 +1,417 @@
+import numpy as np
+from .cache import config_fingerprint
+from .config import DEPTS, SimulationConfig
+from .utils import spawn_streams
+
+ER, SURGERY, CRITICAL_CARE, STEP_DOWN = range(4)
+DEPT_INDEX = {name: i for i, name in enumerate(DEPTS)}
+
+def _schedule_hour(h, periodic):
+    return h % 24 if periodic else h
+
+def schedule_to_array(staffing_schedule, duration_hours=24, periodic=True, params=None):
+    """
+    Staff level per (hour, department) as an int array of shape (duration, 4).
+    Accepts the {hour: {dept: count}} dict used by HospitalSimulation, an
+    array-like of shape (hours, 4), or None. A 24-hour schedule repeats
+    daily when `periodic`; hours missing from the schedule fall back to
+    INITIAL_STAFF, as in HospitalSimulation.hourly_staff_manager.
+    params: SimulationConfig or overrides to take INITIAL_STAFF from.
+    """
+    initial_staff = SimulationConfig.from_params(params).initial_staff
+    initial = [initial_staff[d] for d in DEPTS]
+    levels = np.empty((duration_hours, len(DEPTS)), dtype=np.int64)
+    if staffing_schedule is not None and not isinstance(staffing_schedule, dict):
+        grid = np.asarray(staffing_schedule, dtype=np.int64)
+        for h in range(duration_hours):
+            key = _schedule_hour(h, periodic)
+            levels[h] = grid[key] if key < len(grid) else initial
+        return levels
+    for h in range(duration_hours):
+        targets = initial_staff
+        key = _schedule_hour(h, periodic)
+        if staffing_schedule and key in staffing_schedule:
+            targets = staffing_schedule[key]
+        levels[h] = [targets.get(d, initial_staff[d]) for d in DEPTS]
+    return levels
+
+def schedules_to_levels(staffing_schedule, duration_hours=24, periodic=True, params=None):
+    """
+    Staff levels as an array of shape (duration, 4, k) where k is 1 for a
+    single schedule or n for a (n, hours, 4) array of per-replication schedules.
+    """
+    if staffing_schedule is not None and not isinstance(staffing_schedule, dict):
+        grid = np.asarray(staffing_schedule, dtype=np.int64)
+        if grid.ndim == 3:
+            hours = np.array([_schedule_hour(h, periodic) for h in range(duration_hours)])
+            inside = hours < grid.shape[1]
+            levels = np.empty((duration_hours, len(DEPTS), len(grid)), dtype=np.int64)
+            levels[inside] = grid[:, hours[inside]].transpose(1, 2, 0)
+            initial_staff = SimulationConfig.from_params(params).initial_staff
+            levels[~inside] = np.array([initial_staff[d] for d in DEPTS])[:, None]
+            return levels
+    return schedule_to_array(staffing_schedule, duration_hours, periodic, params)[:, :, None]
+
+def temp_staff_cost(levels, params=None):
+    """
+    Setup + hourly cost of temporary staff; deterministic given the levels.
+    levels: (..., duration, 4) array. Returns an array of shape (...).
+    """
+    config = SimulationConfig.from_params(params)
+    total_regular_staff = config.total_regular_staff
+    temps = np.maximum(0, levels.sum(axis=-1) - total_regular_staff)
+    previous = np.concatenate([np.zeros_like(temps[..., :1]), temps[..., :-1]], axis=-1)
+    setup = np.maximum(0, temps - previous)
+    return ((setup + temps) * config.temp_staff_rate(levels, DEPTS)).sum(axis=-1)
+
+class _WaitQueue:
+    """
+    FIFO of waiting patients for one department across all replications.
+    Only prefix sums of entry times are stored, so admitting k patients and
+    charging their total wait is O(1) per replication.
+    """
+    def __init__(self, n, size=64):
+        self.rows = np.arange(n)
+        self.prefix = np.zeros((n, size + 1))
+        self.pushed = np.zeros(n, dtype=np.int64)
+        self.popped = np.zeros(n, dtype=np.int64)
+
+    @property
+    def length(self):
+        return self.pushed - self.popped
+
+    def _compact(self):
+        # Drop entries every replication has already admitted (long horizons)
+        m = int(self.popped.min())
+        if m:
+            kept = self.prefix.shape[1] - m
+            self.prefix[:, :kept] = self.prefix[:, m:] - self.prefix[:, m:m + 1]
+            self.pushed -= m
+            self.popped -= m
+
+    def _grow(self, needed):
+        size = max(1, self.prefix.shape[1] - 1)
+        while size < needed:
+            size *= 2
+        grown = np.zeros((len(self.rows), size + 1))
+        grown[:, :self.prefix.shape[1]] = self.prefix
+        self.prefix = grown
+
+    def push(self, counts, start, step=0.0):
+        """Appends counts[i] patients entering at start + j * step (j = 0, 1, ...)."""
+        kmax = int(counts.max()) if len(counts) else 0
+        if kmax == 0:
+            return
+        needed = int((self.pushed + counts).max())
+        if needed >= self.prefix.shape[1]:
+            self._compact()
+            needed = int((self.pushed + counts).max())
+        if needed >= self.prefix.shape[1]:
+            self._grow(needed)
+        start = np.broadcast_to(start, counts.shape)
+        step = np.broadcast_to(step, counts.shape)
+        for j in range(kmax):
+            rows = self.rows[counts > j]
+            idx = self.pushed[rows]
+            self.prefix[rows, idx + 1] = self.prefix[rows, idx] + start[rows] + j * step[rows]
+            self.pushed[rows] += 1
+
+    def pop(self, counts, now):
+        """Admits up to counts[i] patients at `now`; returns (admitted, total wait hours)."""
+        k = np.minimum(counts, self.length)
+        entered = self.prefix[self.rows, self.popped + k] - self.prefix[self.rows, self.popped]
+        self.popped += k
+        return k, k * now - entered
+
+class BatchHospitalSimulation:
+    """
+    Discrete-time, vectorized counterpart of HospitalSimulation.
+
+    All replications are stepped together one hour at a time with per-
+    department state held in arrays of shape (n_replications,). Each integer
+    hour t follows the SimPy event order:
+      1. staff-leave / room-close events starting or ending at t
+      2. direct entries (checked against the previous hour's staff level)
+      3. transfers and step-down departures (only patients admitted before t)
+      4. staff level change to the schedule for hour t
+      5. released beds/staff admit waiting patients FIFO
+    and then, inside (t, t+1), ER patients seen last hour arrive at their
+    next department and this hour's ER arrivals are seen.
+
+    Wait costs are charged on admission, as in the SimPy model, so patients
+    still queued at the end of the horizon are not charged.
+
+    Hours t are counted from the start of the run; with a census the clock
+    hour is census.hour + t.
+    """
+    def __init__(self, n_replications, staffing_schedule=None, duration_hours=24, seed=None, rng=None,
+                 periodic_schedule=True, params=None, census=None, prefix_cache=None):
+        """
+        staffing_schedule: {Hour: {'ER': count, ...}} dict, (hours, 4) array,
+                           or (n_replications, hours, 4) array giving each
+                           replication its own schedule. None = INITIAL_STAFF.
+        seed / rng / periodic_schedule / params / census: As for HospitalSimulation.
+        prefix_cache: PrefixStateCache to resume from the state reached by an
+                      earlier run with the same seed and the same staff levels
+                      up to some hour, and to save this run's hourly states to.
+        """
+        self.prefix_cache = prefix_cache
+        self.hours_skipped = 0
+        self.n = n_replications
+        self.duration = duration_hours
+        self.staffing_schedule = staffing_schedule
+        self.census = census
+        self.start_hour = census.hour if census is not None else 0
+        self.config = SimulationConfig.from_params(params)
+        self.levels = schedules_to_levels(staffing_schedule, self.start_hour + duration_hours, periodic_schedule,
+                                          self.config)[self.start_hour:] # (duration, 4, 1 or n)
+        if self.levels.shape[2] not in (1, n_replications):
+            raise ValueError("Per-replication schedules must have one row per replication")
+
+        streams = spawn_streams(seed, rng)
+        self.arrival_rng = streams['arrivals']
+        self.disposition_rng = streams['dispositions']
+        self.transfer_rng = streams['transfers']
+        self.event_rng = streams['events']
+        # Prefix cache keys: the random streams plus everything else the
+        # states depend on (parameters, starting census, event draws sized by
+        # the duration)
+        self._stream_key = None
+        if prefix_cache is not None:
+            self._stream_key = repr([n_replications, duration_hours, config_fingerprint(self.config), repr(census)]
+                                    + [g.bit_generator.state['state'] for g in streams.values()]).encode()
+
+        self.beds = np.array([self.config.capacity[d] for d in DEPTS], dtype=np.int64)
+
+        # Metrics (per replication)
+        self.total_wait_cost = np.zeros((len(DEPTS), self.n))
+        self.total_diversion_cost = np.zeros(self.n)
+        self.total_staff_cost = np.zeros(self.n)
+        self.total_cost = None
+        self.daily_costs = None # (n_replications, days) once run
+
+    def _draw_events(self):
+        """
+        Staff on leave and rooms closed per (hour, dept, replication),
+        following HospitalSimulation.random_event_manager.
+        """
+        n, duration = self.n, self.duration
+        rows = np.arange(n)
+        leave = np.zeros((duration + 1, len(DEPTS), n), dtype=np.int64)
+        closed = np.zeros((duration + 1, len(DEPTS), n), dtype=np.int64)
+
+        max_events = duration // 2 + 1
+        times = np.cumsum(self.event_rng.integers(2, 5, size=(max_events, n)), axis=0)
+        depts = self.event_rng.integers(len(DEPTS), size=(max_events, n))
+        long_leave = self.event_rng.random((max_events, n)) < 0.5
+
+        for e in range(max_events):
+            start, dept = times[e], depts[e]
+            valid = start < duration
+            is_leave = valid & ((dept == ER) | (dept == STEP_DOWN))
+            is_close = valid & ~is_leave
+
+            clock = self.start_hour + start
+            end = np.where(long_leave[e], start + np.maximum(1, 24 - clock % 24), start + 1)
+            end = np.minimum(end, duration)
+            np.add.at(leave, (start[is_leave], dept[is_leave], rows[is_leave]), 1)
+            np.add.at(leave, (end[is_leave], dept[is_leave], rows[is_leave]), -1)
+            np.add.at(closed, (start[is_close], dept[is_close], rows[is_close]), 1)
+            np.add.at(closed, (np.minimum(start + 1, duration)[is_close], dept[is_close], rows[is_close]), -1)
+
+        # Leave and closures already under way at the census
+        if self.census is not None:
+            for counts, events in ((leave, self.census.staff_leave), (closed, self.census.closed_rooms)):
+                for name, remaining in events.items():
+                    for hours in remaining:
+                        counts[0, DEPT_INDEX[name]] += 1
+                        counts[min(duration, max(1, int(np.ceil(hours)))), DEPT_INDEX[name]] -= 1
+
+        return np.cumsum(leave, axis=0)[:duration], np.cumsum(closed, axis=0)[:duration]
+
+    def _enter(self, d, counts, staff_cap, closed, now, step=0.0):
+        """
+        counts[i] patients join department d's queue, paying the arrival
+        penalty when the department is full (HospitalSimulation.transfer_patient).
+        """
+        load = self.occupied[d] + self.queues[d].length
+        threshold = np.minimum(staff_cap, self.beds[d] - closed)
+        penalised = np.clip(counts - np.maximum(0, threshold - load), 0, counts)
+        self.total_wait_cost[d] += penalised * self.config.wait_cost[DEPTS[d]]
+        self.queues[d].push(counts, now, step)
+
+    def _admit(self, d, slots, now):
+        free = np.maximum(0, slots - self.occupied[d])
+        admitted, waited = self.queues[d].pop(free, now)
+        self.occupied[d] += admitted
+        self.total_wait_cost[d] += waited * self.config.wait_cost[DEPTS[d]]
+
+    def run(self):
+        n = self.n
+        config = self.config
+        costs = config.costs
+        leave, closed = self._draw_events()
+
+        # Compiled once per config, in HospitalSimulation's order
+        transfers = [(DEPT_INDEX[src], DEPT_INDEX[dst], dist) for src, dst, dist in config.transfers]
+        direct_entry = [(DEPT_INDEX[name], dist) for name, dist in config.direct_entry]
+        departures = config.step_down_departures
+        disposition = config.er_disposition
+        disposition_targets = [DEPT_INDEX[name] for name in disposition if name != 'Home']
+        disposition_p = np.array([disposition[DEPTS[d]] for d in disposition_targets] + [disposition['Home']])
+        disposition_p = disposition_p / disposition_p.sum()
+
+        self.queues = [_WaitQueue(n) for _ in DEPTS]
+        self.occupied = np.zeros((len(DEPTS), n), dtype=np.int64)
+        er_seen = np.zeros(n, dtype=np.int64) # ER patients admitted during the previous hour
+        if self.census is not None:
+            er_seen = self._apply_census()
+
+        hourly_staff = self._hourly_staff_cost()
+        cost_at_day_start = np.zeros(n)
+        daily = []
+        
+        start = 0
+        if self.prefix_cache is not None:
+            start, snapshot = self.prefix_cache.longest(self._stream_key, self.levels)
+            if snapshot is not None:
+                er_seen, cost_at_day_start, daily = self._restore(snapshot)
+            self.hours_skipped = start
+            self.prefix_cache.record(start, self.duration - start)
+        
+        for t in range(start, self.duration):
+            if t > start and self.prefix_cache is not None:
+                self.prefix_cache.store(self._stream_key, self.levels, t,
+                                        self._snapshot(er_seen, cost_at_day_start, daily))
+            if t and (self.start_hour + t) % 24 == 0:
+                accrued = self._accrued_cost(hourly_staff[:t])
+                daily.append(accrued - cost_at_day_start)
+                cost_at_day_start = accrued
+            
+            # 1. Events active at t
+            previous_level = self.levels[max(t - 1, 0)]
+            staff_before = np.maximum(0, previous_level - leave[t])
+
+            # 2. Direct entries
+            for d, dist in direct_entry:
+                self._enter(d, dist.values_at(self.arrival_rng.random(n)), staff_before[d], closed[t, d], t)
+
+            # 3. Transfers (candidates = patients admitted before t)
+            releasing = np.zeros_like(self.occupied)
+            if t >= 1:
+                candidates = self.occupied.copy()
+                for src, dst, dist in transfers:
+                    moved = np.minimum(dist.values_at(self.transfer_rng.random(n)), candidates[src])
+                    candidates[src] -= moved
+                    releasing[src] += moved
+                    self._enter(dst, moved, staff_before[dst], closed[t, dst], t)
+                home = np.minimum(departures.values_at(self.transfer_rng.random(n)), candidates[STEP_DOWN])
+                releasing[STEP_DOWN] += home
+
+            # 4. Staff change, 5. releases and FIFO admissions
+            staff_now = np.maximum(0, self.levels[t] - leave[t])
+            slots = np.minimum(staff_now, self.beds[:, None])
+            self.occupied -= releasing
+            for d in (SURGERY, CRITICAL_CARE, STEP_DOWN):
+                self._admit(d, slots[d], t)
+
+            # Inside (t, t+1): last hour's ER patients reach their next department.
+            # Later entries are the ones left waiting; use their expected
+            # arrival order statistics as entry times.
+            split = self.disposition_rng.multinomial(er_seen, disposition_p)
+            for j, d in enumerate(disposition_targets):
+                counts = split[:, j]
+                free = np.maximum(0, slots[d] - self.occupied[d] - self.queues[d].length)
+                admitted_now = np.minimum(counts, free)
+                waiting = counts - admitted_now
+                load = self.occupied[d] + self.queues[d].length
+                threshold = np.minimum(staff_now[d], self.beds[d] - closed[t, d])
+                penalised = np.clip(counts - np.maximum(0, threshold - load), 0, counts)
+                self.total_wait_cost[d] += penalised * costs[DEPTS[d]]['Wait']
+                self.occupied[d] += admitted_now
+                step = 1.0 / (counts + 1)
+                self.queues[d].push(waiting, t + 1 - waiting * step, step)
+
+            # ER arrivals: every slot treats one patient per hour
+            mean, std_dev = config.hourly_arrivals[(self.start_hour + t) % 24]
+            arrivals = np.maximum(0, np.round(self.arrival_rng.normal(mean, std_dev, n))).astype(np.int64)
+            er_slots = slots[ER]
+            from_queue, waited = self.queues[ER].pop(er_slots, t + 0.5)
+            self.total_wait_cost[ER] += waited * costs['ER']['Wait']
+            admitted_new = np.minimum(arrivals, er_slots - from_queue)
+            excess = arrivals - admitted_new
+
+            # Ambulances are diverted when every ER bed is taken
+            full = er_slots + self.queues[ER].length >= self.beds[ER]
+            diverted = np.where(full, self.arrival_rng.binomial(excess, config.ambulance_rate), 0)
+            self.total_diversion_cost += diverted * costs['ER']['Diversion']
+            self.queues[ER].push(excess - diverted, t + 0.5)
+            er_seen = from_queue + admitted_new
+
+        if self.prefix_cache is not None and self.duration > start:
+            self.prefix_cache.store(self._stream_key, self.levels, self.duration,
+                                    self._snapshot(er_seen, cost_at_day_start, daily))
+
+        self.total_staff_cost = np.broadcast_to(hourly_staff.sum(axis=0), (n,)).copy()
+        self.total_cost = self.total_staff_cost + self.total_wait_cost.sum(axis=0) + self.total_diversion_cost
+        if self.duration % 24 == 0:
+            daily.append(self.total_cost - cost_at_day_start)
+        self.daily_costs = np.stack(daily, axis=1) if daily else np.zeros((n, 0))
+        return self.total_cost
+
+    def _apply_census(self):
+        """
+        Seeds the census state (as HospitalCensus.apply does for SimPy) and
+        returns the ER patients finishing treatment in the first hour.
+        Patients in treatment hold a slot up to the starting staff level
+        (leave does not interrupt them); any beyond it queue from t = 0,
+        ahead of the waiting patients. Waiting patients pay no arrival
+        penalty; ER ones enter at 0.5, like the first hour's arrivals, so
+        those seen straight away are not charged.
+        """
+        n = self.n
+        cap = np.minimum(self.levels[0], self.beds[:, None]) # (4, 1 or n)
+        er_seen = np.zeros(n, dtype=np.int64)
+        for name, count in self.census.in_treatment.items():
+            d = DEPT_INDEX[name]
+            held = np.broadcast_to(np.minimum(count, cap[d]), (n,))
+            if d == ER:
+                er_seen += held
+            else:
+                self.occupied[d] += held
+            self.queues[d].push(count - held, 0.0)
+        for name, count in self.census.waiting.items():
+            d = DEPT_INDEX[name]
+            self.queues[d].push(np.full(n, count, dtype=np.int64), 0.5 if d == ER else 0.0)
+        return er_seen
+
+    def _snapshot(self, er_seen, cost_at_day_start, daily):
+        """Everything run() needs to carry on from the current hour."""
+        return (self.occupied.copy(), er_seen.copy(), self.total_wait_cost.copy(), self.total_diversion_cost.copy(),
+                [(q.prefix.copy(), q.pushed.copy(), q.popped.copy()) for q in self.queues],
+                [rng.bit_generator.state for rng in (self.arrival_rng, self.disposition_rng, self.transfer_rng)],
+                cost_at_day_start.copy(), list(daily))
+
+    def _restore(self, snapshot):
+        occupied, er_seen, wait_cost, diversion_cost, queues, rng_states, cost_at_day_start, daily = snapshot
+        self.occupied = occupied.copy()
+        self.total_wait_cost = wait_cost.copy()
+        self.total_diversion_cost = diversion_cost.copy()
+        for queue, (prefix, pushed, popped) in zip(self.queues, queues):
+            queue.prefix, queue.pushed, queue.popped = prefix.copy(), pushed.copy(), popped.copy()
+        for rng, state in zip((self.arrival_rng, self.disposition_rng, self.transfer_rng), rng_states):
+            rng.bit_generator.state = state
+        return er_seen.copy(), cost_at_day_start.copy(), list(daily)
+
+    def _hourly_staff_cost(self):
+        """Temp staff cost charged at the start of each hour, shape (duration, 1 or n)."""
+        total_regular_staff = self.config.total_regular_staff
+        temps = np.maximum(0, self.levels.sum(axis=1) - total_regular_staff)
+        last_hour_temps = self.census.last_hour_temps if self.census is not None else 0
+        previous = np.concatenate([np.full_like(temps[:1], last_hour_temps), temps[:-1]])
+        rate = self.config.temp_staff_rate(self.levels.transpose(0, 2, 1), DEPTS)
+        return (temps + np.maximum(0, temps - previous)) * rate
+
+    def _accrued_cost(self, staff_hours):
+        staff = np.broadcast_to(staff_hours.sum(axis=0), (self.n,))
+        return staff + self.total_wait_cost.sum(axis=0) + self.total_diversion_cost
@@ -0,0 +1,214 @@
+import hashlib
+import sqlite3
+from collections import OrderedDict
+import numpy as np
+from . import config
+
+DEFAULT_CACHE_SIZE = 10000
+DEFAULT_PREFIX_CACHE_SIZE = 2000
+
+def config_fingerprint(params=None):
+    """
+    Short hash of the simulation parameters in simulation.config, with
+    `params` (overrides or a SimulationConfig) applied.
+    Part of every cache key, so results computed under different arrival
+    rates, capacities or costs (e.g. a sensitivity run) are never mixed.
+    """
+    if isinstance(params, config.SimulationConfig):
+        params = params.as_params()
+    text = repr(sorted(config.resolve_params(params).items()))
+    return hashlib.sha1(text.encode()).hexdigest()[:16]
+
+class FitnessStats:
+    """Running count / mean / variance of a schedule's simulated costs (Welford)."""
+    __slots__ = ('count', 'mean', 'm2')
+
+    def __init__(self, count=0, mean=0.0, m2=0.0):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+
+    @property
+    def variance(self):
+        """Sample variance (0 with fewer than two replications)."""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stderr(self):
+        return float(np.sqrt(self.variance / self.count)) if self.count else float('inf')
+
+    def add(self, costs):
+        """Merges a batch of new costs (Chan et al. parallel update)."""
+        costs = np.asarray(costs, dtype=float)
+        n_b = len(costs)
+        if n_b == 0:
+            return self
+        mean_b = float(costs.mean())
+        m2_b = float(((costs - mean_b) ** 2).sum())
+        n = self.count + n_b
+        delta = mean_b - self.mean
+        self.mean += delta * n_b / n
+        self.m2 += m2_b + delta * delta * self.count * n_b / n
+        self.count = n
+        return self
+
+    def __repr__(self):
+        return f"FitnessStats(count={self.count}, mean={self.mean:,.2f}, std={np.sqrt(self.variance):,.2f})"
+
+class FitnessCache:
+    """
+    Bounded LRU map from schedule key (bytes) to FitnessStats.
+
+    With `path`, entries are also kept in a SQLite file so later sessions
+    (e.g. a restarted notebook) pick up earlier evaluations. Entries evicted
+    from memory are still found on disk.
+    """
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE, path=None):
+        self.maxsize = maxsize
+        self.path = path
+        self._entries = OrderedDict()
+        self._dirty = set()
+        self.hits = 0
+        self.misses = 0
+        self._db = None
+        if path is not None:
+            self._db = sqlite3.connect(path)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS fitness "
+                "(key BLOB PRIMARY KEY, count INTEGER, mean REAL, m2 REAL)"
+            )
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return self.get(key, count_lookup=False) is not None
+
+    def get(self, key, count_lookup=True):
+        """Stats for `key`, or None if it has never been evaluated."""
+        stats = self._entries.get(key)
+        if stats is not None:
+            self._entries.move_to_end(key)
+        elif self._db is not None:
+            row = self._db.execute("SELECT count, mean, m2 FROM fitness WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                stats = FitnessStats(*row)
+                self._store(key, stats)
+        if count_lookup:
+            if stats is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return stats
+
+    def items(self, prefix=b''):
+        """
+        (key, stats) for every entry whose key starts with `prefix`, in memory
+        or on disk. Does not count as lookups or change the LRU order.
+        """
+        for key, stats in self._entries.items():
+            if key.startswith(prefix):
+                yield key, stats
+        if self._db is not None:
+            self.flush()
+            rows = self._db.execute("SELECT key, count, mean, m2 FROM fitness").fetchall()
+            for key, count, mean, m2 in rows:
+                if key.startswith(prefix) and key not in self._entries:
+                    yield key, FitnessStats(count, mean, m2)
+
+    def update(self, key, costs):
+        """Adds new replication costs for `key` and returns its merged stats."""
+        stats = self.get(key, count_lookup=False)
+        if stats is None:
+            stats = FitnessStats()
+            self._store(key, stats)
+        stats.add(costs)
+        self._dirty.add(key)
+        return stats
+
+    def set(self, key, stats):
+        """Replaces the stats for `key` (e.g. when restoring a checkpoint)."""
+        self._store(key, stats)
+        self._dirty.add(key)
+
+    def _store(self, key, stats):
+        self._entries[key] = stats
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            old_key, old_stats = self._entries.popitem(last=False)
+            if old_key in self._dirty:
+                self._write(old_key, old_stats)
+                self._dirty.discard(old_key)
+
+    def _write(self, key, stats):
+        if self._db is not None:
+            self._db.execute(
+                "INSERT OR REPLACE INTO fitness (key, count, mean, m2) VALUES (?, ?, ?, ?)",
+                (key, stats.count, stats.mean, stats.m2),
+            )
+
+    def flush(self):
+        """Writes pending updates to disk (no-op without `path`)."""
+        if self._db is None:
+            self._dirty.clear()
+            return
+        for key in self._dirty:
+            if key in self._entries:
+                self._write(key, self._entries[key])
+        self._dirty.clear()
+        self._db.commit()
+
+    def close(self):
+        self.flush()
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+class PrefixStateCache:
+    """
+    Bounded LRU map from (random streams, staff levels of hours [0, t)) to
+    a BatchHospitalSimulation snapshot taken at the start of hour t.
+
+    Under common random numbers, schedules that agree on their first t
+    hours follow the same trajectory up to hour t, so a later run can resume
+    from the snapshot instead of simulating those hours again. Results are
+    identical either way. Keys also cover n_replications, the parameters,
+    the starting census and the duration, so one cache can be shared freely.
+    """
+    def __init__(self, maxsize=DEFAULT_PREFIX_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self.hours_skipped = 0
+        self.hours_simulated = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def hours_saved(self):
+        """Fraction of all requested hours that were resumed rather than simulated."""
+        total = self.hours_skipped + self.hours_simulated
+        return self.hours_skipped / total if total else 0.0
+
+    def longest(self, stream_key, levels):
+        """(t, snapshot) for the longest cached prefix of `levels`, or (0, None)."""
+        for t in range(len(levels), 0, -1):
+            snapshot = self._entries.get(stream_key + levels[:t].tobytes())
+            if snapshot is not None:
+                self._entries.move_to_end(stream_key + levels[:t].tobytes())
+                return t, snapshot
+        return 0, None
+
+    def store(self, stream_key, levels, t, snapshot):
+        key = stream_key + levels[:t].tobytes()
+        self._entries[key] = snapshot
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def record(self, skipped, simulated):
+        self.hours_skipped += skipped
+        self.hours_simulated += simulated
+
+    def clear(self):
+        self._entries.clear()
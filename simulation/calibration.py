@@ -0,0 +1,112 @@
+import hashlib
+import os
+import numpy as np
+
+# Arrival-rate calibration from the supplementary workbook: a pivot table of
+# ER arrivals with one block of rows per year (hours 12 AM - 11 PM) and one
+# column per calendar day. The workbook is parsed once with pandas and the
+# hourly counts are kept in a compressed .npz named after the workbook's
+# hash, so later sessions load them in milliseconds and an edited workbook
+# is picked up automatically.
+#
+# The workbook only has ER arrivals: transfer, direct-entry and step-down
+# PMFs stay as in simulation.config.
+
+DEFAULT_WORKBOOK = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                'Supplementary+file+1.xlsx')
+CALIBRATION_VERSION = 1
+HOUR_LABELS = tuple(f"{12 if h % 12 == 0 else h % 12} {'AM' if h < 12 else 'PM'}" for h in range(24))
+
+def workbook_hash(path=DEFAULT_WORKBOOK):
+    """SHA-1 of the workbook file (hex)."""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def read_arrival_counts(path=DEFAULT_WORKBOOK):
+    """
+    Parses the workbook (pandas + openpyxl). Returns (counts, years, days):
+    counts is a (n_days, 24) float array with NaN for blank pivot cells,
+    years / days label each row (e.g. 2014, '1-Jan'). Calendar days missing
+    from a year (no year total) are left out.
+    """
+    import pandas as pd
+    sheet = pd.read_excel(path, header=None)
+    labels = [str(v).strip() if pd.notna(v) else '' for v in sheet.iloc[:, 0]]
+    month_row = labels.index('Row Labels')
+    date_row = month_row - 1
+
+    # Day columns: a date above a month name (skips the per-day 'Total' columns)
+    columns = [c for c in range(1, sheet.shape[1])
+               if isinstance(sheet.iat[date_row, c], str) and not sheet.iat[date_row, c].endswith('Total')
+               and isinstance(sheet.iat[month_row, c], str) and not sheet.iat[month_row, c].startswith('<')]
+    dates = [sheet.iat[date_row, c] for c in columns]
+
+    counts, years, days = [], [], []
+    for row, label in enumerate(labels):
+        if not label.isdigit():
+            continue
+        hours = {}
+        for r in range(row + 1, min(row + 1 + len(HOUR_LABELS), len(labels))):
+            if labels[r] in HOUR_LABELS:
+                hours[HOUR_LABELS.index(labels[r])] = r
+        if len(hours) != len(HOUR_LABELS):
+            raise ValueError(f"Year {label}: expected 24 hour rows, found {len(hours)}")
+        totals = sheet.iloc[row, columns].to_numpy(dtype=float)
+        block = sheet.iloc[[hours[h] for h in range(24)], columns].to_numpy(dtype=float).T
+        present = ~np.isnan(totals)
+        counts.append(block[present])
+        years.extend([int(label)] * int(present.sum()))
+        days.extend(d for d, p in zip(dates, present) if p)
+    if not counts:
+        raise ValueError(f"No year rows found in {path}")
+    return np.concatenate(counts), np.array(years), np.array(days)
+
+def load_arrival_counts(path=DEFAULT_WORKBOOK, cache_dir=None, refresh=False):
+    """
+    read_arrival_counts through the .npz cache in `cache_dir` (default: next
+    to the workbook). refresh=True re-reads the workbook.
+    """
+    key = workbook_hash(path)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    cache = os.path.join(cache_dir or os.path.dirname(os.path.abspath(path)),
+                         f".{stem}.v{CALIBRATION_VERSION}.{key[:16]}.npz")
+    if not refresh and os.path.exists(cache):
+        with np.load(cache, allow_pickle=False) as data:
+            return data['counts'], data['years'], data['days']
+    counts, years, days = read_arrival_counts(path)
+    tmp = f"{cache}.tmp"
+    with open(tmp, 'wb') as f:
+        np.savez_compressed(f, counts=counts, years=years, days=days)
+    os.replace(tmp, cache)
+    return counts, years, days
+
+def fit_arrival_rates(counts, years=None, select_years=None, blanks='zero'):
+    """
+    {hour: (mean, std)} of ER arrivals per hour of day, the ARRIVAL_RATES
+    format.
+    select_years: Fit only these years (the workbook's volume grows year on
+                  year); needs `years`.
+    blanks: 'zero' counts a blank pivot cell as an hour without arrivals;
+            'missing' leaves it out, which reproduces config.ARRIVAL_RATES.
+    """
+    counts = np.asarray(counts, dtype=float)
+    if select_years is not None:
+        counts = counts[np.isin(years, list(select_years))]
+    if blanks == 'zero':
+        counts = np.nan_to_num(counts)
+    elif blanks != 'missing':
+        raise ValueError(f"Unknown blanks option: {blanks}")
+    means = np.nanmean(counts, axis=0)
+    stds = np.nanstd(counts, axis=0, ddof=1)
+    return {h: (round(float(means[h]), 2), round(float(stds[h]), 2)) for h in range(24)}
+
+def calibrated_params(path=DEFAULT_WORKBOOK, cache_dir=None, select_years=None, blanks='zero'):
+    """
+    {NAME: value} overrides with ARRIVAL_RATES fitted to the workbook, for
+    SimulationConfig.from_params / HospitalSimulation(params=...).
+    """
+    counts, years, _ = load_arrival_counts(path, cache_dir)
+    return {'ARRIVAL_RATES': fit_arrival_rates(counts, years, select_years, blanks)}
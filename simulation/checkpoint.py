@@ -0,0 +1,37 @@
+import json
+import os
+import numpy as np
+
+# Optimizer checkpoints: one compressed .npz with the arrays (population,
+# contenders, fitness cache, surrogate data) and a JSON string for the
+# scalars, histories and RNG state. Written to a temporary file and renamed,
+# so an interrupted write never replaces a good checkpoint.
+
+CHECKPOINT_VERSION = 1
+
+def pack_keys(keys):
+    """Variable-length byte strings -> (uint8 buffer, int64 offsets) without padding."""
+    lengths = np.array([len(k) for k in keys], dtype=np.int64)
+    offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+    return np.frombuffer(b''.join(keys), dtype=np.uint8).copy(), offsets
+
+def unpack_keys(buffer, offsets):
+    data = buffer.tobytes()
+    return [data[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+
+def save_checkpoint(path, meta, arrays):
+    """Writes {name: array} plus the JSON-serialisable `meta` dict to `path`."""
+    meta = dict(meta, version=CHECKPOINT_VERSION)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'wb') as f:
+        np.savez_compressed(f, meta=np.array(json.dumps(meta)), **arrays)
+    os.replace(tmp, path)
+
+def load_checkpoint(path):
+    """(meta dict, {name: array}) as written by save_checkpoint."""
+    with np.load(path, allow_pickle=False) as data:
+        arrays = {name: data[name] for name in data.files if name != 'meta'}
+        meta = json.loads(str(data['meta']))
+    if meta.get('version') != CHECKPOINT_VERSION:
+        raise ValueError(f"Unsupported checkpoint version: {meta.get('version')}")
+    return meta, arrays
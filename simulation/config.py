@@ -1,6 +1,14 @@
 
 # Simulation Configuration
 
+from dataclasses import dataclass, field
+from types import MappingProxyType
+import numpy as np
+from .utils import Distribution
+
+# Department names; arrays throughout the package are indexed in this order
+DEPTS = ('ER', 'Surgery', 'CriticalCare', 'StepDown')
+
 # ---------------------------------------------------------
 # 1. Arrival Rates (Average Patients per Hour)
 # Keys: 0-23 (Hour of Day)
@@ -112,3 +120,124 @@ COSTS = {
 DEFAULT_SERVICE_TIME = 1.0 # Hours (Assumed since not explicitly varied per dept in prompt)
 CHECK_INTERVAL = 1.0 # Hour (Patients check efficiently every hour)
 
+# ---------------------------------------------------------
+# 6. Per-simulation configuration
+# ---------------------------------------------------------
+def resolve_params(overrides=None):
+    """
+    {NAME: value} for every parameter above, with `overrides` (same names,
+    e.g. {'AMBULANCE_RATE': 0.3}) replacing the module values.
+    """
+    params = {name: value for name, value in globals().items()
+              if name.isupper() and not name.startswith('_') and name != 'DEPTS'}
+    for name, value in (overrides or {}).items():
+        if name not in params:
+            raise KeyError(f"Unknown simulation parameter: {name}")
+        params[name] = value
+    return params
+
+def _freeze(value):
+    if isinstance(value, (dict, MappingProxyType)):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+def _thaw(value):
+    if isinstance(value, MappingProxyType):
+        return {k: _thaw(v) for k, v in value.items()}
+    return value
+
+# Same order as HospitalSimulation.transfer_manager has always used
+_TRANSFER_PATHWAYS = (('Surgery', 'CriticalCare'), ('Surgery', 'StepDown'), ('CriticalCare', 'StepDown'))
+
+@dataclass(frozen=True)
+class SimulationConfig:
+    """
+    Immutable snapshot of the parameters above, with every PMF compiled once
+    into a Distribution. Simulations read only from their config, so
+    differently configured simulations can run side by side in one process.
+    Build one with SimulationConfig.from_params(overrides) and pass it as
+    `params` to HospitalSimulation / BatchHospitalSimulation.
+
+    Each call builds a fresh config from the module values as they are at
+    that moment, so editing them in place (as the notebook does) is picked
+    up by every simulation created afterwards.
+    """
+    arrival_rates: MappingProxyType
+    capacity: MappingProxyType
+    costs: MappingProxyType
+    initial_staff: MappingProxyType
+    initial_patients: MappingProxyType
+    transfer_rates: MappingProxyType
+    direct_entry_rates: MappingProxyType
+    er_disposition: MappingProxyType
+    ambulance_rate: float
+    step_down_departure_rates: MappingProxyType
+
+    # Compiled from the fields above
+    hourly_arrivals: tuple = field(init=False, repr=False, compare=False) # (mean, std) for hour 0-23
+    direct_entry: tuple = field(init=False, repr=False, compare=False) # ((dept, Distribution), ...)
+    transfers: tuple = field(init=False, repr=False, compare=False) # ((src, dst, Distribution), ...)
+    step_down_departures: Distribution = field(init=False, repr=False, compare=False)
+    disposition: Distribution = field(init=False, repr=False, compare=False) # over department names / 'Home'
+    wait_cost: MappingProxyType = field(init=False, repr=False, compare=False)
+    total_regular_staff: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        for name in ('arrival_rates', 'capacity', 'costs', 'initial_staff', 'initial_patients',
+                     'transfer_rates', 'direct_entry_rates', 'er_disposition', 'step_down_departure_rates'):
+            object.__setattr__(self, name, _freeze(getattr(self, name)))
+        compiled = {
+            'hourly_arrivals': tuple(self.arrival_rates.get(h, (2.0, 1.0)) for h in range(24)),
+            'direct_entry': tuple((dept, Distribution(pmf)) for dept, pmf in self.direct_entry_rates.items()),
+            'transfers': tuple((src, dst, Distribution(self.transfer_rates[(src, dst)]))
+                               for src, dst in _TRANSFER_PATHWAYS if self.transfer_rates.get((src, dst))),
+            'step_down_departures': Distribution(self.step_down_departure_rates),
+            'disposition': Distribution(self.er_disposition),
+            'wait_cost': MappingProxyType({dept: table['Wait'] for dept, table in self.costs.items()}),
+            'total_regular_staff': sum(self.initial_staff.values()),
+        }
+        for name, value in compiled.items():
+            object.__setattr__(self, name, value)
+
+    @classmethod
+    def from_params(cls, params=None):
+        """
+        params: None (module values), a SimulationConfig (returned as is), or
+        {NAME: value} overrides as for resolve_params.
+        """
+        if isinstance(params, cls):
+            return params
+        resolved = resolve_params(params)
+        return cls(**{f.name: resolved[f.name.upper()] for f in cls.__dataclass_fields__.values() if f.init})
+
+    def temp_staff_rate(self, levels, depts):
+        """
+        Cost of one temporary staff hour at staff `levels` (array of shape
+        (..., len(depts))). Temps cover the hospital-wide shortfall of
+        regular staff; they are charged at the ExtraStaff rates of the
+        departments staffed above their regular level, weighted by how far
+        above each one is. Returns an array of shape (...).
+        """
+        levels = np.asarray(levels, dtype=float)
+        rates = np.array([self.costs[d]['ExtraStaff'] for d in depts], dtype=float)
+        excess = np.maximum(0.0, levels - np.array([self.initial_staff[d] for d in depts], dtype=float))
+        total = excess.sum(axis=-1)
+        # No department above its regular level means no temps: any rate will do
+        return np.where(total > 0, (excess @ rates) / np.where(total > 0, total, 1.0), rates.mean())
+
+    def as_params(self):
+        """Plain {NAME: value} dict (mutable copies)."""
+        return {f.name.upper(): _thaw(getattr(self, f.name))
+                for f in self.__dataclass_fields__.values() if f.init}
+
+    def replace(self, **overrides):
+        """New config with {NAME: value} overrides applied on top of this one."""
+        params = self.as_params()
+        params.update(overrides)
+        return SimulationConfig.from_params(params)
+
+    def __reduce__(self):
+        # MappingProxyType does not pickle; rebuild from plain dicts (process pools)
+        return (SimulationConfig.from_params, (self.as_params(),))
@@ -1,42 +1,87 @@
 
 import simpy
-import random
 import numpy as np
-from .config import (
-    ARRIVAL_RATES, CAPACITY, COSTS, INITIAL_STAFF, INITIAL_PATIENTS,
-    TRANSFER_RATES, DIRECT_ENTRY_RATES, ER_DISPOSITION,
-    AMBULANCE_RATE, STEP_DOWN_DEPARTURE_RATES
-)
+from .config import DEPTS, SimulationConfig
 
 from .department import Department
-from .patient import Patient
+from .patient import Patient, DISCHARGED, DIVERTED
+from .metrics import MetricsCollector
+from .profiling import SimulationProfiler
+from .arrivals import ArrivalStream
+from .policy import STATE_FIELDS
+from .utils import RNG_STREAMS, spawn_streams
 
 class HospitalSimulation:
-    def __init__(self, duration_hours=24, staffing_schedule=None):
+    def __init__(self, duration_hours=24, staffing_schedule=None, seed=None, rng=None, metrics=None,
+                 periodic_schedule=True, profiler=None, params=None, arrivals=None, policy=None,
+                 census=None):
         """
         staffing_schedule: Dict {Hour: {'ER': count, ...}}
         If None, uses INITIAL_STAFF constantly.
+        periodic_schedule: Repeat a 0-23 schedule every day of a multi-day
+                           run (otherwise hours >= 24 use INITIAL_STAFF).
+        seed: Seed for this simulation's random streams (int or SeedSequence).
+              The same seed always reproduces the same run; None is random.
+        rng: Optional np.random.Generator to derive the seed from instead.
+        metrics: MetricsCollector (or True for a new one) to stream per-
+                 department / per-hour waits, queues, occupancy, diversions
+                 and staff cost into. Off by default.
+        profiler: SimulationProfiler (or True for a new one) to count and
+                  time SimPy processes by type and trace them. Off by default.
+        params: SimulationConfig, or {NAME: value} overrides of
+                simulation.config for this run (e.g. {'AMBULANCE_RATE': 0.3}).
+        arrivals: ArrivalStream to replay (the same patients under several
+                  schedules); it must cover duration_hours. None draws one
+                  from this simulation's own 'arrivals'/'dispositions' streams.
+        policy: Called once per hour with a state snapshot to adjust the
+                scheduled staff levels (see simulation.policy).
+        census: HospitalCensus to start from (see simulation.nowcast): the
+                run then covers clock hours census.hour to census.hour +
+                duration_hours instead of starting empty at hour 0.
         """
-        self.env = simpy.Environment()
+        self.census = census
+        self.start_hour = census.hour if census is not None else 0
+        self.env = simpy.Environment(initial_time=self.start_hour)
         self.duration = duration_hours
         self.staffing_schedule = staffing_schedule
+        self.periodic_schedule = periodic_schedule
+        self.config = SimulationConfig.from_params(params)
+        
+        # 0. Random Streams (no shared global state)
+        self.streams = spawn_streams(seed, rng)
+        self.arrival_rng = self.streams['arrivals']
+        self.disposition_rng = self.streams['dispositions']
+        self.transfer_rng = self.streams['transfers']
+        self.event_rng = self.streams['events']
+        if arrivals is None:
+            arrivals = ArrivalStream.draw(duration_hours, self.config, self.arrival_rng, self.disposition_rng,
+                                          self.start_hour)
+        elif arrivals.duration < duration_hours:
+            raise ValueError(f"ArrivalStream covers {arrivals.duration}h, run needs {duration_hours}h")
+        elif arrivals.start != self.start_hour:
+            raise ValueError(f"ArrivalStream starts at hour {arrivals.start}, run at hour {self.start_hour}")
+        self.arrivals = arrivals
+        
+        self.metrics = MetricsCollector() if metrics is True else (metrics if isinstance(metrics, MetricsCollector) else None)
+        self.profiler = SimulationProfiler() if profiler is True else (profiler if isinstance(profiler, SimulationProfiler) else None)
         
         # 1. Initialize Departments
         # If schedule provided, use Hour 0 counts for init?
         # Or standard init?
         # Let's use standard init for object creation, update immediately if schedule exists.
         
-        self.initial_staff_counts = INITIAL_STAFF
+        self.initial_staff_counts = self.config.initial_staff
         if self.staffing_schedule:
-            # Use Hour 0 if available
-            if 0 in self.staffing_schedule:
-                self.initial_staff_counts = self.staffing_schedule[0]
+            # Use the starting hour if available
+            start_key = self.start_hour % 24 if periodic_schedule else self.start_hour
+            if start_key in self.staffing_schedule:
+                self.initial_staff_counts = self.staffing_schedule[start_key]
             
         self.departments = {
-            'ER': Department(self.env, 'ER', INITIAL_PATIENTS['ER'], self.initial_staff_counts.get('ER', 0)),
-            'Surgery': Department(self.env, 'Surgery', INITIAL_PATIENTS['Surgery'], self.initial_staff_counts.get('Surgery', 0)),
-            'CriticalCare': Department(self.env, 'CriticalCare', INITIAL_PATIENTS['CriticalCare'], self.initial_staff_counts.get('CriticalCare', 0)),
-            'StepDown': Department(self.env, 'StepDown', INITIAL_PATIENTS['StepDown'], self.initial_staff_counts.get('StepDown', 0))
+            'ER': Department(self.env, 'ER', self.config.initial_patients['ER'], self.initial_staff_counts.get('ER', 0), self.metrics, self.profiler, self.config),
+            'Surgery': Department(self.env, 'Surgery', self.config.initial_patients['Surgery'], self.initial_staff_counts.get('Surgery', 0), self.metrics, self.profiler, self.config),
+            'CriticalCare': Department(self.env, 'CriticalCare', self.config.initial_patients['CriticalCare'], self.initial_staff_counts.get('CriticalCare', 0), self.metrics, self.profiler, self.config),
+            'StepDown': Department(self.env, 'StepDown', self.config.initial_patients['StepDown'], self.initial_staff_counts.get('StepDown', 0), self.metrics, self.profiler, self.config)
         }
         
         # 2. State & Metrics
@@ -44,39 +89,60 @@ class HospitalSimulation:
         self.total_cost = 0
         self.total_staff_setup_cost = 0
         self.total_staff_hourly_cost = 0
-        self.last_hour_temps = 0 # Track for hiring cost
+        self.last_hour_temps = census.last_hour_temps if census is not None else 0 # Track for hiring cost
+        self.daily_costs = [] # Cost accrued in each completed day
+        self._cost_at_day_start = 0
+        
+        # 3. Staffing policy: one state array, refilled every hour
+        self.policy = policy
+        self._state = np.zeros((len(DEPTS), len(STATE_FIELDS)))
+        self._state_view = self._state.view()
+        self._state_view.flags.writeable = False
 
     def run(self):
+        if self.policy is not None and hasattr(self.policy, 'reset'):
+            self.policy.reset()
+        if self.census is not None:
+            self.census.apply(self)
+        
         # Start core processes
-        self.env.process(self.arrival_generator())
-        self.env.process(self.direct_arrival_generator())
-        self.env.process(self.transfer_manager())
-        self.env.process(self.random_event_manager())
-        self.env.process(self.hourly_staff_manager())
+        self.process(self.arrival_generator())
+        self.process(self.direct_arrival_generator())
+        self.process(self.transfer_manager())
+        self.process(self.random_event_manager())
+        self.process(self.hourly_staff_manager())
         
         # Run
-        self.env.run(until=self.duration)
+        self.env.run(until=self.start_hour + self.duration)
+        if self.profiler is not None:
+            self.profiler.finish(self.env.now)
         
         # Final Calculation
         self.calculate_total_cost()
+        if self.duration % 24 == 0 and len(self.daily_costs) < self.duration // 24:
+            self._close_day()
         return self.total_cost
 
     def arrival_generator(self):
-        for hour in range(self.duration):
-            mean, std_dev = ARRIVAL_RATES.get(hour % 24, (2.0, 1.0))
-            num_arrivals = max(0, int(np.round(np.random.normal(mean, std_dev))))
-            for _ in range(num_arrivals):
-                delay = random.random()
-                self.env.process(self.handle_er_arrival(delay))
-            yield self.env.timeout(1.0)
+        """Replays the ER arrivals of self.arrivals in time order."""
+        stream = self.arrivals
+        end = int(np.searchsorted(stream.er_times, self.start_hour + self.duration))
+        env = self.env
+        for t, is_ambulance, draw in zip(stream.er_times[:end].tolist(), stream.er_ambulance[:end].tolist(),
+                                         stream.er_disposition_draws[:end].tolist()):
+            if t > env.now:
+                yield env.timeout(t - env.now)
+            self.admit_er_arrival(is_ambulance, draw)
 
-    def handle_er_arrival(self, delay):
-        yield self.env.timeout(delay)
+    def admit_er_arrival(self, is_ambulance, disposition_draw):
         p = Patient(self.total_patients, self.env.now)
         self.total_patients += 1
         dept = self.departments['ER']
         
-        is_ambulance = random.random() < AMBULANCE_RATE
+        # The disposition uniform is drawn in arrival order with the stream, so
+        # patient k gets the same disposition under any staffing schedule
+        # (common random numbers).
+        p.disposition_draw = disposition_draw
         
         # Check Capacity (Bed + Staff availability implicitly checked by queue size/flow? No, explicit diversion)
         # "if you can not take ambulances they will need to be diverted"
@@ -92,38 +158,39 @@ class HospitalSimulation:
         free_beds, _ = dept.get_available_resources()
         
         if is_ambulance and free_beds <= 0:
-            dept.total_diversion_cost += COSTS['ER']['Diversion']
-            p.status = 'Diverted'
+            dept.total_diversion_cost += self.config.costs['ER']['Diversion']
+            p.status = DIVERTED
+            if self.metrics is not None:
+                self.metrics.record_diversion(self.env.now)
             return
 
         dept.log_patient_entry(p)
-        
+        self.process(self.handle_er_arrival(p))
+
+    def handle_er_arrival(self, p, treatment_hours=1.0):
+        dept = self.departments['ER']
         with dept.beds.request() as bed_req, dept.staff.request() as staff_req:
             yield bed_req & staff_req
             dept.admit_patient(p)
-            yield self.env.timeout(1.0) # Treatment
+            yield self.env.timeout(treatment_hours) # Treatment
             self.process_er_disposition(p)
             dept.discharge_patient(p)
 
     def process_er_disposition(self, patient):
-        r = random.random()
-        if r < 0.05: target = 'Surgery'
-        elif r < 0.15: target = 'CriticalCare'
-        elif r < 0.35: target = 'StepDown'
-        else: target = 'Home'
+        target = self.config.disposition.value_at(patient.disposition_draw)
         
         if target == 'Home':
-            patient.status = 'Discharged'
+            patient.status = DISCHARGED
         else:
-            self.env.process(self.transfer_patient(patient, target))
+            self.process(self.transfer_patient(patient, target))
 
-    def transfer_patient(self, patient, target_name):
+    def transfer_patient(self, patient, target_name, penalty=True):
         target_dept = self.departments[target_name]
         
-        # Arrivals Waiting Penalty Logic
+        # Arrivals Waiting Penalty Logic (penalty=False: already-arrived census patients)
         free_beds, free_staff = target_dept.get_available_resources()
-        if free_beds <= 0 or free_staff <= 0:
-            target_dept.total_wait_cost += COSTS[target_name]['Wait']
+        if penalty and (free_beds <= 0 or free_staff <= 0):
+            target_dept.total_wait_cost += self.config.wait_cost[target_name]
             
         target_dept.log_patient_entry(patient)
         
@@ -133,102 +200,104 @@ class HospitalSimulation:
             
             # Wait for Transfer Event
             patient.transfer_event = self.env.event()
+            target_dept.mark_transfer_ready(patient)
             yield patient.transfer_event
             
             target_dept.discharge_patient(patient)
 
     def direct_arrival_generator(self):
+        stream = self.arrivals
+        direct_entry = [(j, name) for j, name in enumerate(stream.direct_departments) if name in self.departments]
+        counts = stream.direct_counts[:self.duration].tolist()
         for hour in range(self.duration):
-            for dept_name, pmf in DIRECT_ENTRY_RATES.items():
-                if dept_name not in self.departments: continue
-                
-                vals = list(pmf.keys())
-                weights = list(pmf.values())
-                count = random.choices(vals, weights=weights, k=1)[0]
-                
-                for _ in range(count):
+            for j, dept_name in direct_entry:
+                for _ in range(counts[hour][j]):
                     p = Patient(self.total_patients, self.env.now)
                     self.total_patients += 1
-                    self.env.process(self.transfer_patient(p, dept_name))
+                    self.process(self.transfer_patient(p, dept_name))
             yield self.env.timeout(1.0)
 
     def transfer_manager(self):
+        transfers = self.config.transfers # Pathways with their move-count PMFs
+        departures = self.config.step_down_departures
         while True:
             yield self.env.timeout(1.0)
             
-            # Pathways
-            pathways = [('Surgery', 'CriticalCare'), ('Surgery', 'StepDown'), ('CriticalCare', 'StepDown')]
-            for src, dst in pathways:
-                pmf = TRANSFER_RATES.get((src, dst), {})
-                if not pmf: continue
-                vals, weights = list(pmf.keys()), list(pmf.values())
-                count = random.choices(vals, weights=weights, k=1)[0]
+            for src, dst, dist in transfers:
+                count = dist.sample(self.transfer_rng)
                 
-                src_dept = self.departments[src]
-                candidates = [p for p in src_dept.active_patients if hasattr(p, 'transfer_event') and not p.transfer_event.triggered]
-                to_move = candidates[:count]
-                for p in to_move:
+                for p in self.departments[src].take_transfer_ready(count):
                     p.transfer_event.succeed(value=dst)
-                    self.env.process(self.transfer_patient(p, dst))
+                    self.process(self.transfer_patient(p, dst))
             
             # Step Down -> Home
-            pmf = STEP_DOWN_DEPARTURE_RATES
-            vals, weights = list(pmf.keys()), list(pmf.values())
-            count = random.choices(vals, weights=weights, k=1)[0]
-            sd_dept = self.departments['StepDown']
-            candidates = [p for p in sd_dept.active_patients if hasattr(p, 'transfer_event') and not p.transfer_event.triggered]
-            to_go_home = candidates[:count]
-            for p in to_go_home:
+            count = departures.sample(self.transfer_rng)
+            for p in self.departments['StepDown'].take_transfer_ready(count):
                 p.transfer_event.succeed(value='Home')
-                p.status = 'Discharged'
+                p.status = DISCHARGED
 
     def random_event_manager(self):
         while True:
-            delay = random.randint(2, 4)
+            delay = int(self.event_rng.integers(2, 5))
             yield self.env.timeout(delay)
             
-            dept_name = random.choice(['ER', 'Surgery', 'CriticalCare', 'StepDown'])
+            dept_name = DEPTS[self.event_rng.integers(len(DEPTS))]
             dept = self.departments[dept_name]
             
             event_type = 'staff_leave'
             duration = 1
             
             if dept_name == 'ER':
-                 if random.random() < 0.5: duration = max(1, 24 - (self.env.now % 24))
+                 if self.event_rng.random() < 0.5: duration = max(1, 24 - (self.env.now % 24))
             elif dept_name == 'Surgery': event_type = 'room_close'
             elif dept_name == 'CriticalCare': event_type = 'room_close'
             elif dept_name == 'StepDown':
-                 if random.random() < 0.5: duration = max(1, 24 - (self.env.now % 24))
+                 if self.event_rng.random() < 0.5: duration = max(1, 24 - (self.env.now % 24))
             
             dept.apply_event_effect(event_type, duration)
 
     def hourly_staff_manager(self):
         """Updates staff levels based on schedule and calculates costs."""
-        total_regular_staff = sum(INITIAL_STAFF.values()) # 61
+        initial_staff = self.config.initial_staff
+        total_regular_staff = self.config.total_regular_staff # 61
         
-        for hour in range(self.duration):
+        for hour in range(self.start_hour, self.start_hour + self.duration):
+            if hour != self.start_hour and hour % 24 == 0:
+                self._close_day()
+            
             # 1. Determine Target Staffing
             current_targets = {}
-            if self.staffing_schedule and hour in self.staffing_schedule:
-                current_targets = self.staffing_schedule[hour]
+            key = hour % 24 if self.periodic_schedule else hour
+            if self.staffing_schedule and key in self.staffing_schedule:
+                current_targets = self.staffing_schedule[key]
             else:
                 # Default: Initial or Previous? Default to Initial to be safe/consistent
-                current_targets = INITIAL_STAFF # Or self.initial_staff_counts
+                current_targets = initial_staff # Or self.initial_staff_counts
+            
+            if self.policy is not None:
+                scheduled = [current_targets.get(name, initial_staff[name]) for name in DEPTS]
+                levels = self.policy(hour, self.state_snapshot(), scheduled)
+                if levels is not None:
+                    if isinstance(levels, dict):
+                        levels = [levels.get(name, level) for name, level in zip(DEPTS, scheduled)]
+                    current_targets = {name: max(0, int(level)) for name, level in zip(DEPTS, levels)}
             
             # 2. Apply to Departments
             total_target_needed = 0
             for name, dept in self.departments.items():
-                target = current_targets.get(name, INITIAL_STAFF[name])
+                target = current_targets.get(name, initial_staff[name])
                 dept.set_staff_level(target)
                 total_target_needed += target
             
             # 3. Calculate Temp Staff Costs
             temps_needed = max(0, total_target_needed - total_regular_staff)
+            rate = float(self.config.temp_staff_rate([current_targets.get(name, initial_staff[name]) for name in DEPTS],
+                                                     DEPTS)) if temps_needed else 0.0
             
             # Setup Cost (if increased)
             if temps_needed > self.last_hour_temps:
                 new_hires = temps_needed - self.last_hour_temps
-                self.total_staff_setup_cost += new_hires * 40 # Assuming 40 is hiring cost/setup?
+                self.total_staff_setup_cost += new_hires * rate # ExtraStaff cost of the setup hour
                 # "Temporary Extra staff... cost is 40... wait/setup"
                 # "Extra Staff: 40" in Costs table.
                 # Assuming 40 per hour AND 40 for setup logic?
@@ -237,12 +306,42 @@ class HospitalSimulation:
                 # So yes, 1*40 setup + 2*40 work = 120.
                 
             # Hourly Work Cost
-            self.total_staff_hourly_cost += temps_needed * 40
+            self.total_staff_hourly_cost += temps_needed * rate
+            
+            if self.metrics is not None:
+                setup = max(0, temps_needed - self.last_hour_temps) * rate
+                self.metrics.record_staff_cost(self.env.now, setup + temps_needed * rate)
+                self.metrics.sample(self.env.now, self.departments)
+            if self.profiler is not None:
+                self.profiler.sample(self.env.now, self.departments)
             
             self.last_hour_temps = temps_needed
             
             yield self.env.timeout(1.0)
 
+    def state_snapshot(self):
+        """
+        Read-only (4, len(STATE_FIELDS)) array: per department (DEPTS order)
+        queue length, patients in treatment or awaiting transfer, staff level,
+        staff on leave, closed rooms and beds. Refilled in place each call.
+        """
+        self._state[:] = [(len(d.queue), len(d.active_patients), d.staff_limit, d.staff_reduction,
+                           d.closed_rooms, d.capacity_limit)
+                          for d in (self.departments[name] for name in DEPTS)]
+        return self._state_view
+
+    def process(self, generator):
+        """env.process, through the profiler when one is attached."""
+        if self.profiler is not None:
+            generator = self.profiler.wrap(self.env, generator)
+        return self.env.process(generator)
+
+    def _close_day(self):
+        """Records the cost accrued since the previous day boundary."""
+        self.calculate_total_cost()
+        self.daily_costs.append(self.total_cost - self._cost_at_day_start)
+        self._cost_at_day_start = self.total_cost
+
     def calculate_total_cost(self):
         total = self.total_staff_setup_cost + self.total_staff_hourly_cost
         for name, dept in self.departments.items():
@@ -0,0 +1,182 @@
+import contextlib
+import io
+import multiprocessing
+import traceback
+import numpy as np
+from .optimizer import StaffingOptimizer, GENERATIONS, MUTATION_RATE
+
+# Island-model GA: K StaffingOptimizers evolve separately and pass their
+# best schedules around a ring every `migration_interval` generations.
+# Islands only wait for their neighbour at migration points, so with one
+# process per island the GA generations run in parallel.
+
+N_ISLANDS = 4
+MIGRATION_INTERVAL = 5
+MIGRANTS = 2
+# Mutation rate multipliers, cycled over the islands: some explore, some exploit
+ISLAND_MUTATION_SCALES = (1.0, 0.5, 2.0, 3.0)
+
+def island_seed(seed, island):
+    """Master seed of one island, derived from the island-model seed."""
+    return int(np.random.SeedSequence([seed, island]).generate_state(1)[0])
+
+def _migration_due(generation, interval, generations):
+    return (generation + 1) % interval == 0 and generation + 1 < generations
+
+def _emigrants(optimizer, count):
+    # Best schedules seen by the island so far
+    return np.array([tc[1] for tc in optimizer.top_contenders[:count]])
+
+def _island_worker(index, settings, interval, migrants, inbox, outbox, results):
+    """Process entry point: one island, exchanging migrants through queues."""
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            optimizer = StaffingOptimizer(**settings)
+            for stats in optimizer.iterate():
+                results.put(('generation', index, stats))
+                if _migration_due(stats['generation'], interval, optimizer.generations):
+                    outbox.put(_emigrants(optimizer, migrants))
+                    optimizer.immigrate(inbox.get())
+        results.put(('done', index, (optimizer.top_contenders, optimizer.simulations_run)))
+    except Exception:
+        results.put(('error', index, traceback.format_exc()))
+
+class IslandOptimizer:
+    """
+    Island-model StaffingOptimizer.
+
+    Each island is a StaffingOptimizer with its own seed and settings; after
+    every `migration_interval` generations each island sends its `migrants`
+    best schedules to the next island on a ring and takes in its
+    predecessor's in place of its worst children. The islands' top
+    contenders then go through the usual final validation.
+
+    Migration is synchronous, so a run is reproducible for a given seed and
+    gives the same result with or without processes.
+    """
+    def __init__(self, n_islands=N_ISLANDS, migration_interval=MIGRATION_INTERVAL, migrants=MIGRANTS,
+                 island_settings=None, processes=True, seed=None, **settings):
+        """
+        n_islands: Number of sub-populations.
+        migration_interval: Generations between migrations.
+        migrants: Schedules sent to the next island at each migration.
+        island_settings: Per-island StaffingOptimizer overrides (list of
+                dicts, cycled). None gives the islands mutation rates of
+                ISLAND_MUTATION_SCALES x mutation_rate.
+        processes: Run every island in its own process (True) or step them
+                in turn in this process (False).
+        seed: Master seed; island i uses island_seed(seed, i).
+        settings: StaffingOptimizer arguments shared by every island and the
+                final validation (population_size is per island). An island
+                cannot share a FitnessCache object or executor with the
+                others; cache=True gives each island its own.
+        """
+        if n_islands < 1 or migration_interval < 1:
+            raise ValueError("n_islands and migration_interval must be at least 1")
+        for name in ('executor', 'checkpoint'):
+            if settings.get(name) is not None:
+                raise ValueError(f"IslandOptimizer does not support {name}")
+        if settings.get('cache') not in (None, True, False):
+            raise ValueError("Islands keep their own caches: pass cache=True")
+        if seed is None:
+            seed = int(np.random.SeedSequence().generate_state(1)[0])
+        self.seed = seed
+        self.n_islands = n_islands
+        self.migration_interval = migration_interval
+        self.migrants = migrants
+        self.processes = processes
+        self.settings = settings
+        if island_settings is None:
+            rate = settings.get('mutation_rate', MUTATION_RATE)
+            island_settings = [{'mutation_rate': rate * scale} for scale in ISLAND_MUTATION_SCALES]
+        self.island_settings = [dict(settings, n_workers=1, seed=island_seed(seed, i),
+                                     **island_settings[i % len(island_settings)])
+                                for i in range(n_islands)]
+        self.generations = settings.get('generations', GENERATIONS)
+        self.history = [] # Per-generation statistics, with an 'island' key
+        self.simulations_run = 0
+        self.best_solution = None
+        self.best_cost = float('inf')
+
+    def run(self, callback=None):
+        """
+        Evolves the islands, then validates their pooled top contenders.
+        callback: Called with every island's per-generation statistics
+                  (StaffingOptimizer.iterate, plus 'island') as they arrive.
+        Returns (best schedule, validated cost).
+        """
+        print(f"Starting island optimization: {self.n_islands} islands x {self.generations} generations, "
+              f"{self.migrants} migrants every {self.migration_interval} generations...")
+        results = self._run_processes(callback) if self.processes else self._run_in_process(callback)
+
+        contenders = {}
+        for top_contenders, simulations in results:
+            self.simulations_run += simulations
+            for cost, schedule, key in top_contenders:
+                if key not in contenders or cost < contenders[key][0]:
+                    contenders[key] = (cost, schedule, key)
+        best = sorted(contenders.values(), key=lambda tc: tc[0])[:5]
+        leader = min(self.history, key=lambda stats: stats['best_cost'])
+        print(f"Best GA cost: {leader['best_cost']:,.2f} (island {leader['island']}, generation {leader['generation']})")
+
+        # Final validation with the shared settings and the master seed
+        validator = StaffingOptimizer(**dict(self.settings, seed=self.seed))
+        validator.top_contenders = best
+        try:
+            self.best_solution, self.best_cost = validator.validate()
+        finally:
+            validator.close()
+        self.simulations_run += validator.simulations_run
+        print(f"Simulations run across islands and validation: {self.simulations_run:,}")
+        return self.best_solution, self.best_cost
+
+    def _record(self, island, stats, callback):
+        stats = dict(stats, island=island)
+        self.history.append(stats)
+        if callback is not None:
+            callback(stats)
+
+    def _run_in_process(self, callback):
+        optimizers = [StaffingOptimizer(**s) for s in self.island_settings]
+        with contextlib.redirect_stdout(io.StringIO()):
+            runs = [opt.iterate() for opt in optimizers]
+            for gen in range(self.generations):
+                for i, run in enumerate(runs):
+                    self._record(i, next(run), callback)
+                if _migration_due(gen, self.migration_interval, self.generations):
+                    outgoing = [_emigrants(opt, self.migrants) for opt in optimizers]
+                    for i, opt in enumerate(optimizers):
+                        opt.immigrate(outgoing[i - 1])
+            for run in runs:
+                next(run, None)
+        for opt in optimizers:
+            opt.close()
+        return [(opt.top_contenders, opt.simulations_run) for opt in optimizers]
+
+    def _run_processes(self, callback):
+        context = multiprocessing.get_context()
+        inboxes = [context.Queue() for _ in range(self.n_islands)]
+        results = context.Queue()
+        workers = [context.Process(target=_island_worker,
+                                   args=(i, settings, self.migration_interval, self.migrants,
+                                         inboxes[i], inboxes[(i + 1) % self.n_islands], results),
+                                   daemon=True)
+                   for i, settings in enumerate(self.island_settings)]
+        for worker in workers:
+            worker.start()
+        finished = [None] * self.n_islands
+        try:
+            while any(f is None for f in finished):
+                kind, island, payload = results.get()
+                if kind == 'generation':
+                    self._record(island, payload, callback)
+                elif kind == 'done':
+                    finished[island] = payload
+                else:
+                    raise RuntimeError(f"Island {island} failed:\n{payload}")
+        finally:
+            for worker in workers:
+                if worker.is_alive() and any(f is None for f in finished):
+                    worker.terminate()
+                worker.join()
+        return finished
@@ -0,0 +1,102 @@
+import math
+from .config import DEPTS
+
+class OnlineStat:
+    """Count / mean / variance / min / max of a stream of values in O(1) memory."""
+    __slots__ = ('count', 'mean', 'm2', 'min', 'max', 'total')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.total = 0.0
+
+    def push(self, x):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+        self.total += x
+        if x < self.min:
+            self.min = x
+        if x > self.max:
+            self.max = x
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    def __repr__(self):
+        return f"OnlineStat(n={self.count}, mean={self.mean:.3f}, std={self.std:.3f})"
+
+class MetricsCollector:
+    """
+    Streaming per-department and per-hour-of-day metrics for a simulation.
+
+    Memory is fixed (a few accumulators per department x 24 hours), so it
+    does not grow with the horizon or the number of patients.
+      wait        hours waited per admitted patient (by hour of admission)
+      queue       queue length, sampled at the start of each hour
+      occupancy   patients in treatment, sampled at the start of each hour
+      diversions  ambulances diverted (by hour)
+      staff_cost  temporary staff cost (hospital-wide, by hour)
+    """
+    METRICS = ('wait', 'queue', 'occupancy')
+
+    def __init__(self):
+        self.by_dept = {d: {m: OnlineStat() for m in self.METRICS} for d in DEPTS}
+        self.by_hour = {d: {m: [OnlineStat() for _ in range(24)] for m in self.METRICS} for d in DEPTS}
+        self.diversions = [0] * 24
+        self.staff_cost = [0.0] * 24
+
+    def record_wait(self, dept, now, hours):
+        self.by_dept[dept]['wait'].push(hours)
+        self.by_hour[dept]['wait'][int(now) % 24].push(hours)
+
+    def record_diversion(self, now):
+        self.diversions[int(now) % 24] += 1
+
+    def record_staff_cost(self, now, cost):
+        self.staff_cost[int(now) % 24] += cost
+
+    def sample(self, now, departments):
+        """Hourly snapshot of queue lengths and occupancy."""
+        hour = int(now) % 24
+        for name, dept in departments.items():
+            queue = len(dept.queue)
+            occupancy = len(dept.active_patients)
+            self.by_dept[name]['queue'].push(queue)
+            self.by_dept[name]['occupancy'].push(occupancy)
+            self.by_hour[name]['queue'][hour].push(queue)
+            self.by_hour[name]['occupancy'][hour].push(occupancy)
+
+    def summary(self):
+        """{dept: {metric: {'count', 'mean', 'std', 'max'}}} plus hospital totals."""
+        out = {}
+        for d, metrics in self.by_dept.items():
+            out[d] = {m: {'count': s.count, 'mean': s.mean, 'std': s.std, 'max': s.max if s.count else 0.0}
+                      for m, s in metrics.items()}
+        out['Hospital'] = {'diversions': sum(self.diversions), 'staff_cost': sum(self.staff_cost)}
+        return out
+
+    def hourly_frame(self):
+        """Tidy pandas DataFrame: one row per (department, hour, metric)."""
+        import pandas as pd
+        rows = []
+        for d, metrics in self.by_hour.items():
+            for m, stats in metrics.items():
+                for hour, s in enumerate(stats):
+                    rows.append({'department': d, 'hour': hour, 'metric': m,
+                                 'count': s.count, 'mean': s.mean, 'std': s.std})
+        for hour in range(24):
+            rows.append({'department': 'Hospital', 'hour': hour, 'metric': 'diversions',
+                         'count': self.diversions[hour], 'mean': float(self.diversions[hour]), 'std': 0.0})
+            rows.append({'department': 'Hospital', 'hour': hour, 'metric': 'staff_cost',
+                         'count': 1, 'mean': self.staff_cost[hour], 'std': 0.0})
+        return pd.DataFrame(rows)
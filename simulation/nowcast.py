@@ -0,0 +1,151 @@
+import numpy as np
+from .config import DEPTS
+from .patient import Patient
+
+# Rolling-horizon "nowcasts": short HospitalSimulation runs that start at
+# the current clock hour from the hospital's actual state instead of from
+# an empty hospital at midnight, e.g. to compare staffing for the next few
+# hours. HospitalSimulation(census=...) and BatchHospitalSimulation(census=...)
+# start from a HospitalCensus; nowcast() runs many replications of it.
+
+NOWCAST_HOURS = 8
+NOWCAST_REPLICATIONS = 300
+
+class HospitalCensus:
+    """
+    State of the hospital at the start of clock hour `hour`.
+
+    waiting: {dept: patients queued}
+    in_treatment: {dept: patients holding a bed and staff}. ER patients
+            finish their treatment spread evenly over the coming hour; other
+            departments' patients are ready for transfer.
+    closed_rooms / staff_leave: {dept: remaining hours of each closure or
+            leave (list), or a count of ones that end within the hour}
+    last_hour_temps: Temporary staff working the previous hour (no new
+            setup cost for keeping them).
+    Raises ValueError for an hour outside 0-23, an unknown department,
+    a negative count or a non-positive remaining duration.
+    """
+    def __init__(self, hour, waiting=None, in_treatment=None, closed_rooms=None, staff_leave=None,
+                 last_hour_temps=0):
+        if not isinstance(hour, (int, np.integer)) or not 0 <= hour < 24:
+            raise ValueError(f"Census hour must be an integer clock hour 0-23, got {hour!r}")
+        self.hour = int(hour)
+        self.waiting = self._counts('waiting', waiting)
+        self.in_treatment = self._counts('in_treatment', in_treatment)
+        self.closed_rooms = self._durations('closed_rooms', closed_rooms)
+        self.staff_leave = self._durations('staff_leave', staff_leave)
+        self.last_hour_temps = self._count('last_hour_temps', last_hour_temps)
+
+    @staticmethod
+    def _count(name, value):
+        if not isinstance(value, (int, np.integer)) or value < 0:
+            raise ValueError(f"{name} must be a non-negative integer, got {value!r}")
+        return int(value)
+
+    @staticmethod
+    def _depts(name, mapping):
+        unknown = set(mapping or {}) - set(DEPTS)
+        if unknown:
+            raise ValueError(f"Unknown department(s) in {name}: {sorted(map(str, unknown))}; expected {DEPTS}")
+        return dict(mapping or {})
+
+    @classmethod
+    def _counts(cls, name, counts):
+        return {dept: cls._count(f"{name}[{dept!r}]", count) for dept, count in cls._depts(name, counts).items()}
+
+    @classmethod
+    def _durations(cls, name, events):
+        durations = {}
+        for dept, hours in cls._depts(name, events).items():
+            if isinstance(hours, (int, np.integer)):
+                hours = [1] * cls._count(f"{name}[{dept!r}]", hours)
+            hours = list(hours)
+            if any(not h > 0 for h in hours):
+                raise ValueError(f"{name}[{dept!r}] remaining hours must be positive, got {hours}")
+            durations[dept] = hours
+        return durations
+
+    def apply(self, sim):
+        """Puts the census into `sim` before its processes start (called by HospitalSimulation.run)."""
+        # Patients in treatment take their bed and staff first: leave that
+        # started while they were being treated did not interrupt them.
+        for name, count in self.in_treatment.items():
+            dept = sim.departments[name]
+            for i in range(count):
+                patient = self._new_patient(sim)
+                dept.log_patient_entry(patient)
+                requests = (dept.beds.request(), dept.staff.request())
+                remaining = (i + 1) / count if name == 'ER' else None
+                sim.process(self._treatment(sim, dept, patient, requests, remaining))
+        for name, hours in self.closed_rooms.items():
+            for h in hours:
+                sim.departments[name].apply_event_effect('room_close', h)
+        for name, hours in self.staff_leave.items():
+            for h in hours:
+                sim.departments[name].apply_event_effect('staff_leave', h)
+        for name, count in self.waiting.items():
+            for _ in range(count):
+                patient = self._new_patient(sim)
+                if name == 'ER':
+                    sim.departments['ER'].log_patient_entry(patient)
+                    sim.process(sim.handle_er_arrival(patient))
+                else:
+                    sim.process(sim.transfer_patient(patient, name, penalty=False))
+
+    @staticmethod
+    def _new_patient(sim):
+        patient = Patient(sim.total_patients, sim.env.now)
+        patient.disposition_draw = sim.disposition_rng.random()
+        sim.total_patients += 1
+        return patient
+
+    @staticmethod
+    def _treatment(sim, dept, patient, requests, remaining):
+        bed_req, staff_req = requests
+        with bed_req, staff_req:
+            yield bed_req & staff_req
+            dept.admit_patient(patient)
+            if remaining is not None:
+                yield sim.env.timeout(remaining)
+                sim.process_er_disposition(patient)
+            else:
+                patient.transfer_event = sim.env.event()
+                dept.mark_transfer_ready(patient)
+                yield patient.transfer_event
+            dept.discharge_patient(patient)
+
+    def __repr__(self):
+        return (f"HospitalCensus(hour={self.hour}, waiting={self.waiting}, in_treatment={self.in_treatment}, "
+                f"closed_rooms={self.closed_rooms}, staff_leave={self.staff_leave}, "
+                f"last_hour_temps={self.last_hour_temps})")
+
+def nowcast(census, staffing_schedule=None, hours=NOWCAST_HOURS, replications=NOWCAST_REPLICATIONS, seed=None,
+            params=None, engine='batch', policy=None):
+    """
+    Costs of `replications` runs of the next `hours` hours from `census`
+    under `staffing_schedule` ({hour of day: {dept: count}} or (24, 4)
+    array, None = INITIAL_STAFF). Returns an array.
+    engine: 'batch' (one vectorized BatchHospitalSimulation, the default:
+            a few hundred replications take milliseconds) or 'simpy'
+            (HospitalSimulation per replication, seed (seed, r); needed
+            for `policy`).
+    The same seed gives every schedule the same patients.
+    """
+    if engine not in ('simpy', 'batch'):
+        raise ValueError(f"Unknown engine: {engine}")
+    if policy is not None and engine != 'simpy':
+        raise ValueError("Staffing policies need engine='simpy'")
+    if seed is None:
+        seed = int(np.random.SeedSequence().generate_state(1)[0])
+    if engine == 'batch':
+        from .batch import BatchHospitalSimulation
+        return BatchHospitalSimulation(replications, staffing_schedule, duration_hours=hours, seed=seed,
+                                       params=params, census=census).run()
+    from .hospital import HospitalSimulation
+    from .optimizer import array_to_schedule
+    if staffing_schedule is not None and not isinstance(staffing_schedule, dict):
+        staffing_schedule = array_to_schedule(np.asarray(staffing_schedule))
+    return np.array([HospitalSimulation(duration_hours=hours, staffing_schedule=staffing_schedule, seed=(seed, r),
+                                        params=params, policy=policy, census=census).run()
+                     for r in range(replications)])
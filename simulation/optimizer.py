@@ -1,8 +1,14 @@
 
-import random
-import copy
-from .config import INITIAL_STAFF
+from concurrent.futures import ProcessPoolExecutor
+from .config import DEPTS, INITIAL_STAFF
 from .hospital import HospitalSimulation
+from .batch import BatchHospitalSimulation
+from .cache import FitnessCache, FitnessStats, PrefixStateCache, config_fingerprint
+from .selection import race, RACE_INITIAL_REPLICATIONS, RACE_CONFIDENCE
+from .surrogate import SurrogateModel, SURROGATE_POOL_FACTOR, spearman
+from .approximate import FluidModel, approximate_cost, local_search
+from .checkpoint import save_checkpoint, load_checkpoint, pack_keys, unpack_keys
+from .steady_state import check_drift
 import numpy as np
 
 # Genetic Algorithm Parameters defaults
@@ -11,145 +17,790 @@ POPULATION_SIZE = 5
 GENERATIONS = 100
 MUTATION_RATE = 0.1
 ELITISM = 2
+EVAL_ITERATIONS = 5
+VALIDATION_ITERATIONS = 100
+WARM_START_POOL = 20
+
+HOURS = 24
+
+# Schedules are (24, 4) int arrays (hour x DEPTS); a population is (P, 24, 4).
+def schedule_to_array(schedule):
+    """{hour: {dept: count}} dict (or array) -> (24, 4) int array."""
+    if isinstance(schedule, dict):
+        return np.array([[schedule[h][d] for d in DEPTS] for h in range(HOURS)], dtype=np.int64)
+    return np.asarray(schedule, dtype=np.int64)
+
+def array_to_schedule(grid):
+    """(24, 4) array -> {hour: {dept: count}} dict used by HospitalSimulation."""
+    return {h: {d: int(grid[h, i]) for i, d in enumerate(DEPTS)} for h in range(HOURS)}
+
+def baseline_array():
+    """INITIAL_STAFF every hour."""
+    return np.tile([INITIAL_STAFF[d] for d in DEPTS], (HOURS, 1)).astype(np.int64)
+
+def encode_schedule(schedule):
+    """Packs a schedule (dict or array) into 192 bytes (24 x 4 int16)."""
+    return schedule_to_array(schedule).astype(np.int16).tobytes()
+
+def decode_schedule(blob):
+    """Inverse of encode_schedule, as a dict."""
+    grid = np.frombuffer(blob, dtype=np.int16).reshape(HOURS, len(DEPTS))
+    return array_to_schedule(grid)
+
+def _job_seed(master_seed, batch, schedule_index, replication):
+    """Deterministic seed for one (schedule, replication) job."""
+    return (master_seed, batch, schedule_index, replication)
+
+def _optional_float(value):
+    return None if value is None else float(value)
+
+def _run_replication(job):
+    """
+    Worker entry point: simulate one encoded schedule with a fixed seed.
+    Over more than one day it returns the daily costs after warm-up.
+    """
+    blob, seed, days, warmup, params = job
+    sim = HospitalSimulation(duration_hours=days * HOURS, staffing_schedule=decode_schedule(blob), seed=seed,
+                             params=params)
+    sim.run()
+    if days == 1:
+        return sim.total_cost
+    return sim.daily_costs[warmup:]
 
 class StaffingOptimizer:
-    def __init__(self, population_size=POPULATION_SIZE, generations=GENERATIONS, mutation_rate=MUTATION_RATE, elitism=ELITISM):
-        self.depts = ['ER', 'Surgery', 'CriticalCare', 'StepDown']
-        self.hours = 24
+    def __init__(self, population_size=POPULATION_SIZE, generations=GENERATIONS, mutation_rate=MUTATION_RATE, elitism=ELITISM,
+                 n_workers=1, executor=None, seed=None,
+                 crn=False, iterations=EVAL_ITERATIONS, validation_iterations=VALIDATION_ITERATIONS,
+                 engine='simpy', cache=None, cache_max_replications=None,
+                 selection='fixed', confidence=RACE_CONFIDENCE, indifference=0.0,
+                 horizon_days=1, warmup_days=0, params=None,
+                 surrogate=None, surrogate_pool=SURROGATE_POOL_FACTOR,
+                 warm_start=False, warm_start_pool=WARM_START_POOL,
+                 checkpoint=None, checkpoint_every=1, prefix_cache=None):
+        """
+        n_workers: Size of the process pool used for fitness evaluation (1 = serial).
+        executor: Optional concurrent.futures.Executor to use instead of an owned pool.
+        seed: Master seed. Results are identical for the same seed whatever the
+              number of workers.
+        crn: Common random numbers. Every schedule in an evaluation batch
+             (a generation plus the baseline) replays the same seeds, so cost
+             differences reflect the schedule rather than the noise.
+        iterations: Replications per schedule during the GA.
+        validation_iterations: Replications per contender in final validation.
+        engine: 'simpy' runs HospitalSimulation per replication (optionally
+                on a process pool); 'batch' scores a whole generation in one
+                BatchHospitalSimulation call.
+        cache: FitnessCache (or True for an in-memory one). Schedules seen
+               again (elites, the baseline, duplicate children) add their new
+               replications to the cached running mean instead of starting over.
+        cache_max_replications: Stop simulating a cached schedule during the
+               GA once it has this many replications.
+        selection: 'fixed' gives every schedule the same number of
+               replications; 'ocba' races candidates (simulation.selection),
+               spending at most the fixed budget and stopping once the best is
+               identified with probability `confidence`.
+        indifference: Cost differences smaller than this are not worth resolving.
+        horizon_days: Days per replication, repeating the 24-hour schedule.
+               Above 1, a replication's cost is its mean daily cost after
+               dropping the first `warmup_days` (the model starts empty).
+               A RuntimeWarning is issued (once) if the mean daily cost
+               drifts over the horizon (see simulation.steady_state.drift).
+        params: SimulationConfig or {NAME: value} overrides of
+               simulation.config used for every simulation.
+        surrogate: SurrogateModel (True for a ridge regression, 'fluid' for
+               the calibrated fluid approximation). Each generation
+               draws surrogate_pool times as many children as it needs and
+               only simulates the ones with the lowest predicted cost. The
+               model is trained on every evaluated schedule (and on matching
+               entries already in the fitness cache).
+        surrogate_pool: Children drawn per child simulated when screening.
+        warm_start: Seed the initial population from approximate_cost instead
+               of pure noise: the baseline, the fluid model's local optimum
+               and the best-scoring of warm_start_pool x population_size
+               random schedules.
+        checkpoint: File to save the GA state to every `checkpoint_every`
+               generations (and after the last), for run(resume_from=...).
+        prefix_cache: PrefixStateCache (or True for a new one); needs
+               engine='batch' and crn. Under CRN a generation's schedules
+               share their random numbers, so each one resumes from the
+               state reached by an earlier schedule with the same staff
+               levels up to its first differing hour (e.g. a child and its
+               elite parent) instead of simulating those hours again.
+        """
+        self.depts = list(DEPTS)
+        self.hours = HOURS
         self.best_solution = None
         self.best_cost = float('inf')
         self.population_size = population_size
         self.generations = generations
         self.mutation_rate = mutation_rate
         self.elitism = elitism
+        
+        # Parallel evaluation
+        self.n_workers = n_workers
+        self.executor = executor
+        self._owned_executor = None
+        
+        # Reproducibility: GA draws come from a private RNG and every
+        # simulation job gets its own seed derived from the master seed.
+        if seed is None:
+            seed = int(np.random.SeedSequence().generate_state(1)[0])
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        self._batch_counter = 0
+        
+        # Evaluation settings
+        self.crn = crn
+        self.iterations = iterations
+        self.validation_iterations = validation_iterations
+        self.variance_reduction_history = []
+        if engine not in ('simpy', 'batch'):
+            raise ValueError(f"Unknown engine: {engine}")
+        self.engine = engine
+        
+        # Fitness cache
+        if cache is True:
+            cache = FitnessCache()
+        self.cache = cache if isinstance(cache, FitnessCache) else None
+        self.cache_max_replications = cache_max_replications
+        self.simulations_run = 0
+        
+        # Ranking & selection
+        if selection not in ('fixed', 'ocba'):
+            raise ValueError(f"Unknown selection: {selection}")
+        self.selection = selection
+        self.confidence = confidence
+        self.indifference = indifference
+        
+        # Replication length
+        if not 0 <= warmup_days < horizon_days:
+            raise ValueError("warmup_days must be smaller than horizon_days")
+        self.horizon_days = horizon_days
+        self.warmup_days = warmup_days
+        self._drift_warned = False
+        
+        # Simulation parameters (part of the cache key)
+        self.params = params
+        self._config_fingerprint = config_fingerprint(params)
+        
+        # Surrogate screening of offspring
+        if surrogate is True:
+            surrogate = SurrogateModel(baseline_array())
+        elif surrogate == 'fluid':
+            surrogate = FluidModel(baseline_array(), **self._approximation_args())
+        self.surrogate = surrogate if isinstance(surrogate, SurrogateModel) else None
+        if surrogate_pool < 1:
+            raise ValueError("surrogate_pool must be at least 1")
+        self.surrogate_pool = surrogate_pool
+        self.surrogate_history = [] # Per generation: pool, simulated, rank correlation
+        self._surrogate_pairs = ([], []) # (predicted, simulated) mean cost of screened children
+        self.warm_start = warm_start
+        self.warm_start_pool = warm_start_pool
+        
+        # Checkpointing
+        if checkpoint_every < 1:
+            raise ValueError("checkpoint_every must be at least 1")
+        self.checkpoint = checkpoint
+        self.checkpoint_every = checkpoint_every
+        self._generation = 0
+        self._population = None
+        self.top_contenders = []
+        
+        # Delta evaluation from shared schedule prefixes
+        if prefix_cache is True:
+            prefix_cache = PrefixStateCache()
+        self.prefix_cache = prefix_cache if isinstance(prefix_cache, PrefixStateCache) else None
+        if self.prefix_cache is not None and not (engine == 'batch' and crn):
+            raise ValueError("prefix_cache needs engine='batch' and crn=True")
+        self.prefix_history = [] # Fraction of simulated hours saved, per generation
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Shuts down the process pool owned by this optimizer, if any."""
+        if self._owned_executor is not None:
+            self._owned_executor.shutdown()
+            self._owned_executor = None
+
+    def _get_executor(self):
+        if self.executor is not None:
+            return self.executor
+        if self.n_workers > 1:
+            if self._owned_executor is None:
+                self._owned_executor = ProcessPoolExecutor(max_workers=self.n_workers)
+            return self._owned_executor
+        return None
 
     def generate_random_schedule(self):
-        """Generates a random staffing schedule."""
-        schedule = {}
-        for h in range(self.hours):
-            schedule[h] = {}
-            for dept in self.depts:
-                # Random variation around initial staffing
-                base = INITIAL_STAFF[dept]
-                variation = random.randint(-2, 4) 
-                schedule[h][dept] = max(1, base + variation)
-        return schedule
+        """Generates a random staffing schedule as a (24, 4) array."""
+        return self.generate_random_population(1)[0]
+
+    def generate_random_population(self, size):
+        """(size, 24, 4) schedules: random variation around initial staffing."""
+        variation = self.rng.integers(-2, 5, size=(size, self.hours, len(self.depts)))
+        return np.maximum(1, baseline_array()[None] + variation)
+
+    def _approximation_args(self):
+        return {'duration_hours': self.horizon_days * self.hours, 'warmup_hours': self.warmup_days * self.hours,
+                'params': self.params}
+
+    def initial_population(self):
+        """
+        (population_size, 24, 4) starting schedules with the baseline first;
+        random unless warm_start (see __init__).
+        """
+        population = self.generate_random_population(self.population_size)
+        if self.warm_start:
+            args = self._approximation_args()
+            pool = self.generate_random_population(self.population_size * self.warm_start_pool)
+            ranked = pool[np.argsort(approximate_cost(pool, **args), kind='stable')]
+            seeded, _ = local_search(baseline_array(), **args)
+            population = np.concatenate([population[:1], seeded[None], ranked])[:self.population_size]
+        population[0] = baseline_array()
+        return population
+
     def _get_schedule_hash(self, schedule):
-        """Converts schedule to a hashable tuple to check for uniqueness."""
-        return tuple(tuple(sorted(schedule[h].items())) for h in range(self.hours))
+        """Converts schedule to a hashable key to check for uniqueness."""
+        return schedule_to_array(schedule).astype(np.int16).tobytes()
+
+    def _cache_namespace(self):
+        # Same schedule under a different engine or config is a different entry
+        return (f"{self.engine}|{self.hours}|{self.horizon_days}/{self.warmup_days}|"
+                f"{self._config_fingerprint}|").encode()
 
-    def evaluate(self, schedule, iterations=5):
+    def _cache_key(self, schedule):
+        return self._cache_namespace() + self._get_schedule_hash(schedule)
+
+    def evaluate(self, schedule, iterations=None):
         """Runs simulation multiple times and returns average cost."""
-        costs = []
+        return self.evaluate_many([schedule], iterations)[0]
+
+    def evaluate_many(self, schedules, iterations=None):
+        """
+        Average cost of each schedule over `iterations` replications.
+        All (schedule, replication) jobs are submitted together so a process
+        pool stays busy across the whole batch.
+        """
+        samples = self.simulate_many(schedules, iterations)
         # Run iterations to average out random noise
-        for _ in range(iterations):
-            sim = HospitalSimulation(duration_hours=24, staffing_schedule=schedule)
-            sim.run()
-            costs.append(sim.total_cost)
-        return sum(costs) / len(costs)
+        return [sum(costs) / len(costs) for costs in samples]
+
+    def evaluate_population(self, schedules, replications=None):
+        """
+        Mean cost of every schedule in a (population, 24, 4) array, scored in
+        one pass. Returns an array of shape (population,).
+        """
+        return np.array(self.evaluate_many(schedules, replications))
+
+    def simulate_many(self, schedules, iterations=None):
+        """Per-replication costs: one list of `iterations` costs per schedule."""
+        if iterations is None:
+            iterations = self.iterations
+        batch = self._batch_counter
+        self._batch_counter += 1
+        return self._simulate(schedules, iterations, batch)
+
+    def simulate_counts(self, schedules, counts):
+        """
+        Per-replication costs with counts[i] replications of schedule i
+        (counts may be 0, giving []). Under CRN all schedules share one
+        batch seed, so replication r lines up across schedules whatever
+        their counts.
+        """
+        counts = [int(c) for c in counts] # Python ints keep the counters JSON-serialisable
+        results = [[] for _ in schedules]
+        active = [i for i, c in enumerate(counts) if c > 0]
+        if not active:
+            return results
+        if not self.crn:
+            for count in sorted(set(counts[i] for i in active)):
+                idx = [i for i in active if counts[i] == count]
+                for i, costs in zip(idx, self.simulate_many([schedules[i] for i in idx], count)):
+                    results[i] = costs
+            return results
+        batch = self._batch_counter
+        self._batch_counter += 1
+        if self.engine == 'batch':
+            # Batch streams depend on the replication count: run everyone at
+            # the largest count and keep the first counts[i]
+            top = max(counts[i] for i in active)
+            for i, costs in zip(active, self._simulate([schedules[i] for i in active], top, batch)):
+                results[i] = costs[:counts[i]]
+            return results
+        for count in sorted(set(counts[i] for i in active)):
+            idx = [i for i in active if counts[i] == count]
+            for i, costs in zip(idx, self._simulate([schedules[i] for i in idx], count, batch)):
+                results[i] = costs
+        return results
+
+    def _simulate(self, schedules, iterations, batch):
+        if self.engine == 'batch':
+            return self._simulate_batched(schedules, iterations, batch)
+        
+        jobs = []
+        for i, schedule in enumerate(schedules):
+            blob = encode_schedule(schedule)
+            # Under CRN all schedules in the batch share replication seeds
+            stream = 0 if self.crn else i
+            for r in range(iterations):
+                jobs.append((blob, _job_seed(self.seed, batch, stream, r), self.horizon_days, self.warmup_days,
+                             self.params))
+        
+        self.simulations_run += len(jobs)
+        executor = self._get_executor()
+        if executor is None:
+            costs = [_run_replication(job) for job in jobs]
+        else:
+            chunksize = max(1, len(jobs) // (4 * max(1, self.n_workers)))
+            costs = list(executor.map(_run_replication, jobs, chunksize=chunksize))
+        
+        if self.horizon_days == 1:
+            return [costs[i * iterations:(i + 1) * iterations] for i in range(len(schedules))]
+        daily = np.array(costs, dtype=float).reshape(len(schedules), iterations, -1)
+        return [list(self._horizon_costs(d)) for d in daily]
+
+    def _simulate_batched(self, schedules, iterations, batch):
+        grids = np.stack([schedule_to_array(s) for s in schedules])
+        self.simulations_run += len(grids) * iterations
+        duration = self.horizon_days * self.hours
+        if self.crn:
+            # Same seed for every schedule: replications line up across schedules
+            seed = _job_seed(self.seed, batch, 0, 0)
+            if self.prefix_cache is not None:
+                # Snapshots of earlier batches have other seeds and never match again
+                self.prefix_cache.clear()
+            # Lexicographic order puts schedules sharing long prefixes next to
+            # each other; with a prefix cache each one resumes from the last
+            order = np.lexsort(grids.reshape(len(grids), -1).T[::-1])
+            results = [None] * len(grids)
+            for i in order:
+                results[i] = list(self._batch_costs(BatchHospitalSimulation(
+                    iterations, grids[i], duration_hours=duration, seed=seed, params=self.params,
+                    prefix_cache=self.prefix_cache))[0])
+            return results
+        levels = np.repeat(grids, iterations, axis=0)
+        costs = self._batch_costs(BatchHospitalSimulation(len(levels), levels, duration_hours=duration,
+                                                          seed=_job_seed(self.seed, batch, 0, 0), params=self.params),
+                                  len(grids))
+        return [list(row) for row in costs]
+
+    def _batch_costs(self, sim, n_schedules=1):
+        # Same per-replication costs as simulate_many, one row per schedule
+        costs = sim.run()
+        if self.horizon_days == 1:
+            return costs.reshape(n_schedules, -1)
+        daily = sim.daily_costs[:, self.warmup_days:]
+        return np.array([self._horizon_costs(d) for d in daily.reshape(n_schedules, -1, daily.shape[1])])
+
+    def _horizon_costs(self, daily):
+        """
+        Mean daily cost of each replication from its (replications, days)
+        daily costs after warm-up. Warns (once) if the mean daily cost
+        drifts over the horizon: the model is not stationary, so the
+        horizon mean depends on the horizon length.
+        """
+        if not self._drift_warned:
+            self._drift_warned = check_drift(daily.mean(axis=0), "Mean daily costs over the horizon") is not None
+        return daily.mean(axis=1)
+
+    def evaluate_cached(self, schedules, iterations=None):
+        """
+        Mean costs using the fitness cache: each distinct schedule is simulated
+        once per call (unless capped by cache_max_replications), its new costs
+        are merged into the cache, and the merged mean is returned.
+        Returns (means, samples) where samples[i] holds the fresh costs for
+        schedule i, or None if it was not simulated this call.
+        """
+        if self.cache is None:
+            samples = self.simulate_many(schedules, iterations)
+            return np.array([sum(c) / len(c) for c in samples]), samples
+        
+        keys = [self._cache_key(s) for s in schedules]
+        to_run = {}
+        for i, key in enumerate(keys):
+            if key in to_run:
+                continue
+            stats = self.cache.get(key)
+            capped = (stats is not None and self.cache_max_replications is not None
+                      and stats.count >= self.cache_max_replications)
+            if not capped:
+                to_run[key] = i
+        
+        fresh = {}
+        if to_run:
+            results = self.simulate_many([schedules[i] for i in to_run.values()], iterations)
+            for key, costs in zip(to_run, results):
+                self.cache.update(key, costs)
+                fresh[key] = costs
+        self.cache.flush()
+        
+        means = np.array([self.cache.get(key, count_lookup=False).mean for key in keys])
+        samples = [fresh.get(key) for key in keys]
+        return means, samples
+
+    def race(self, schedules, n0, max_total):
+        """
+        OCBA race over `schedules` (see simulation.selection.race). New costs
+        are also merged into the fitness cache when one is configured.
+        """
+        schedules = list(schedules)
+        result = race(lambda counts: self.simulate_counts(schedules, counts), len(schedules), n0=n0, confidence=self.confidence,
+                      indifference=self.indifference, max_total=max_total)
+        if self.cache is not None:
+            for schedule, costs in zip(schedules, result.samples):
+                self.cache.update(self._cache_key(schedule), costs)
+            self.cache.flush()
+        return result
+
+    @staticmethod
+    def variance_reduction(samples, reference):
+        """
+        Fraction of the variance of (candidate - reference) cost differences
+        removed by pairing replications, compared with independent sampling:
+        1 - Var(X - Y) / (Var(X) + Var(Y)), averaged over candidates.
+        Returns None when it cannot be estimated.
+        """
+        ref = np.asarray(reference, dtype=float)
+        if len(ref) < 2:
+            return None
+        ratios = []
+        for costs in samples:
+            x = np.asarray(costs, dtype=float)
+            independent = x.var(ddof=1) + ref.var(ddof=1)
+            if independent > 0:
+                ratios.append(1 - (x - ref).var(ddof=1) / independent)
+        return float(np.mean(ratios)) if ratios else None
 
     def crossover(self, parent1, parent2):
-        """Uniform Crossover."""
-        child = {}
-        for h in range(self.hours):
-            child[h] = {}
-            for dept in self.depts:
-                if random.random() < 0.5:
-                    child[h][dept] = parent1[h][dept]
-                else:
-                    child[h][dept] = parent2[h][dept]
-        return child
+        """Uniform Crossover. Works on single schedules or stacks of them."""
+        take_first = self.rng.random(np.shape(parent1)) < 0.5
+        return np.where(take_first, parent1, parent2)
 
     def mutate(self, schedule):
-        """Randomly changes staffing levels."""
-        mutated = copy.deepcopy(schedule)
-        for h in range(self.hours):
-            if random.random() < self.mutation_rate:
-                dept = random.choice(self.depts)
-                change = random.choice([-1, 1])
-                mutated[h][dept] = max(1, mutated[h][dept] + change)
-        return mutated
-
-    def run(self):
-        print("Starting Optimization...")
-        # 1. Initialize Population
-        population = [self.generate_random_schedule() for _ in range(self.population_size)]
-        # Add Baseline
-        baseline = {h: INITIAL_STAFF.copy() for h in range(24)}
-        population[0] = baseline
+        """Randomly changes staffing levels (one department, +/-1, per mutated hour)."""
+        mutated = np.array(schedule, copy=True)
+        hours_shape = mutated.shape[:-1]
+        hit = self.rng.random(hours_shape) < self.mutation_rate
+        dept = self.rng.integers(len(self.depts), size=hours_shape)
+        change = self.rng.choice([-1, 1], size=hours_shape)
+        delta = np.zeros_like(mutated)
+        np.put_along_axis(delta, dept[..., None], (change * hit)[..., None], axis=-1)
+        return np.maximum(1, mutated + delta)
+
+    def breed(self, survivors, n_children):
+        """
+        Mutated uniform-crossover children of random survivor pairs. Once the
+        surrogate is ready, surrogate_pool times as many are drawn and the
+        n_children with the lowest predicted cost are kept.
+        Returns (children, predicted costs or None).
+        """
+        screening = self.surrogate is not None and self.surrogate.ready and self.surrogate_pool > 1
+        n_pool = n_children * self.surrogate_pool if screening else n_children
+        p1 = survivors[self.rng.integers(len(survivors), size=n_pool)]
+        p2 = survivors[self.rng.integers(len(survivors), size=n_pool)]
+        pool = self.mutate(self.crossover(p1, p2))
+        if not screening or n_children == 0:
+            return pool, None
+        predicted = self.surrogate.predict(pool)
+        keep = np.argsort(predicted, kind='stable')[:n_children]
+        self.surrogate_history.append({'pool': n_pool, 'simulated': n_children,
+                                       'avoided': (n_pool - n_children) * self.iterations,
+                                       'rank_correlation': None})
+        return pool[keep], predicted[keep]
+
+    def _observe_surrogate(self, candidates, costs, n_elites, predicted):
+        # Train on this generation's results and score last generation's screen
+        self.surrogate.observe(candidates, costs)
+        if predicted is not None:
+            actual = costs[n_elites:n_elites + len(predicted)]
+            self._surrogate_pairs[0].extend(predicted.tolist())
+            self._surrogate_pairs[1].extend(actual.tolist())
+            self.surrogate_history[-1]['rank_correlation'] = spearman(predicted, actual)
+
+    def surrogate_report(self):
+        """
+        How the surrogate did over the run: Spearman rank correlation between
+        predicted and simulated mean costs of every screened child, and the
+        GA simulations it avoided (discarded children x iterations), also as
+        a fraction of what the GA would have run without screening.
+        """
+        avoided = sum(h['avoided'] for h in self.surrogate_history)
+        predicted, actual = self._surrogate_pairs
+        return {'screened_generations': len(self.surrogate_history),
+                'rank_correlation': spearman(predicted, actual),
+                'simulations_avoided': avoided,
+                'fraction_avoided': avoided / (avoided + self.simulations_run) if avoided else 0.0}
+
+    def save_checkpoint(self, path):
+        """
+        Writes the GA state between generations to `path`: population, top
+        contenders, GA RNG state and counters, surrogate observations and
+        this optimizer's fitness cache entries.
+        """
+        namespace = self._cache_namespace()
+        arrays = {'population': self._population.astype(np.int16),
+                  'contender_costs': np.array([tc[0] for tc in self.top_contenders], dtype=float),
+                  'contenders': np.array([tc[1] for tc in self.top_contenders], dtype=np.int16).reshape(
+                      -1, self.hours, len(self.depts))}
+        if self._predicted is not None:
+            arrays['predicted'] = self._predicted
+        if self.cache is not None:
+            entries = list(self.cache.items(namespace))
+            arrays['cache_keys'], arrays['cache_offsets'] = pack_keys([k[len(namespace):] for k, _ in entries])
+            arrays['cache_stats'] = np.array([(s.count, s.mean, s.m2) for _, s in entries], dtype=float).reshape(-1, 3)
+        if self.surrogate is not None:
+            observed = self.surrogate._observed
+            arrays['surrogate_keys'], arrays['surrogate_offsets'] = pack_keys(list(observed))
+            arrays['surrogate_costs'] = np.fromiter(observed.values(), dtype=float, count=len(observed))
+            arrays['surrogate_pairs'] = np.array(self._surrogate_pairs, dtype=float).reshape(2, -1)
+        # Plain ints / floats only: numpy scalars are not JSON-serialisable
+        meta = {'seed': int(self.seed), 'namespace': namespace.decode(), 'generation': int(self._generation),
+                'batch_counter': int(self._batch_counter), 'best_cost': float(self.best_cost),
+                'simulations_run': int(self.simulations_run), 'n_elites': int(self._n_elites),
+                'variance_reduction_history': [_optional_float(r) for r in self.variance_reduction_history],
+                'surrogate_history': [{'pool': int(h['pool']), 'simulated': int(h['simulated']),
+                                       'avoided': int(h['avoided']),
+                                       'rank_correlation': _optional_float(h['rank_correlation'])}
+                                      for h in self.surrogate_history],
+                'prefix_history': [_optional_float(h) for h in self.prefix_history],
+                'rng': self.rng.bit_generator.state}
+        save_checkpoint(path, meta, arrays)
+
+    def _restore_checkpoint(self, path):
+        meta, arrays = load_checkpoint(path)
+        namespace = self._cache_namespace()
+        if meta['seed'] != self.seed or meta['namespace'] != namespace.decode():
+            raise ValueError(f"Checkpoint {path} was written by an optimizer with different settings "
+                             f"(seed {meta['seed']}, {meta['namespace']!r})")
+        self._generation = meta['generation']
+        self._batch_counter = meta['batch_counter']
+        self.best_cost = meta['best_cost']
+        self.simulations_run = meta['simulations_run']
+        self._n_elites = meta['n_elites']
+        self.variance_reduction_history = meta['variance_reduction_history']
+        self.surrogate_history = meta['surrogate_history']
+        self.prefix_history = meta.get('prefix_history', [])
+        self.rng.bit_generator.state = meta['rng']
+        self._population = arrays['population'].astype(np.int64)
+        self._predicted = arrays.get('predicted')
+        self.top_contenders = [(float(cost), grid.astype(np.int64), self._get_schedule_hash(grid))
+                               for cost, grid in zip(arrays['contender_costs'], arrays['contenders'])]
+        if self.cache is not None and 'cache_stats' in arrays:
+            keys = unpack_keys(arrays['cache_keys'], arrays['cache_offsets'])
+            for key, (count, mean, m2) in zip(keys, arrays['cache_stats']):
+                self.cache.set(namespace + key, FitnessStats(int(count), float(mean), float(m2)))
+            self.cache.flush()
+        if self.surrogate is not None and 'surrogate_costs' in arrays:
+            keys = unpack_keys(arrays['surrogate_keys'], arrays['surrogate_offsets'])
+            if keys:
+                grids = np.stack([np.frombuffer(k, dtype=np.int16).reshape(self.hours, len(self.depts)) for k in keys])
+                self.surrogate.observe(grids, arrays['surrogate_costs'])
+            self._surrogate_pairs = tuple(row.tolist() for row in arrays['surrogate_pairs'])
+
+    def run(self, callback=None, resume_from=None):
+        """
+        Runs the GA and the final validation; returns (best schedule, cost).
+        callback: Called with each generation's statistics (see iterate).
+        resume_from: Checkpoint file to continue from (see iterate).
+        """
+        try:
+            for stats in self.iterate(resume_from):
+                if callback is not None:
+                    callback(stats)
+            return self.validate()
+        finally:
+            self.close()
+
+    def iterate(self, resume_from=None):
+        """
+        Runs the GA generations, yielding one dict of statistics per
+        generation as soon as it is scored: generation, best_cost (lowest
+        seen so far), generation_best, generation_mean, baseline_cost,
+        variance_reduction (None without CRN), hours_saved (fraction of
+        hours resumed from the prefix cache, None without one),
+        simulations_run and best_schedule. Call validate() afterwards for the final result.
+
+        resume_from: Checkpoint written by this optimizer's `checkpoint`
+        option; the run continues with the next generation exactly as if it
+        had never stopped (same settings and seed required).
+        """
+        if resume_from is not None:
+            self._restore_checkpoint(resume_from)
+            print(f"Resuming Optimization at generation {self._generation}...")
+        else:
+            print("Starting Optimization...")
+            # 1. Initialize Population
+            self._population = self.initial_population()
+            # Maintain top unique contenders across all generations
+            self.top_contenders = [] # List of tuples: (cost, schedule, hash)
+            self._generation = 0
+            self._n_elites, self._predicted = 0, None
+            if self.surrogate is not None and self.cache is not None:
+                self.surrogate.observe_cache(self.cache, self._cache_namespace())
         
         # Prepare Baseline for comparison
-        baseline_schedule = {h: INITIAL_STAFF.copy() for h in range(24)}
-        
-        # Maintain top unique contenders across all generations
-        top_contenders = [] # List of tuples: (cost, schedule, hash)
+        baseline_schedule = baseline_array()
         
-        for gen in range(self.generations):
-            # 2. Evaluate
-            scored_pop = []
-            for solution in population:
-                cost = self.evaluate(solution)
-                scored_pop.append((cost, solution))
+        for gen in range(self._generation, self.generations):
+            # State is re-read every generation: immigrate() may change it between yields
+            population, top_contenders = self._population, self.top_contenders
+            
+            # 2. Evaluate (population and baseline in one batch)
+            candidates = np.concatenate([population, baseline_schedule[None]])
+            if self.prefix_cache is not None:
+                hours_before = (self.prefix_cache.hours_skipped, self.prefix_cache.hours_simulated)
+            if self.selection == 'ocba':
+                # Same budget as the fixed scheme at most; stops early once
+                # this generation's leader is clear
+                result = self.race(candidates, n0=min(2, self.iterations),
+                                   max_total=len(candidates) * self.iterations)
+                costs, samples = result.means, result.samples
+            else:
+                costs, samples = self.evaluate_cached(candidates)
+            
+            # Baseline for this generation's conditions
+            current_baseline_cost = costs[-1]
+            
+            if self.surrogate is not None:
+                self._observe_surrogate(candidates, costs, self._n_elites, self._predicted)
             
-            # Evaluate Baseline for this generation's conditions
-            current_baseline_cost = self.evaluate(baseline_schedule)
+            crn_note = ""
+            reduction = None
+            if self.crn and samples[-1] is not None:
+                paired = [c for c in samples[:-1] if c is not None and len(c) == len(samples[-1])]
+                reduction = self.variance_reduction(paired, samples[-1])
+                self.variance_reduction_history.append(reduction)
+                if reduction is not None:
+                    crn_note = f" | CRN Variance Reduction = {reduction:.1%}"
             
-            scored_pop.sort(key=lambda x: x[0])
+            hours_saved = None
+            if self.prefix_cache is not None:
+                skipped = self.prefix_cache.hours_skipped - hours_before[0]
+                simulated = self.prefix_cache.hours_simulated - hours_before[1]
+                if skipped + simulated:
+                    hours_saved = skipped / (skipped + simulated)
+                    crn_note += f" | Hours Saved = {hours_saved:.1%}"
+                self.prefix_history.append(hours_saved)
+            
+            order = np.argsort(costs[:-1], kind='stable')
+            population = population[order]
+            pop_costs = costs[:-1][order]
             
             # Update Top Contenders list with unique schedules
-            for cost, schedule in scored_pop:
+            for cost, schedule in zip(pop_costs, population):
                 sched_hash = self._get_schedule_hash(schedule)
                 # Check if it's already in top contenders
-                if not any(tc[2] == sched_hash for tc in top_contenders):
-                    top_contenders.append((cost, schedule, sched_hash))
+                existing = next((j for j, tc in enumerate(top_contenders) if tc[2] == sched_hash), None)
+                if existing is None:
+                    top_contenders.append((float(cost), schedule.copy(), sched_hash))
+                elif self.cache is not None:
+                    # Cached mean now includes more replications
+                    top_contenders[existing] = (float(cost), top_contenders[existing][1], sched_hash)
             
             # Keep only the top 5 unique contenders
             top_contenders.sort(key=lambda x: x[0])
             top_contenders = top_contenders[:5]
             
-            # Update Best cost for print tracking (lowest seen during 5-eval phase)
+            # Update Best cost for print tracking (lowest seen during the GA phase)
             if top_contenders[0][0] < self.best_cost:
                 self.best_cost = top_contenders[0][0]
-                print(f"Generation {gen}: New Best Cost (5-eval) = {self.best_cost:,.2f} | Baseline Cost = {current_baseline_cost:,.2f}")
+                print(f"Generation {gen}: New Best Cost ({self.iterations}-eval) = {self.best_cost:,.2f} | Baseline Cost = {current_baseline_cost:,.2f}{crn_note}")
             else:
-                 print(f"Generation {gen}: Best Cost (5-eval) = {self.best_cost:,.2f} | Baseline Cost = {current_baseline_cost:,.2f}")
+                 print(f"Generation {gen}: Best Cost ({self.iterations}-eval) = {self.best_cost:,.2f} | Baseline Cost = {current_baseline_cost:,.2f}{crn_note}")
+            
+            stats = {'generation': gen, 'best_cost': self.best_cost, 'generation_best': float(pop_costs[0]),
+                     'generation_mean': float(pop_costs.mean()), 'baseline_cost': float(current_baseline_cost),
+                     'variance_reduction': reduction, 'hours_saved': hours_saved, 'simulations_run': self.simulations_run,
+                     'best_schedule': top_contenders[0][1].copy()}
 
             # 3. Selection (Top 50% of the current generation)
-            survivors = scored_pop[:self.population_size//2]
-            
-            # 4. Next Generation
-            new_pop = [s[1] for s in survivors[:self.elitism]] # Elitism
-            
-            while len(new_pop) < self.population_size:
-                p1 = random.choice(survivors)[1]
-                p2 = random.choice(survivors)[1]
-                child = self.crossover(p1, p2)
-                child = self.mutate(child)
-                new_pop.append(child)
+            survivors = population[:self.population_size//2]
             
-            population = new_pop
+            # 4. Next Generation: elites plus mutated uniform-crossover children
+            elites = survivors[:self.elitism]
+            self._n_elites = len(elites)
+            children, self._predicted = self.breed(survivors, self.population_size - self._n_elites)
             
+            population = np.concatenate([elites, children])
+            self._population, self.top_contenders, self._generation = population, top_contenders, gen + 1
+            if self.checkpoint is not None and (self._generation % self.checkpoint_every == 0
+                                                or self._generation == self.generations):
+                self.save_checkpoint(self.checkpoint)
+            yield stats
+
+    def immigrate(self, schedules):
+        """
+        Replaces the last children of the next generation with `schedules`
+        ((k, 24, 4); elites are never replaced). Call between generations,
+        e.g. from a callback or while consuming iterate().
+        """
+        schedules = np.asarray(schedules, dtype=np.int64)
+        k = min(len(schedules), len(self._population) - self._n_elites)
+        if k <= 0:
+            return
+        self._population = self._population.copy()
+        self._population[len(self._population) - k:] = schedules[:k]
+        if self._predicted is not None:
+            # Migrants were not screened: drop their stale predictions
+            self._predicted = self._predicted[:len(self._predicted) - k]
+
+    def validate(self):
+        """Final validation of the GA's top contenders; returns (best schedule, cost)."""
+        top_contenders = self.top_contenders
+        baseline_schedule = baseline_array()
+        
         # --- Final Validation Phase ---
         print("\n--- Starting Final Validation Phase ---")
-        print(f"Validating top {len(top_contenders)} unique schedules across 100 iterations...")
+        print(f"Validating top {len(top_contenders)} unique schedules across {self.validation_iterations} iterations...")
+        
+        # Contenders and baseline (for fair comparison) in one batch.
+        # Fresh replications only: cached GA costs carry selection bias.
+        val_schedules = np.stack([tc[1] for tc in top_contenders] + [baseline_schedule])
+        fixed_budget = len(val_schedules) * self.validation_iterations
+        if self.selection == 'ocba':
+            result = self.race(val_schedules, n0=min(RACE_INITIAL_REPLICATIONS, self.validation_iterations),
+                               max_total=fixed_budget)
+            val_costs, val_counts = list(result.means), list(result.counts)
+            print(f"Racing used {result.total:,} of {fixed_budget:,} simulations (P(correct selection) = {result.pcs:.3f})")
+        else:
+            val_samples = self.simulate_many(val_schedules, iterations=self.validation_iterations)
+            val_costs = [sum(c) / len(c) for c in val_samples]
+            val_counts = [self.validation_iterations] * len(val_schedules)
+            if self.cache is not None:
+                for schedule, costs in zip(val_schedules, val_samples):
+                    self.cache.update(self._cache_key(schedule), costs)
+                self.cache.flush()
         
         validated_results = []
         for i, (old_cost, schedule, _) in enumerate(top_contenders):
-            val_cost = self.evaluate(schedule, iterations=100)
+            val_cost = val_costs[i]
             validated_results.append((val_cost, schedule))
-            print(f"Contender {i+1}: 5-eval Cost = {old_cost:,.2f} -> 100-eval Validation Cost = {val_cost:,.2f}")
+            print(f"Contender {i+1}: {self.iterations}-eval Cost = {old_cost:,.2f} -> {val_counts[i]}-eval Validation Cost = {val_cost:,.2f}")
             
-        # Re-evaluate baseline for fair comparison
-        validated_baseline_cost = self.evaluate(baseline_schedule, iterations=100)
-        print(f"Baseline 100-eval Validation Cost = {validated_baseline_cost:,.2f}")
+        validated_baseline_cost = val_costs[-1]
+        print(f"Baseline {val_counts[-1]}-eval Validation Cost = {validated_baseline_cost:,.2f}")
         
         # Sort by validation cost
         validated_results.sort(key=lambda x: x[0])
         
         self.best_cost = validated_results[0][0]
-        self.best_solution = validated_results[0][1]
+        self.best_solution = array_to_schedule(validated_results[0][1])
         
         print(f"\nValidation Complete. True Best Cost: {self.best_cost:,.2f}")
+        if self.cache is not None:
+            print(f"Simulations run: {self.simulations_run:,} | Fitness cache: {len(self.cache):,} schedules, {self.cache.hits:,} hits")
+        elif self.selection == 'ocba':
+            print(f"Simulations run: {self.simulations_run:,}")
+        if self.surrogate is not None:
+            report = self.surrogate_report()
+            rho = report['rank_correlation']
+            rho = f"{rho:.2f}" if rho is not None else "n/a"
+            print(f"Surrogate: rank correlation {rho} over {report['screened_generations']} screened generations | "
+                  f"{report['simulations_avoided']:,} simulations avoided ({report['fraction_avoided']:.1%})")
             
         return self.best_solution, self.best_cost
 
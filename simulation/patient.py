@@ -1,15 +1,33 @@
 
+# Status codes (integers so moves don't build strings)
+ARRIVED = 0
+WAITING = 1
+IN_TREATMENT = 2
+DISCHARGED = 3
+DIVERTED = 4
+
+STATUS_NAMES = {
+    ARRIVED: 'Arrived',
+    WAITING: 'Waiting',
+    IN_TREATMENT: 'In Treatment',
+    DISCHARGED: 'Discharged',
+    DIVERTED: 'Diverted',
+}
+
 class Patient:
+    __slots__ = ('id', 'arrival_time', 'status', 'location', 'wait_start_time',
+                 'total_wait_time', 'disposition_draw', 'transfer_event')
+
     def __init__(self, p_id, arrival_time):
         self.id = p_id
         self.arrival_time = arrival_time
-        self.status = 'Arrived' # Arrived, Waiting, Treating, Discharged
-        self.history = []
+        self.status = ARRIVED
+        self.location = None # Name of the department the patient is in
         self.wait_start_time = 0
         self.total_wait_time = 0
+        self.disposition_draw = None # Uniform draw deciding where an ER patient goes next
+        self.transfer_event = None # Fires when the patient leaves their current bed
 
-    def log(self, message):
-        self.history.append(message)
-    
     def __repr__(self):
-        return f"Patient({self.id}, {self.status})"
+        where = f" {self.location}" if self.location else ""
+        return f"Patient({self.id}, {STATUS_NAMES[self.status]}{where})"
@@ -0,0 +1,63 @@
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from .config import DEPTS
+
+# Reactive staffing policies for HospitalSimulation(policy=...).
+# Once per hour, before staff levels are applied, the simulation calls
+#     policy(hour, state, scheduled)
+# state: read-only (4, len(STATE_FIELDS)) float array, one row per department
+#        in DEPTS order, refilled in place every hour (copy it to keep it).
+# scheduled: the schedule's levels for this hour as a list in DEPTS order.
+# The policy returns the levels to use (sequence in DEPTS order or
+# {dept: level} dict), or None to keep the schedule. Temporary staff cost
+# follows the levels actually used.
+
+STATE_FIELDS = ('queue', 'occupied', 'staff', 'on_leave', 'closed_rooms', 'beds')
+QUEUE, OCCUPIED, STAFF, ON_LEAVE, CLOSED_ROOMS, BEDS = range(len(STATE_FIELDS))
+
+POLICY_REPLICATIONS = 100
+
+class StaffingPolicy:
+    """
+    Base class for policies that keep state between hours. reset() is called
+    at the start of every run, so one policy object can be evaluated over
+    many replications. Any callable with the same signature also works.
+    """
+    def reset(self):
+        pass
+
+    def __call__(self, hour, state, scheduled):
+        return None
+
+def _run_replication(job):
+    """Worker entry point: one replication under a policy."""
+    from .hospital import HospitalSimulation
+    policy, schedule, seed, hours, params = job
+    return HospitalSimulation(duration_hours=hours, staffing_schedule=schedule, seed=seed, params=params,
+                              policy=policy).run()
+
+def evaluate_policy(policy, replications=POLICY_REPLICATIONS, seed=None, duration_hours=24,
+                    staffing_schedule=None, params=None, n_workers=1, executor=None):
+    """
+    Total cost of `replications` runs under `policy` on top of
+    `staffing_schedule` (None = INITIAL_STAFF). Replication r uses seed
+    (seed, r), so policies evaluated with the same seed see the same
+    patients (common random numbers). Returns an array of costs.
+    n_workers / executor: Process pool, as for StaffingOptimizer.
+    """
+    if seed is None:
+        seed = int(np.random.SeedSequence().generate_state(1)[0])
+    jobs = [(policy, staffing_schedule, (seed, r), duration_hours, params) for r in range(replications)]
+    owned = None
+    if executor is None and n_workers > 1:
+        executor = owned = ProcessPoolExecutor(max_workers=n_workers)
+    try:
+        if executor is None:
+            costs = [_run_replication(job) for job in jobs]
+        else:
+            chunksize = max(1, len(jobs) // (4 * max(1, n_workers)))
+            costs = list(executor.map(_run_replication, jobs, chunksize=chunksize))
+    finally:
+        if owned is not None:
+            owned.shutdown()
+    return np.array(costs)
@@ -0,0 +1,146 @@
+import json
+import time
+from .config import DEPTS
+
+# Simulated hours -> trace microseconds: one simulated hour shows as one second
+TRACE_US_PER_HOUR = 1e6
+
+class ProcessStats:
+    """Counters for one SimPy process type (generator function name)."""
+    __slots__ = ('started', 'finished', 'resumes', 'events', 'wall_time')
+
+    def __init__(self):
+        self.started = 0
+        self.finished = 0
+        self.resumes = 0
+        self.events = 0
+        self.wall_time = 0.0
+
+class SimulationProfiler:
+    """
+    Opt-in instrumentation for HospitalSimulation (profiler=...).
+
+    Every process the simulation starts is wrapped so that each resume of
+    its generator is timed and every event it yields is counted, keyed by
+    the generator's function name (handle_er_arrival, transfer_patient,
+    random_event_manager, ...). Staff-leave blockers, which are timeout
+    callbacks rather than processes, are counted as 'event_blocker'.
+    Queue depths are recorded at the start of every hour.
+
+    With trace=True each process's lifetime (in simulated time) is also kept
+    for export as a Chrome trace-event file (chrome://tracing, Perfetto).
+    """
+    def __init__(self, trace=False):
+        self.trace = trace
+        self.processes = {}
+        self.queue_depths = {d: [] for d in DEPTS}
+        self.hours = []
+        self.end_time = None
+        self._open = {} # id -> (name, start) in simulated hours
+        self._spans = [] # (name, id, start, end)
+        self._next_id = 0
+
+    def _stats(self, name):
+        stats = self.processes.get(name)
+        if stats is None:
+            stats = self.processes[name] = ProcessStats()
+        return stats
+
+    def count(self, name, events=1):
+        """Counts events scheduled outside a process (e.g. timeout callbacks)."""
+        self._stats(name).events += events
+
+    def wrap(self, env, generator):
+        """Instrumented generator to hand to env.process in place of `generator`."""
+        name = generator.__name__
+        stats = self._stats(name)
+        stats.started += 1
+        span_id = None
+        if self.trace:
+            span_id = self._next_id
+            self._next_id += 1
+            self._open[span_id] = (name, env.now)
+        return self._traced(env, generator, stats, span_id)
+
+    def _traced(self, env, generator, stats, span_id):
+        send, value, error = generator.send, None, None
+        while True:
+            t0 = time.perf_counter()
+            try:
+                event = generator.throw(error) if error is not None else send(value)
+            except StopIteration as stop:
+                stats.wall_time += time.perf_counter() - t0
+                stats.resumes += 1
+                stats.finished += 1
+                self._close_span(span_id, env.now)
+                return stop.value
+            stats.wall_time += time.perf_counter() - t0
+            stats.resumes += 1
+            stats.events += 1
+            error = None
+            try:
+                value = yield event
+            except GeneratorExit:
+                generator.close()
+                raise
+            except Exception as exc: # Interrupts are passed on to the process
+                error = exc
+
+    def _close_span(self, span_id, now):
+        if span_id is not None:
+            name, start = self._open.pop(span_id)
+            self._spans.append((name, span_id, start, now))
+
+    def finish(self, now):
+        """Marks the end of the run; processes still open end here in the trace."""
+        self.end_time = now
+
+    def sample(self, now, departments):
+        """Queue length per department at the start of an hour."""
+        self.hours.append(now)
+        for name, dept in departments.items():
+            self.queue_depths[name].append(len(dept.queue))
+
+    def flat_profile(self):
+        """Rows sorted by wall time: one dict per process type."""
+        total = sum(s.wall_time for s in self.processes.values()) or 1.0
+        rows = []
+        for name, s in self.processes.items():
+            rows.append({'process': name, 'started': s.started, 'finished': s.finished,
+                         'resumes': s.resumes, 'events': s.events, 'wall_time': s.wall_time,
+                         'share': s.wall_time / total,
+                         'us_per_resume': s.wall_time / s.resumes * 1e6 if s.resumes else 0.0})
+        return sorted(rows, key=lambda r: r['wall_time'], reverse=True)
+
+    def format_flat_profile(self):
+        lines = [f"{'process':24s} {'started':>9s} {'resumes':>9s} {'events':>9s} {'wall ms':>9s} {'share':>6s} {'us/res':>7s}"]
+        for r in self.flat_profile():
+            lines.append(f"{r['process']:24s} {r['started']:9,d} {r['resumes']:9,d} {r['events']:9,d} "
+                         f"{r['wall_time'] * 1e3:9.2f} {r['share']:6.1%} {r['us_per_resume']:7.2f}")
+        return "\n".join(lines)
+
+    def chrome_trace(self):
+        """
+        Trace-event dict: an async span per process (simulated start to end)
+        on one row per process type, plus queue-depth counters per hour.
+        Processes still running at the end are drawn up to end_time.
+        """
+        spans = list(self._spans)
+        if self.end_time is not None:
+            spans += [(name, i, start, self.end_time) for i, (name, start) in self._open.items()]
+        tids = {name: i + 1 for i, name in enumerate(sorted(self.processes))}
+        events = [{'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': tid, 'args': {'name': name}}
+                  for name, tid in tids.items()]
+        for name, span_id, start, end in spans:
+            common = {'name': name, 'cat': 'process', 'id': span_id, 'pid': 1, 'tid': tids[name]}
+            events.append(dict(common, ph='b', ts=start * TRACE_US_PER_HOUR))
+            events.append(dict(common, ph='e', ts=end * TRACE_US_PER_HOUR))
+        for i, now in enumerate(self.hours):
+            events.append({'name': 'queue', 'ph': 'C', 'pid': 1, 'ts': now * TRACE_US_PER_HOUR,
+                           'args': {d: depths[i] for d, depths in self.queue_depths.items()}})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms',
+                'otherData': {'time_scale': '1 simulated hour = 1 s'}}
+
+    def write_chrome_trace(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.chrome_trace(), f)
@@ -0,0 +1,178 @@
+import json
+import os
+import numpy as np
+from .batch import BatchHospitalSimulation
+from .config import DEPTS
+
+# Per-replication results on disk: an append-only table stored as a
+# directory of chunks, one .npy file per column per chunk, plus a JSON
+# manifest. Rows are buffered and written a chunk at a time (the last,
+# short chunk on close), so millions of replications never need to fit in
+# memory; readers memory-map the chunks, see the buffered rows too, and
+# build pandas frames one chunk (or a few columns) at a time.
+# Schedule and scenario labels are stored as integer codes into the
+# manifest's category lists.
+
+RESULTS_VERSION = 1
+CHUNK_ROWS = 1 << 16
+COST_COLUMNS = tuple(f"wait_{d}" for d in DEPTS) + ('diversion', 'staff', 'total')
+LABEL_COLUMNS = ('schedule', 'scenario')
+COLUMNS = LABEL_COLUMNS + ('seed', 'replication') + COST_COLUMNS
+_DTYPES = {'schedule': np.int32, 'scenario': np.int32, 'seed': np.int64, 'replication': np.int64,
+           **{name: np.float64 for name in COST_COLUMNS}}
+
+def cost_breakdown(sim):
+    """
+    Costs of a finished run in COST_COLUMNS order: a (7,) array for a
+    HospitalSimulation, (n_replications, 7) for a BatchHospitalSimulation.
+    """
+    if isinstance(sim, BatchHospitalSimulation):
+        return np.column_stack([sim.total_wait_cost.T, sim.total_diversion_cost, sim.total_staff_cost,
+                                sim.total_cost])
+    sim.calculate_total_cost()
+    departments = [sim.departments[d] for d in DEPTS]
+    return np.array([d.total_wait_cost for d in departments]
+                    + [sum(d.total_diversion_cost for d in departments),
+                       sim.total_staff_setup_cost + sim.total_staff_hourly_cost, sim.total_cost], dtype=float)
+
+class ResultsStore:
+    """
+    Columnar store of per-replication costs (COLUMNS) in directory `path`.
+    Opening an existing store appends to it.
+
+        with ResultsStore('runs/sweep') as store:
+            store.append_simulation(sim, schedule='ga_best', scenario='base', seed=7, replication=r)
+        df = ResultsStore('runs/sweep').to_frame()
+    """
+    def __init__(self, path, chunk_rows=CHUNK_ROWS):
+        self.path = path
+        self.chunk_rows = chunk_rows
+        os.makedirs(path, exist_ok=True)
+        self._chunks = [] # Rows per chunk written so far
+        self._categories = {name: [] for name in LABEL_COLUMNS}
+        manifest = os.path.join(path, 'manifest.json')
+        if os.path.exists(manifest):
+            with open(manifest) as f:
+                meta = json.load(f)
+            if meta.get('version') != RESULTS_VERSION:
+                raise ValueError(f"Unsupported results store version: {meta.get('version')}")
+            self._chunks = meta['chunks']
+            self._categories = meta['categories']
+        self._codes = {name: {label: i for i, label in enumerate(labels)}
+                       for name, labels in self._categories.items()}
+        self._buffer = {name: [] for name in COLUMNS}
+        self._buffered = 0
+
+    def __len__(self):
+        return sum(self._chunks) + self._buffered
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _code(self, column, label):
+        label = str(label)
+        code = self._codes[column].get(label)
+        if code is None:
+            code = self._codes[column][label] = len(self._categories[column])
+            self._categories[column].append(label)
+        return code
+
+    def append(self, costs, schedule, scenario='', seed=0, replication=None):
+        """
+        Adds rows. costs: (7,) or (n, 7) array in COST_COLUMNS order (see
+        cost_breakdown). schedule / scenario: labels shared by the rows.
+        seed: Master seed of the runs. replication: Index of each row (int or
+        array; default 0, 1, ..., n - 1).
+        """
+        costs = np.atleast_2d(np.asarray(costs, dtype=float))
+        if costs.shape[1] != len(COST_COLUMNS):
+            raise ValueError(f"Expected {len(COST_COLUMNS)} cost columns, got {costs.shape[1]}")
+        n = len(costs)
+        if replication is None:
+            replication = np.arange(n)
+        columns = {'schedule': np.full(n, self._code('schedule', schedule)),
+                   'scenario': np.full(n, self._code('scenario', scenario)),
+                   'seed': np.full(n, seed), 'replication': np.broadcast_to(replication, (n,))}
+        columns.update(zip(COST_COLUMNS, costs.T))
+        for name, values in columns.items():
+            self._buffer[name].append(np.asarray(values, dtype=_DTYPES[name]))
+        self._buffered += n
+        if self._buffered >= self.chunk_rows:
+            self._write_chunks(final=False)
+
+    def append_simulation(self, sim, schedule, scenario='', seed=0, replication=None):
+        """append(cost_breakdown(sim), ...) for a finished simulation."""
+        self.append(cost_breakdown(sim), schedule, scenario, seed, replication)
+
+    def _write_chunks(self, final):
+        if not self._buffered:
+            return
+        data = {name: np.concatenate(parts) for name, parts in self._buffer.items()}
+        start = 0
+        while self._buffered - start >= self.chunk_rows or (final and start < self._buffered):
+            stop = min(start + self.chunk_rows, self._buffered)
+            directory = os.path.join(self.path, f"chunk-{len(self._chunks):06d}")
+            os.makedirs(directory, exist_ok=True)
+            for name, values in data.items():
+                np.save(os.path.join(directory, f"{name}.npy"), values[start:stop])
+            self._chunks.append(stop - start)
+            start = stop
+        self._buffer = {name: [values[start:]] for name, values in data.items()}
+        self._buffered -= start
+        self._write_manifest()
+
+    def _write_manifest(self):
+        manifest = os.path.join(self.path, 'manifest.json')
+        with open(f"{manifest}.tmp", 'w') as f:
+            json.dump({'version': RESULTS_VERSION, 'columns': list(COLUMNS), 'chunks': self._chunks,
+                       'categories': self._categories}, f)
+        os.replace(f"{manifest}.tmp", manifest)
+
+    def flush(self):
+        """Writes buffered rows (the last chunk may be short)."""
+        self._write_chunks(final=True)
+
+    def close(self):
+        """Writes the buffered rows. Other processes only see rows written to disk."""
+        self.flush()
+
+    def _chunk(self, i, columns):
+        directory = os.path.join(self.path, f"chunk-{i:06d}")
+        return {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode='r') for name in columns}
+
+    def _parts(self, columns):
+        # Column dicts for the chunks on disk, then the rows still buffered
+        for i in range(len(self._chunks)):
+            yield self._chunk(i, columns)
+        if self._buffered:
+            yield {name: np.concatenate(self._buffer[name]) for name in columns}
+
+    def column(self, name):
+        """One column over all rows as an array."""
+        parts = [part[name] for part in self._parts([name])]
+        return np.concatenate(parts) if parts else np.empty(0, dtype=_DTYPES[name])
+
+    def iter_frames(self, columns=None):
+        """
+        One pandas DataFrame per chunk, and one for the buffered rows
+        (schedule / scenario as categoricals), for aggregating stores larger
+        than memory.
+        """
+        import pandas as pd
+        columns = list(COLUMNS if columns is None else columns)
+        for data in self._parts(columns):
+            for name in LABEL_COLUMNS:
+                if name in data:
+                    data[name] = pd.Categorical.from_codes(np.asarray(data[name]), self._categories[name])
+            yield pd.DataFrame(data)
+
+    def to_frame(self, columns=None):
+        """All rows as one DataFrame (only `columns`, if given)."""
+        import pandas as pd
+        frames = list(self.iter_frames(columns))
+        if not frames:
+            return pd.DataFrame({name: [] for name in (COLUMNS if columns is None else columns)})
+        return pd.concat(frames, ignore_index=True)
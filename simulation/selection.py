@@ -0,0 +1,123 @@
+import math
+import numpy as np
+from .cache import FitnessStats
+
+# Ranking & selection (minimisation) with OCBA replication allocation.
+# Chen, Lin, Yucesan & Chick (2000): "Simulation budget allocation for
+# further enhancing the efficiency of ordinal optimization".
+
+RACE_INITIAL_REPLICATIONS = 10
+RACE_CONFIDENCE = 0.95
+
+def _normal_cdf(x):
+    return 0.5 * (1.0 + math.erf(x / math.sqrt(2.0)))
+
+def _floored_variances(variances):
+    # A candidate whose first replications all cost the same (often 0) would
+    # otherwise look infinitely precise.
+    variances = np.asarray(variances, dtype=float)
+    floor = max(1e-12, 0.01 * float(variances.mean()))
+    return np.maximum(variances, floor)
+
+def probability_correct_selection(means, variances, counts, indifference=0.0):
+    """
+    Approximate (Bonferroni) probability that the lowest sample mean is the
+    true best: 1 - sum_i P(candidate i is really better than the leader).
+    Differences below `indifference` count as `indifference`.
+    """
+    means = np.asarray(means, dtype=float)
+    counts = np.asarray(counts, dtype=float)
+    if len(means) < 2:
+        return 1.0
+    variances = _floored_variances(variances)
+    b = int(np.argmin(means))
+    pce = 0.0
+    for i in range(len(means)):
+        if i == b:
+            continue
+        gap = max(means[i] - means[b], indifference)
+        scale = math.sqrt(variances[b] / counts[b] + variances[i] / counts[i])
+        pce += _normal_cdf(-gap / scale)
+    return max(0.0, 1.0 - pce)
+
+def ocba_allocation(means, variances, total, indifference=0.0):
+    """
+    OCBA share of `total` replications per candidate (floats summing to total):
+    N_i / N_j = (s_i / d_i)^2 / (s_j / d_j)^2 for non-best i, j and
+    N_b = s_b * sqrt(sum_i N_i^2 / s_i^2).
+    """
+    means = np.asarray(means, dtype=float)
+    variances = _floored_variances(variances)
+    b = int(np.argmin(means))
+    gaps = np.maximum(means - means[b], max(indifference, 1e-9))
+    ratios = variances / gaps ** 2
+    ratios[b] = 0.0
+    others = np.arange(len(means)) != b
+    ratios[b] = math.sqrt(variances[b] * np.sum(ratios[others] ** 2 / variances[others]))
+    return total * ratios / ratios.sum()
+
+class SelectionResult:
+    """Outcome of race(): per-candidate stats and the selected index."""
+    def __init__(self, stats, pcs, total, samples):
+        self.stats = stats
+        self.pcs = pcs
+        self.total = total
+        self.samples = samples
+
+    @property
+    def means(self):
+        return np.array([s.mean for s in self.stats])
+
+    @property
+    def counts(self):
+        return np.array([s.count for s in self.stats])
+
+    @property
+    def best(self):
+        return int(np.argmin(self.means))
+
+def race(simulate, n_candidates, n0=RACE_INITIAL_REPLICATIONS, confidence=RACE_CONFIDENCE,
+         indifference=0.0, max_total=None, increment=None):
+    """
+    Sequential OCBA race to find the lowest-cost candidate.
+
+    simulate(counts) -> list of cost lists, with counts[i] new replications
+    of candidate i (counts may be 0). Every candidate first gets n0
+    replications. Further rounds of `increment` replications are then
+    spread by ocba_allocation. The race stops when the probability of
+    correct selection reaches `confidence`, or when `max_total`
+    replications have been spent.
+    """
+    if increment is None:
+        increment = max(n_candidates, 2 * n0)
+    stats = [FitnessStats() for _ in range(n_candidates)]
+    samples = [[] for _ in range(n_candidates)]
+
+    def _run(counts):
+        for i, costs in enumerate(simulate(counts)):
+            if counts[i]:
+                stats[i].add(costs)
+                samples[i].extend(costs)
+
+    _run([n0] * n_candidates)
+    total = n0 * n_candidates
+
+    def _pcs():
+        return probability_correct_selection([s.mean for s in stats], [s.variance for s in stats],
+                                             [s.count for s in stats], indifference)
+
+    pcs = _pcs()
+    while pcs < confidence and (max_total is None or total < max_total):
+        step = increment if max_total is None else min(increment, max_total - total)
+        counts = np.array([s.count for s in stats])
+        target = ocba_allocation([s.mean for s in stats], [s.variance for s in stats], total + step, indifference)
+        extra = np.maximum(0, np.ceil(target - counts)).astype(int)
+        if extra.sum() > step:
+            extra = np.floor(extra * step / extra.sum()).astype(int)
+        if extra.sum() == 0:
+            extra[int(np.argmax(target - counts))] = step
+        _run([int(e) for e in extra])
+        total += int(extra.sum())
+        pcs = _pcs()
+
+    return SelectionResult(stats, pcs, total, samples)
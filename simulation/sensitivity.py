@@ -0,0 +1,160 @@
+import itertools
+import math
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from .config import ARRIVAL_RATES, CAPACITY, COSTS, AMBULANCE_RATE, SimulationConfig
+from .hospital import HospitalSimulation
+from .batch import BatchHospitalSimulation
+from .optimizer import array_to_schedule
+from .results import cost_breakdown
+
+# Scenario-grid sensitivity analysis. Every scenario carries its own
+# parameter overrides (config.SimulationConfig), so scenarios run side by
+# side, in one process or across a pool, without touching simulation.config.
+
+SENSITIVITY_REPLICATIONS = 100
+
+def scale_arrivals(multiplier, rates=None):
+    """ARRIVAL_RATES with every hour's mean and std multiplied by `multiplier`."""
+    rates = ARRIVAL_RATES if rates is None else rates
+    return {hour: (mean * multiplier, std * multiplier) for hour, (mean, std) in rates.items()}
+
+def _labelled(options, default):
+    # {label: value}, [values] (labelled by position) or None (the default)
+    if options is None:
+        return {'base': default}
+    if isinstance(options, dict):
+        return dict(options)
+    return {str(i): value for i, value in enumerate(options)}
+
+def _merge_capacity(capacity):
+    return {**CAPACITY, **capacity}
+
+def _merge_costs(costs):
+    return {dept: {**table, **costs.get(dept, {})} for dept, table in COSTS.items()}
+
+class Scenario:
+    """One point of a sensitivity grid: labels for the results and the config overrides."""
+    def __init__(self, labels, overrides):
+        self.labels = labels
+        self.overrides = overrides
+        self.config = SimulationConfig.from_params(overrides) # Compiled once per scenario
+
+    def __repr__(self):
+        return f"Scenario({', '.join(f'{k}={v}' for k, v in self.labels.items())})"
+
+def scenario_grid(arrival_multipliers=(1.0,), capacities=None, costs=None, ambulance_rates=None):
+    """
+    Cartesian product of the given axes as a list of Scenarios.
+    arrival_multipliers: Factors applied to ARRIVAL_RATES (mean and std).
+    capacities: {label: {dept: beds}} or a list of such dicts; departments
+                left out keep CAPACITY.
+    costs: {label: {dept: {item: cost}}} or a list; entries left out keep COSTS.
+    ambulance_rates: Values for AMBULANCE_RATE.
+    """
+    capacities = _labelled(capacities, {})
+    costs = _labelled(costs, {})
+    ambulance_rates = list(ambulance_rates) if ambulance_rates is not None else [AMBULANCE_RATE]
+    scenarios = []
+    for mult, cap, cost, rate in itertools.product(arrival_multipliers, capacities, costs, ambulance_rates):
+        overrides = {}
+        if mult != 1.0:
+            overrides['ARRIVAL_RATES'] = scale_arrivals(mult)
+        if capacities[cap]:
+            overrides['CAPACITY'] = _merge_capacity(capacities[cap])
+        if costs[cost]:
+            overrides['COSTS'] = _merge_costs(costs[cost])
+        if rate != AMBULANCE_RATE:
+            overrides['AMBULANCE_RATE'] = rate
+        labels = {'arrival_multiplier': mult, 'capacity': cap, 'costs': cost, 'ambulance_rate': rate}
+        scenarios.append(Scenario(labels, overrides))
+    return scenarios
+
+def _run_replication(job):
+    """Worker entry point: one SimPy replication of (schedule, overrides); returns its cost_breakdown."""
+    schedule, config, seed, hours = job
+    sim = HospitalSimulation(duration_hours=hours, staffing_schedule=schedule, seed=seed, params=config)
+    sim.run()
+    return cost_breakdown(sim)
+
+def _run_batch(job):
+    """Worker entry point: all replications of one (schedule, scenario) cell; (replications, 7) costs."""
+    schedule, config, seed, replications, hours = job
+    sim = BatchHospitalSimulation(replications, schedule, duration_hours=hours, seed=seed, params=config)
+    sim.run()
+    return cost_breakdown(sim)
+
+def _summary(costs):
+    costs = np.asarray(costs, dtype=float)
+    n = len(costs)
+    std = float(costs.std(ddof=1)) if n > 1 else 0.0
+    stderr = std / math.sqrt(n)
+    mean = float(costs.mean())
+    return {'replications': n, 'mean': mean, 'std': std, 'stderr': stderr,
+            'ci95_low': mean - 1.96 * stderr, 'ci95_high': mean + 1.96 * stderr,
+            'min': float(costs.min()), 'median': float(np.median(costs)), 'max': float(costs.max())}
+
+def run_sensitivity(schedules, scenarios=None, replications=SENSITIVITY_REPLICATIONS, seed=None,
+                    n_workers=1, executor=None, engine='simpy', duration_hours=24, store=None):
+    """
+    Cost statistics for every (schedule, scenario) pair as a tidy pandas
+    DataFrame: one row per pair with the scenario labels, replications,
+    mean, std, stderr, 95% CI, min, median and max.
+
+    schedules: {name: schedule} or a list of schedules (dict, (24, 4) array
+               or None for INITIAL_STAFF).
+    scenarios: List of Scenarios (scenario_grid); None = current config only.
+    seed: Master seed. Replication r uses the same seed in every pair
+          (common random numbers), so differences between schedules and
+          scenarios are not swamped by noise.
+    n_workers / executor: Process pool for the scenario x replication jobs,
+          as for StaffingOptimizer.
+    engine: 'simpy' (one job per replication) or 'batch' (one vectorized
+            BatchHospitalSimulation per pair).
+    store: ResultsStore to append every replication's cost breakdown to,
+           labelled with the schedule name and the scenario. The last
+           rows are written to disk when the store is closed.
+    """
+    import pandas as pd
+    if engine not in ('simpy', 'batch'):
+        raise ValueError(f"Unknown engine: {engine}")
+    if not isinstance(schedules, dict):
+        schedules = {str(i): s for i, s in enumerate(schedules)}
+    if engine == 'simpy':
+        # HospitalSimulation takes {hour: {dept: count}} dicts
+        schedules = {name: s if s is None or isinstance(s, dict) else array_to_schedule(np.asarray(s))
+                     for name, s in schedules.items()}
+    if scenarios is None:
+        scenarios = scenario_grid()
+    if seed is None:
+        seed = int(np.random.SeedSequence().generate_state(1)[0])
+    cells = [(name, scenario) for name in schedules for scenario in scenarios]
+
+    if engine == 'batch':
+        jobs = [(schedules[name], sc.config, (seed,), replications, duration_hours) for name, sc in cells]
+        worker, chunksize = _run_batch, 1
+    else:
+        jobs = [(schedules[name], sc.config, (seed, r), duration_hours)
+                for name, sc in cells for r in range(replications)]
+        worker, chunksize = _run_replication, max(1, len(jobs) // (4 * max(1, n_workers)))
+
+    owned = None
+    if executor is None and n_workers > 1:
+        executor = owned = ProcessPoolExecutor(max_workers=n_workers)
+    try:
+        if executor is None:
+            results = [worker(job) for job in jobs]
+        else:
+            results = list(executor.map(worker, jobs, chunksize=chunksize))
+    finally:
+        if owned is not None:
+            owned.shutdown()
+
+    if engine == 'simpy':
+        results = [np.stack(results[i * replications:(i + 1) * replications]) for i in range(len(cells))]
+    if store is not None:
+        for (name, sc), costs in zip(cells, results):
+            store.append(costs, schedule=name, scenario=', '.join(f'{k}={v}' for k, v in sc.labels.items()),
+                         seed=seed)
+    rows = [{'schedule': name, **sc.labels, **_summary(costs[:, -1])} for (name, sc), costs in zip(cells, results)]
+    return pd.DataFrame(rows)
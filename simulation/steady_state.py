@@ -0,0 +1,142 @@
+import math
+import warnings
+import numpy as np
+from .hospital import HospitalSimulation
+from .batch import BatchHospitalSimulation
+
+# Defaults for the long-run (steady-state) daily cost estimate
+STEADY_STATE_DAYS = 90
+WARMUP_DAYS = 10
+N_BATCHES = 10
+
+# Drift checks on a series of period means (batch means, mean daily costs):
+# lag-1 autocorrelation above MAX_LAG1, or a least-squares trend whose
+# t statistic exceeds the two-sided 95% quantile, flags a model that is not
+# stationary (e.g. a queue growing without bound), whose interval would be
+# too narrow and centred on a moving target.
+MAX_LAG1 = 0.5
+MIN_DRIFT_PERIODS = 4
+
+# Two-sided 95% Student t quantiles by degrees of freedom
+_T95 = {1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571, 6: 2.447, 7: 2.365, 8: 2.306,
+        9: 2.262, 10: 2.228, 12: 2.179, 15: 2.131, 20: 2.086, 25: 2.060, 30: 2.042}
+
+def _t95(df):
+    if df <= 0:
+        return math.inf
+    known = [k for k in _T95 if k <= df]
+    return _T95[max(known)] if df <= 30 else 1.96
+
+def lag1_autocorrelation(values):
+    b = np.asarray(values, dtype=float)
+    b = b - b.mean()
+    denom = float((b * b).sum())
+    return float((b[:-1] * b[1:]).sum() / denom) if denom > 0 else 0.0
+
+def trend_statistic(values):
+    """t statistic of the least-squares slope of `values` against their index."""
+    y = np.asarray(values, dtype=float)
+    n = len(y)
+    if n < 3:
+        return 0.0
+    x = np.arange(n) - (n - 1) / 2
+    slope = float((x * y).sum() / (x * x).sum())
+    resid = y - y.mean() - slope * x
+    s2 = float((resid * resid).sum()) / (n - 2)
+    if s2 == 0:
+        return 0.0 if slope == 0 else math.copysign(math.inf, slope)
+    return slope / math.sqrt(s2 / float((x * x).sum()))
+
+def drift(values, max_lag1=MAX_LAG1):
+    """
+    Why the series of period means `values` does not look stationary, or
+    None (also for fewer than MIN_DRIFT_PERIODS values).
+    """
+    if len(values) < MIN_DRIFT_PERIODS:
+        return None
+    t = trend_statistic(values)
+    if abs(t) > _t95(len(values) - 2):
+        return f"{'upward' if t > 0 else 'downward'} trend across {len(values)} periods (t = {t:.1f})"
+    lag1 = lag1_autocorrelation(values)
+    if lag1 > max_lag1:
+        return f"lag-1 autocorrelation {lag1:.2f} of the period means is above {max_lag1}"
+    return None
+
+def check_drift(values, what, on_drift='warn'):
+    """
+    Applies drift() to `values`. on_drift: 'warn' (RuntimeWarning), 'raise'
+    (RuntimeError) or 'ignore'. Returns the reason or None.
+    """
+    if on_drift not in ('warn', 'raise', 'ignore'):
+        raise ValueError(f"Unknown on_drift: {on_drift}")
+    reason = drift(values)
+    if reason is not None and on_drift != 'ignore':
+        message = (f"{what} are not stationary ({reason}); the estimate and its confidence interval are "
+                   f"unreliable. Add staff, or lengthen the warm-up or run.")
+        if on_drift == 'raise':
+            raise RuntimeError(message)
+        warnings.warn(message, RuntimeWarning, stacklevel=3)
+    return reason
+
+class SteadyStateResult:
+    """Batch-means estimate of the long-run cost per day."""
+    def __init__(self, daily_costs, warmup_days, n_batches):
+        self.daily_costs = np.asarray(daily_costs, dtype=float)
+        self.warmup_days = warmup_days
+        kept = self.daily_costs[warmup_days:]
+        self.batch_size = len(kept) // n_batches if n_batches else 0
+        if self.batch_size == 0:
+            raise ValueError(f"Need at least {n_batches} days after the {warmup_days}-day warm-up")
+        # Use the most recent n_batches * batch_size days
+        kept = kept[len(kept) - n_batches * self.batch_size:]
+        self.batch_means = kept.reshape(n_batches, self.batch_size).mean(axis=1)
+        self.mean = float(self.batch_means.mean())
+        self.stderr = float(self.batch_means.std(ddof=1) / math.sqrt(n_batches)) if n_batches > 1 else math.inf
+        self.half_width = _t95(n_batches - 1) * self.stderr
+
+    @property
+    def lag1_autocorrelation(self):
+        """
+        Of the batch means. Values well above ~0.2 mean the batches are too
+        short or the system is not stationary (e.g. a queue growing without
+        bound), so the interval is too narrow.
+        """
+        return lag1_autocorrelation(self.batch_means)
+
+    @property
+    def trend(self):
+        """t statistic of the linear trend in the batch means (|t| above ~2 is drift)."""
+        return trend_statistic(self.batch_means)
+
+    @property
+    def drift(self):
+        """Why the batch means do not look stationary (see drift()), or None."""
+        return drift(self.batch_means)
+
+    def __repr__(self):
+        return (f"SteadyStateResult(mean={self.mean:,.2f}/day, 95% CI +/- {self.half_width:,.2f}, "
+                f"batches={len(self.batch_means)}x{self.batch_size}d, lag1={self.lag1_autocorrelation:.2f}, "
+                f"trend t={self.trend:.1f})")
+
+def steady_state_cost(staffing_schedule=None, days=STEADY_STATE_DAYS, warmup_days=WARMUP_DAYS,
+                      n_batches=N_BATCHES, seed=None, engine='simpy', on_drift='warn'):
+    """
+    One long replication with the 24-hour schedule repeated every day.
+    The first `warmup_days` are discarded (the model starts empty), and the
+    rest are split into `n_batches` batches whose means give the daily cost
+    and its confidence interval.
+    engine: 'simpy' (HospitalSimulation) or 'batch' (BatchHospitalSimulation).
+    on_drift: What to do when the batch means trend or are autocorrelated
+              (see check_drift): 'warn', 'raise' or 'ignore'.
+    """
+    if engine == 'batch':
+        sim = BatchHospitalSimulation(1, staffing_schedule, duration_hours=days * 24, seed=seed)
+        sim.run()
+        daily = sim.daily_costs[0]
+    else:
+        sim = HospitalSimulation(duration_hours=days * 24, staffing_schedule=staffing_schedule, seed=seed)
+        sim.run()
+        daily = sim.daily_costs
+    result = SteadyStateResult(daily, warmup_days, n_batches)
+    check_drift(result.batch_means, 'Batch means of the daily cost', on_drift)
+    return result
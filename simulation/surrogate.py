@@ -0,0 +1,119 @@
+import numpy as np
+
+# Surrogate-assisted screening for the GA (StaffingOptimizer(surrogate=...)).
+# A ridge regression on the schedule's 96 staffing levels plus a few derived
+# features predicts log(1 + cost); children are drawn from a larger pool and
+# only the best-predicted ones are simulated.
+
+SURROGATE_ALPHA = 10.0
+SURROGATE_POOL_FACTOR = 4
+SURROGATE_MIN_SAMPLES = 20
+
+def schedule_features(grids, baseline):
+    """
+    (n, hours, depts) schedules -> (n, features) float matrix: the raw levels,
+    then per department the staff-hours, the staff-hours above and below
+    `baseline` (temporary staff and short-staffing), the hour-to-hour
+    increases around the day (hiring) and the lowest level.
+    """
+    grids = np.asarray(grids, dtype=float)
+    baseline = np.asarray(baseline, dtype=float)
+    above = np.maximum(0.0, grids - baseline).sum(axis=1)
+    below = np.maximum(0.0, baseline - grids).sum(axis=1)
+    hires = np.maximum(0.0, grids - np.roll(grids, 1, axis=1)).sum(axis=1)
+    return np.hstack([grids.reshape(len(grids), -1), grids.sum(axis=1), above, below, hires, grids.min(axis=1)])
+
+def _ranks(x):
+    # Average ranks, so ties (e.g. several zero costs) do not inflate the correlation
+    x = np.asarray(x, dtype=float)
+    order = np.argsort(x, kind='stable')
+    ranks = np.empty(len(x))
+    ranks[order] = np.arange(len(x), dtype=float)
+    _, inverse, counts = np.unique(x, return_inverse=True, return_counts=True)
+    sums = np.bincount(inverse, weights=ranks)
+    return sums[inverse] / counts[inverse]
+
+def spearman(x, y):
+    """Spearman rank correlation; None with fewer than three pairs or no variation."""
+    if len(x) < 3:
+        return None
+    rx, ry = _ranks(x), _ranks(y)
+    rx -= rx.mean()
+    ry -= ry.mean()
+    denom = np.sqrt((rx ** 2).sum() * (ry ** 2).sum())
+    return float((rx * ry).sum() / denom) if denom > 0 else None
+
+class SurrogateModel:
+    """
+    Ridge regression from schedule features to log(1 + mean cost), refitted
+    on every schedule observed so far (the latest mean per schedule, so a
+    schedule seen again replaces its earlier estimate).
+    """
+    def __init__(self, baseline, alpha=SURROGATE_ALPHA, min_samples=SURROGATE_MIN_SAMPLES):
+        """
+        baseline: (hours, depts) reference levels for the derived features
+                  (optimizer.baseline_array()).
+        alpha: Ridge penalty on the standardized features.
+        min_samples: Distinct schedules needed before predictions are trusted.
+        """
+        self.baseline = np.asarray(baseline)
+        self.alpha = alpha
+        self.min_samples = min_samples
+        self._observed = {} # schedule bytes -> mean cost
+        self._coef = None
+
+    def __len__(self):
+        return len(self._observed)
+
+    @property
+    def ready(self):
+        return self._coef is not None and len(self._observed) >= self.min_samples
+
+    def observe(self, schedules, costs, refit=True):
+        """Adds (schedule, mean cost) pairs; schedules is (n, hours, depts)."""
+        schedules = np.asarray(schedules, dtype=np.int16)
+        for schedule, cost in zip(schedules, costs):
+            self._observed[schedule.tobytes()] = float(cost)
+        if refit:
+            self.fit()
+
+    def observe_cache(self, cache, prefix):
+        """
+        Adds every schedule in a FitnessCache whose key starts with `prefix`
+        (the optimizer's cache namespace), e.g. from a persistent cache.
+        """
+        shape = self.baseline.shape
+        size = int(np.prod(shape)) * 2 # int16 schedule bytes
+        schedules, costs = [], []
+        for key, stats in cache.items(prefix):
+            blob = key[len(prefix):]
+            if len(blob) == size and stats.count:
+                schedules.append(np.frombuffer(blob, dtype=np.int16).reshape(shape))
+                costs.append(stats.mean)
+        if schedules:
+            self.observe(np.stack(schedules), costs)
+        return len(schedules)
+
+    def fit(self):
+        if len(self._observed) < 2:
+            return
+        grids = np.stack([np.frombuffer(b, dtype=np.int16).reshape(self.baseline.shape) for b in self._observed])
+        X = schedule_features(grids, self.baseline)
+        y = np.log1p(np.maximum(0.0, np.fromiter(self._observed.values(), dtype=float)))
+        self._mean = X.mean(axis=0)
+        self._scale = X.std(axis=0)
+        self._scale[self._scale == 0] = 1.0
+        Z = (X - self._mean) / self._scale
+        self._intercept = y.mean()
+        self._coef = np.linalg.solve(Z.T @ Z + self.alpha * np.eye(Z.shape[1]), Z.T @ (y - self._intercept))
+
+    def predict(self, schedules):
+        """Predicted mean cost of each schedule in (n, hours, depts)."""
+        if self._coef is None:
+            raise RuntimeError("SurrogateModel has not been fitted")
+        Z = (schedule_features(schedules, self.baseline) - self._mean) / self._scale
+        return np.expm1(Z @ self._coef + self._intercept)
+
+    def screen(self, schedules, keep):
+        """Indices of the `keep` schedules with the lowest predicted cost (stable)."""
+        return np.argsort(self.predict(schedules), kind='stable')[:keep]
@@ -1,22 +1,70 @@
 
-import random
+from bisect import bisect_right
+import numpy as np
+
+def sample_pmf(rng, pmf_dict):
+    """
+    Draws one value from a {Value: Probability} PMF using `rng`
+    (np.random.Generator). Weights need not sum exactly to 1.
+    """
+    values = list(pmf_dict.keys())
+    cum_weights = np.cumsum(list(pmf_dict.values()))
+    idx = int(np.searchsorted(cum_weights, rng.random() * cum_weights[-1], side='right'))
+    return values[min(idx, len(values) - 1)]
 
 class Distribution:
-    """Helper to generate values based on a discrete probability distribution (PMF)."""
+    """
+    A {Value: Probability} PMF compiled once into cumulative weights.
+    Each draw takes one uniform from the generator and a bisection over a
+    handful of floats, with no per-draw allocation. Draws are identical to
+    sample_pmf for the same generator state.
+    """
+    __slots__ = ('values', 'cum_weights', 'total', '_last')
+
     def __init__(self, pmf_dict):
         """
         pmf_dict: Dict {Value: Probability}
-        e.g., {0: 0.5, 1: 0.3, 2: 0.2}
+        e.g., {0: 0.5, 1: 0.3, 2: 0.2}. Weights need not sum exactly to 1.
         """
-        self.values = list(pmf_dict.keys())
-        self.probabilities = list(pmf_dict.values())
-        
-        # Normalize if needed (floating point issues)
-        total = sum(self.probabilities)
-        if abs(total - 1.0) > 0.01:
-            print(f"Warning: PMF sums to {total}, normalizing...")
-            self.probabilities = [p/total for p in self.probabilities]
-
-    def sample(self):
-        """Return a value sampled from the distribution."""
-        return random.choices(self.values, weights=self.probabilities, k=1)[0]
+        self.values = tuple(pmf_dict.keys())
+        self.cum_weights = tuple(np.cumsum(list(pmf_dict.values())).tolist())
+        self.total = self.cum_weights[-1]
+        self._last = len(self.values) - 1
+
+    def value_at(self, u):
+        """Value for a uniform draw u in [0, 1) (inverse CDF)."""
+        idx = bisect_right(self.cum_weights, u * self.total)
+        return self.values[idx if idx < self._last else self._last]
+
+    def values_at(self, u):
+        """value_at for an array of uniform draws (np.ndarray of values)."""
+        idx = np.searchsorted(self.cum_weights, np.asarray(u) * self.total, side='right')
+        return np.asarray(self.values)[np.minimum(idx, self._last)]
+
+    def sample(self, rng):
+        """Return a value sampled from the distribution using `rng` (np.random.Generator)."""
+        return self.value_at(rng.random())
+
+    def __repr__(self):
+        return f"Distribution({dict(zip(self.values, self.probabilities))})"
+
+    @property
+    def probabilities(self):
+        previous = (0.0,) + self.cum_weights[:-1]
+        return tuple((c - p) / self.total for c, p in zip(self.cum_weights, previous))
+
+# Independent random streams, one per stochastic process
+RNG_STREAMS = ('arrivals', 'dispositions', 'transfers', 'events')
+
+def spawn_streams(seed=None, rng=None):
+    """
+    Returns {stream_name: np.random.Generator} spawned from one SeedSequence.
+    seed: int, sequence of ints or SeedSequence. None draws fresh entropy.
+    rng: Optional parent Generator used to derive the seed instead.
+    """
+    if rng is not None:
+        seed = np.random.SeedSequence(int(rng.integers(0, 2**63)))
+    elif not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    children = seed.spawn(len(RNG_STREAMS))
+    return {name: np.random.default_rng(child) for name, child in zip(RNG_STREAMS, children)}
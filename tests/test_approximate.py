@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+from simulation.approximate import (DEFAULT_COEFFICIENTS, approximate_cost, calibrate, fit_coefficients,
+                                    fluid_components, local_search)
+from simulation.optimizer import StaffingOptimizer, baseline_array
+from simulation.surrogate import spearman
+
+def test_fit_recovers_known_coefficients():
+    schedules = StaffingOptimizer(seed=1).generate_random_population(30)
+    staff, components = fluid_components(schedules)
+    truth = np.array([0.5, 0.1, 1.0, 2000.0])
+    fitted = fit_coefficients(schedules, staff + components @ truth)
+    # Diversion never occurs in this sample and keeps its face value
+    np.testing.assert_allclose(fitted, truth, rtol=1e-6)
+
+def test_calibrated_model_ranks_simpy_costs():
+    # Calibrate on the batch engine (fast), check against held-out SimPy means
+    coefficients, _, _ = calibrate(n_schedules=200, replications=50, seed=3, engine='batch')
+    assert (coefficients >= 0).all()
+    schedules = StaffingOptimizer(seed=9).generate_random_population(30)
+    simulated = StaffingOptimizer(seed=4).evaluate_population(schedules, 20)
+    # The GA's schedules differ little, so 20-replication means are noisy
+    # (two independent sets rank-correlate at only ~0.3)
+    assert spearman(approximate_cost(schedules, coefficients=coefficients), simulated) > 0.2
+    assert spearman(approximate_cost(schedules), simulated) > 0.2
+
+def test_local_search_does_not_increase_approximate_cost():
+    start = baseline_array()
+    schedule, cost = local_search(start, max_steps=5)
+    assert cost <= approximate_cost(start)
+    assert cost == pytest.approx(approximate_cost(schedule))
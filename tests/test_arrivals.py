@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+from simulation import config
+from simulation.arrivals import ArrivalStream
+from simulation.hospital import HospitalSimulation
+from simulation.nowcast import HospitalCensus
+from simulation.optimizer import array_to_schedule
+
+HOURS = 72
+
+def test_stream_is_sorted_and_inside_the_horizon():
+    stream = ArrivalStream.generate(HOURS, seed=3, start_hour=5)
+    times = stream.er_times
+    assert np.all(np.diff(times) >= 0)
+    assert times.min() >= 5 and times.max() < 5 + HOURS
+    assert len(stream.er_ambulance) == len(stream.er_disposition_draws) == len(times)
+    assert np.all((stream.er_disposition_draws >= 0) & (stream.er_disposition_draws < 1))
+    assert stream.er_ambulance.mean() == pytest.approx(config.AMBULANCE_RATE, abs=0.05)
+    assert stream.direct_counts.shape == (HOURS, len(stream.direct_departments))
+    for j, name in enumerate(stream.direct_departments):
+        assert set(stream.direct_counts[:, j]) <= set(config.DIRECT_ENTRY_RATES[name])
+    assert len(stream) == len(times) + stream.direct_counts.sum()
+
+def test_pre_drawn_stream_reproduces_the_simulations_own_draws():
+    stream = ArrivalStream.generate(HOURS, seed=8)
+    own = HospitalSimulation(duration_hours=HOURS, seed=8)
+    replayed = HospitalSimulation(duration_hours=HOURS, seed=8, arrivals=stream)
+    assert replayed.run() == own.run()
+    assert replayed.total_patients == own.total_patients
+
+def test_stream_replays_the_same_patients_under_any_schedule():
+    stream = ArrivalStream.generate(HOURS, seed=1)
+    schedules = [None, array_to_schedule(np.tile([10, 4, 9, 15], (24, 1)))]
+    sims = [HospitalSimulation(duration_hours=HOURS, staffing_schedule=s, seed=1, arrivals=stream) for s in schedules]
+    costs = [sim.run() for sim in sims]
+    assert costs[0] != costs[1]
+    assert sims[0].total_patients == sims[1].total_patients == len(stream)
+
+def test_stream_must_cover_the_run():
+    with pytest.raises(ValueError, match='covers'):
+        HospitalSimulation(duration_hours=48, seed=1, arrivals=ArrivalStream.generate(24, seed=1))
+    with pytest.raises(ValueError, match='starts at hour'):
+        HospitalSimulation(duration_hours=8, seed=1, census=HospitalCensus(14),
+                           arrivals=ArrivalStream.generate(8, seed=1))
@@ -0,0 +1,22 @@
+import numpy as np
+import pytest
+from simulation.hospital import HospitalSimulation
+from simulation.batch import BatchHospitalSimulation
+from simulation.nowcast import HospitalCensus
+
+# A short version of benchmarks/batch_validation.py (which needs 1000 SimPy
+# replications for its equivalence claim): the mean costs must agree within
+# a few standard errors.
+BUSY = HospitalCensus(14, waiting={'ER': 5, 'CriticalCare': 3, 'StepDown': 2},
+                      in_treatment={'ER': 10, 'Surgery': 8, 'CriticalCare': 12, 'StepDown': 15},
+                      closed_rooms={'Surgery': [2]}, staff_leave={'ER': [1, 10]}, last_hour_temps=3)
+
+@pytest.mark.parametrize('census, hours, replications', [(None, 24, 200), (BUSY, 8, 200)],
+                         ids=['default schedule', 'busy census'])
+def test_batch_mean_matches_simpy(census, hours, replications):
+    simpy_costs = np.array([HospitalSimulation(duration_hours=hours, seed=i, census=census).run()
+                            for i in range(replications)])
+    batch_costs = BatchHospitalSimulation(5000, duration_hours=hours, seed=0, census=census).run()
+    stderr = np.sqrt(simpy_costs.var(ddof=1) / len(simpy_costs) + batch_costs.var(ddof=1) / len(batch_costs))
+    assert simpy_costs.mean() > 0
+    assert abs(batch_costs.mean() - simpy_costs.mean()) <= 3 * stderr
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+from simulation import config
+from simulation.batch import BatchHospitalSimulation
+from simulation.cache import FitnessCache, PrefixStateCache
+from simulation.nowcast import HospitalCensus
+from simulation.optimizer import StaffingOptimizer
+
+BASE = np.tile([4, 3, 6, 8], (24, 1))
+
+def _variants():
+    # Schedules sharing ever shorter prefixes with BASE
+    grids = []
+    for hour in (20, 12, 3):
+        grid = BASE.copy()
+        grid[hour:, 0] += 1
+        grids.append(grid)
+    return grids
+
+def test_prefix_cache_matches_full_runs():
+    cache = PrefixStateCache()
+    for grid in [BASE] + _variants():
+        cached = BatchHospitalSimulation(50, grid, seed=11, prefix_cache=cache)
+        np.testing.assert_allclose(cached.run(), BatchHospitalSimulation(50, grid, seed=11).run())
+    assert cache.hours_skipped > 0
+
+def test_prefix_cache_keeps_configs_and_censuses_apart():
+    cache = PrefixStateCache()
+    BatchHospitalSimulation(50, BASE, seed=11, prefix_cache=cache).run()
+    params = {'COSTS': {d: {**c, 'Wait': 2 * c['Wait']} for d, c in config.COSTS.items()}}
+    census = HospitalCensus(0, waiting={'ER': 6}, in_treatment={'CriticalCare': 4})
+    for kwargs in ({'params': params}, {'census': census}, {'duration_hours': 12}):
+        cached = BatchHospitalSimulation(50, BASE, seed=11, prefix_cache=cache, **kwargs)
+        np.testing.assert_allclose(cached.run(), BatchHospitalSimulation(50, BASE, seed=11, **kwargs).run())
+        assert cached.hours_skipped == 0
+
+def test_fitness_cache_persists_across_sessions(tmp_path):
+    path = str(tmp_path / 'fitness.sqlite')
+    cache = FitnessCache(maxsize=1, path=path)
+    cache.update(b'a', [1.0, 2.0, 3.0])
+    cache.update(b'b', [10.0]) # Evicts 'a' from memory
+    cache.update(b'a', [4.0])
+    cache.close()
+
+    cache = FitnessCache(path=path)
+    stats = cache.get(b'a')
+    assert stats.count == 4 and stats.mean == pytest.approx(2.5)
+    assert stats.variance == pytest.approx(np.var([1, 2, 3, 4], ddof=1))
+    assert dict((k, s.count) for k, s in cache.items()) == {b'a': 4, b'b': 1}
+    cache.close()
+
+def test_optimizer_reuses_persisted_fitness(tmp_path):
+    path = str(tmp_path / 'fitness.sqlite')
+    cache = FitnessCache(path=path)
+    opt = StaffingOptimizer(seed=1, engine='batch', iterations=4, cache=cache, cache_max_replications=4)
+    means, _ = opt.evaluate_cached([BASE])
+    cache.close()
+
+    opt = StaffingOptimizer(seed=2, engine='batch', iterations=4, cache=FitnessCache(path=path),
+                            cache_max_replications=4)
+    again, samples = opt.evaluate_cached([BASE])
+    assert samples == [None] and opt.simulations_run == 0
+    assert again[0] == means[0]
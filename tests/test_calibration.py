@@ -0,0 +1,27 @@
+import os
+import numpy as np
+import pytest
+from simulation import calibration, config
+from simulation.calibration import DEFAULT_WORKBOOK, fit_arrival_rates, load_arrival_counts
+
+pytest.importorskip('openpyxl')
+pytestmark = pytest.mark.skipif(not os.path.exists(DEFAULT_WORKBOOK), reason='workbook not available')
+
+def test_cache_round_trip(tmp_path, monkeypatch):
+    counts, years, days = load_arrival_counts(cache_dir=str(tmp_path))
+    assert len(os.listdir(tmp_path)) == 1
+
+    def no_parse(path):
+        raise AssertionError('workbook parsed despite the cache')
+    monkeypatch.setattr(calibration, 'read_arrival_counts', no_parse)
+    cached = load_arrival_counts(cache_dir=str(tmp_path))
+    for original, loaded in zip((counts, years, days), cached):
+        np.testing.assert_array_equal(original, loaded)
+    with pytest.raises(AssertionError, match='despite the cache'):
+        load_arrival_counts(cache_dir=str(tmp_path), refresh=True)
+
+def test_fit_reproduces_config_rates(tmp_path):
+    counts, years, _ = load_arrival_counts(cache_dir=str(tmp_path))
+    assert fit_arrival_rates(counts, years, blanks='missing') == config.ARRIVAL_RATES
+    latest = fit_arrival_rates(counts, years, select_years=[years.max()])
+    assert latest != fit_arrival_rates(counts, years)
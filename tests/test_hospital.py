@@ -0,0 +1,41 @@
+import random
+import numpy as np
+from simulation import config
+from simulation.config import SimulationConfig
+from simulation.hospital import HospitalSimulation
+
+# The default staff keeps the first day free of waits; later days are not
+HOURS = 72
+
+def test_same_seed_reproduces_run():
+    first = HospitalSimulation(duration_hours=HOURS, seed=42)
+    first.run()
+    # Global generators and other instances must not affect the run
+    np.random.seed(0)
+    random.seed(0)
+    HospitalSimulation(duration_hours=HOURS, seed=7).run()
+    second = HospitalSimulation(duration_hours=HOURS, seed=42)
+    second.run()
+    assert second.total_cost == first.total_cost
+    assert second.total_patients == first.total_patients
+    assert second.daily_costs == first.daily_costs
+
+def test_seed_sequences_and_rng_are_accepted():
+    def cost(**kwargs):
+        return HospitalSimulation(duration_hours=HOURS, **kwargs).run()
+    assert cost(seed=np.random.SeedSequence(5)) == cost(seed=np.random.SeedSequence(5))
+    assert cost(rng=np.random.default_rng(3)) == cost(rng=np.random.default_rng(3))
+    assert cost(seed=1) != cost(seed=2)
+
+def test_module_values_edited_in_place_are_picked_up():
+    before = SimulationConfig.from_params()
+    original = config.COSTS['Surgery']['Wait']
+    config.COSTS['Surgery']['Wait'] = original + 1
+    try:
+        after = SimulationConfig.from_params()
+        assert after.wait_cost['Surgery'] == original + 1
+        assert HospitalSimulation(duration_hours=HOURS, seed=1).config.wait_cost['Surgery'] == original + 1
+    finally:
+        config.COSTS['Surgery']['Wait'] = original
+    assert before.wait_cost['Surgery'] == original
+    assert SimulationConfig.from_params() == before
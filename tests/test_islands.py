@@ -0,0 +1,49 @@
+import numpy as np
+from simulation import islands
+from simulation.islands import IslandOptimizer, island_seed
+from simulation.optimizer import StaffingOptimizer
+
+SETTINGS = dict(n_islands=3, migration_interval=2, migrants=2, seed=4, population_size=4, generations=5,
+                iterations=2, validation_iterations=10, engine='batch', crn=True)
+
+def _summary(history):
+    return sorted((s['island'], s['generation'], s['best_cost'], s['simulations_run']) for s in history)
+
+def test_processes_match_in_process_run():
+    results = []
+    for processes in (True, False):
+        model = IslandOptimizer(processes=processes, **SETTINGS)
+        schedule, cost = model.run()
+        results.append((schedule, cost, model.simulations_run, _summary(model.history)))
+    assert results[0] == results[1]
+    assert len(results[0][3]) == SETTINGS['n_islands'] * SETTINGS['generations']
+
+def test_migrants_move_to_the_next_island_on_the_ring(monkeypatch):
+    island_of = {island_seed(SETTINGS['seed'], i): i for i in range(SETTINGS['n_islands'])}
+    sent, received = {}, []
+    emigrants, immigrate = islands._emigrants, StaffingOptimizer.immigrate
+
+    def record_emigrants(optimizer, count):
+        schedules = emigrants(optimizer, count)
+        sent.setdefault(island_of[optimizer.seed], []).append(schedules)
+        return schedules
+
+    def record_immigrate(self, schedules):
+        immigrate(self, schedules)
+        received.append((island_of[self.seed], schedules, self._population[-len(schedules):].copy()))
+
+    monkeypatch.setattr(islands, '_emigrants', record_emigrants)
+    monkeypatch.setattr(StaffingOptimizer, 'immigrate', record_immigrate)
+    IslandOptimizer(processes=False, **SETTINGS).run()
+
+    # Generations 1 and 3 end with a migration; generation 4 is the last
+    n = SETTINGS['n_islands']
+    assert len(received) == 2 * n
+    # Islands evolve apart, so the check below can tell their migrants apart
+    assert not np.array_equal(sent[0][0], sent[1][0])
+    for round_, start in enumerate(range(0, len(received), n)):
+        for island, schedules, population_tail in received[start:start + n]:
+            source = (island - 1) % n
+            np.testing.assert_array_equal(schedules, sent[source][round_])
+            np.testing.assert_array_equal(population_tail, schedules)
+            assert schedules.shape == (SETTINGS['migrants'], 24, 4)
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+from simulation.hospital import HospitalSimulation
+from simulation.metrics import MetricsCollector, OnlineStat
+from simulation.optimizer import array_to_schedule
+from simulation.patient import Patient, ARRIVED, STATUS_NAMES
+
+# Short-staffed ER under heavy arrivals, with temporary staff elsewhere:
+# every metric sees events
+SCHEDULE = array_to_schedule(np.tile([6, 12, 24, 30], (24, 1)))
+PARAMS = {'ARRIVAL_RATES': {h: (8.0, 1.0) for h in range(24)}}
+HOURS = 72
+
+def test_online_stat_matches_numpy():
+    values = np.random.default_rng(0).exponential(3.0, size=500)
+    stat = OnlineStat()
+    for x in values:
+        stat.push(x)
+    assert stat.count == 500
+    assert stat.mean == pytest.approx(values.mean())
+    assert stat.variance == pytest.approx(values.var(ddof=1))
+    assert stat.total == pytest.approx(values.sum())
+    assert (stat.min, stat.max) == (values.min(), values.max())
+
+def test_collector_totals_match_simulation_costs():
+    metrics = MetricsCollector()
+    sim = HospitalSimulation(duration_hours=HOURS, staffing_schedule=SCHEDULE, seed=3, params=PARAMS, metrics=metrics)
+    cost = sim.run()
+    # Observing does not change the run
+    assert cost == HospitalSimulation(duration_hours=HOURS, staffing_schedule=SCHEDULE, seed=3, params=PARAMS).run()
+
+    summary = metrics.summary()
+    assert summary['Hospital']['staff_cost'] == pytest.approx(sim.total_staff_setup_cost + sim.total_staff_hourly_cost)
+    assert summary['Hospital']['staff_cost'] > 0
+    diversion_cost = sim.config.costs['ER']['Diversion']
+    assert summary['Hospital']['diversions'] * diversion_cost == sim.departments['ER'].total_diversion_cost > 0
+    for name, dept in sim.departments.items():
+        assert summary[name]['queue']['count'] == summary[name]['occupancy']['count'] == HOURS
+        # Admitted patients' waits; penalties for patients still queued come on top
+        assert metrics.by_dept[name]['wait'].total * sim.config.wait_cost[name] <= dept.total_wait_cost + 1e-6
+        by_hour = metrics.by_hour[name]['queue']
+        assert sum(s.count for s in by_hour) == HOURS
+
+def test_hourly_frame_has_one_row_per_department_hour_and_metric():
+    pd = pytest.importorskip('pandas')
+    metrics = MetricsCollector()
+    HospitalSimulation(duration_hours=24, seed=1, metrics=metrics).run()
+    frame = metrics.hourly_frame()
+    assert isinstance(frame, pd.DataFrame)
+    assert len(frame) == 4 * 24 * len(MetricsCollector.METRICS) + 2 * 24
+
+def test_patient_is_a_slotted_record():
+    patient = Patient(7, 1.5)
+    assert not hasattr(patient, '__dict__')
+    with pytest.raises(AttributeError):
+        patient.history = []
+    assert patient.status == ARRIVED and STATUS_NAMES[patient.status] == 'Arrived'
+    assert repr(patient) == 'Patient(7, Arrived)'
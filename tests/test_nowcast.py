@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+from simulation.nowcast import HospitalCensus, nowcast
+
+BUSY = HospitalCensus(14, waiting={'ER': 5, 'CriticalCare': 3}, in_treatment={'Surgery': 8, 'StepDown': 15},
+                      closed_rooms={'Surgery': [2]}, staff_leave={'ER': 2}, last_hour_temps=3)
+
+@pytest.mark.parametrize('kwargs, message', [
+    ({'hour': 24}, 'hour'),
+    ({'hour': -1}, 'hour'),
+    ({'hour': 2.5}, 'hour'),
+    ({'waiting': {'Pharmacy': 2}}, 'Unknown department'),
+    ({'in_treatment': {'ER': -1}}, 'non-negative'),
+    ({'staff_leave': {'ER': -2}}, 'non-negative'),
+    ({'closed_rooms': {'Surgery': [0]}}, 'positive'),
+    ({'last_hour_temps': -3}, 'non-negative'),
+])
+def test_census_rejects_invalid_state(kwargs, message):
+    kwargs = {'hour': 8, **kwargs}
+    with pytest.raises(ValueError, match=message):
+        HospitalCensus(**kwargs)
+
+def test_census_normalises_counts_and_durations():
+    census = HospitalCensus(np.int64(3), staff_leave={'ER': 2, 'Surgery': (1.5, 4)})
+    assert census.hour == 3 and type(census.hour) is int
+    assert census.staff_leave == {'ER': [1, 1], 'Surgery': [1.5, 4]}
+
+@pytest.mark.parametrize('engine', ['simpy', 'batch'])
+def test_busy_census_costs_more_than_empty_hospital(engine):
+    replications = 40 if engine == 'simpy' else 300
+    empty = nowcast(HospitalCensus(14), replications=replications, seed=5, engine=engine)
+    busy = nowcast(BUSY, replications=replications, seed=5, engine=engine)
+    assert busy.shape == (replications,)
+    assert busy.mean() > empty.mean()
+
+def test_nowcast_same_seed_is_reproducible():
+    np.testing.assert_array_equal(nowcast(BUSY, seed=2), nowcast(BUSY, seed=2))
+
+def test_nowcast_rejects_policy_on_batch_engine():
+    with pytest.raises(ValueError, match='simpy'):
+        nowcast(BUSY, policy=lambda hour, state, scheduled: None)
+    with pytest.raises(ValueError, match='engine'):
+        nowcast(BUSY, engine='fluid')
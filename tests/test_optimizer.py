@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+from simulation.optimizer import StaffingOptimizer
+
+SCHEDULE = np.tile([4, 3, 6, 8], (24, 1))
+
+@pytest.mark.parametrize('engine', ['simpy', 'batch'])
+def test_simulate_counts_pairs_replications_under_crn(engine):
+    opt = StaffingOptimizer(seed=3, crn=True, engine=engine)
+    # Same schedule at different counts in one round: replication r must match
+    short, none, long = opt.simulate_counts([SCHEDULE, SCHEDULE, SCHEDULE], [2, 0, 5])
+    assert len(short) == 2 and none == [] and len(long) == 5
+    assert short == long[:2]
+
+@pytest.mark.parametrize('engine', ['simpy', 'batch'])
+def test_crn_shares_replications_across_schedules(engine):
+    same, other = StaffingOptimizer(seed=3, crn=True, engine=engine).simulate_many([SCHEDULE, SCHEDULE], 4)
+    assert same == other
+    first, second = StaffingOptimizer(seed=3, crn=False, engine=engine).simulate_many([SCHEDULE, SCHEDULE], 4)
+    assert first != second
+    # Batches of one run draw fresh replications
+    opt = StaffingOptimizer(seed=3, crn=True, engine=engine)
+    assert opt.simulate_many([SCHEDULE], 4) != opt.simulate_many([SCHEDULE], 4)
+
+def _ga(checkpoint, **kwargs):
+    kwargs = {'engine': 'batch', 'crn': True, **kwargs}
+    return StaffingOptimizer(population_size=6, generations=4, iterations=3, seed=5, checkpoint=checkpoint, **kwargs)
+
+def _summary(stats):
+    return [(s['generation'], s['best_cost'], s['generation_mean'], s['simulations_run']) for s in stats]
+
+@pytest.mark.parametrize('settings', [{}, {'selection': 'ocba'}, {'selection': 'ocba', 'crn': False},
+                                      {'engine': 'simpy', 'selection': 'ocba'}])
+def test_resumed_run_matches_uninterrupted_run(tmp_path, settings):
+    straight = _summary(_ga(str(tmp_path / 'straight.npz'), **settings).iterate())
+
+    checkpoint = str(tmp_path / 'stopped.npz')
+    generations = _ga(checkpoint, **settings).iterate()
+    first = _summary([next(generations), next(generations)])
+    generations.close() # Stopped after generation 1; the checkpoint holds generation 2's population
+    resumed = _summary(_ga(checkpoint, **settings).iterate(resume_from=checkpoint))
+    assert first + resumed == straight
+    assert all(type(s[3]) is int for s in straight)
+
+def test_resume_rejects_other_settings(tmp_path):
+    checkpoint = str(tmp_path / 'ga.npz')
+    generations = _ga(checkpoint).iterate()
+    next(generations)
+    generations.close()
+    with pytest.raises(ValueError, match='different settings'):
+        next(StaffingOptimizer(population_size=6, generations=4, seed=6, engine='batch', crn=True)
+             .iterate(resume_from=checkpoint))
+
+@pytest.mark.parametrize('crn', [True, False])
+def test_simulate_counts_keeps_counters_python_ints(crn):
+    opt = StaffingOptimizer(seed=3, crn=crn, engine='batch')
+    results = opt.simulate_counts([SCHEDULE, SCHEDULE], np.array([2, 3]))
+    assert [len(r) for r in results] == [2, 3]
+    assert type(opt.simulations_run) is int
+
+@pytest.mark.parametrize('settings', [{}, {'crn': True}])
+def test_parallel_run_matches_serial_run(settings):
+    def run(n_workers):
+        opt = StaffingOptimizer(population_size=4, generations=3, iterations=2, validation_iterations=10,
+                                seed=9, n_workers=n_workers, **settings)
+        schedule, cost = opt.run()
+        return schedule, cost, opt.best_cost, opt.simulations_run
+    serial, parallel = run(1), run(4)
+    assert parallel[1:] == serial[1:]
+    assert parallel[0] == serial[0]
@@ -0,0 +1,71 @@
+import numpy as np
+from optimization.heuristic import RuleBasedOptimizer
+from simulation.config import CAPACITY, DEPTS
+from simulation.hospital import HospitalSimulation
+from simulation.optimizer import array_to_schedule
+from simulation.policy import STATE_FIELDS, BEDS, STAFF, StaffingPolicy, evaluate_policy
+
+HOURS = 72
+LEVELS = [20, 8, 15, 26]
+
+class Recorder(StaffingPolicy):
+    """Keeps every call; optionally returns fixed levels."""
+    def __init__(self, levels=None):
+        self.levels = levels
+        self.resets = 0
+        self.calls = []
+
+    def reset(self):
+        self.resets += 1
+        self.calls = []
+
+    def __call__(self, hour, state, scheduled):
+        self.calls.append((hour, state.copy(), list(scheduled), state.flags.writeable))
+        return self.levels
+
+def test_policy_sees_a_read_only_snapshot_every_hour():
+    policy = Recorder()
+    cost = HospitalSimulation(duration_hours=HOURS, seed=6, policy=policy).run()
+    assert cost == HospitalSimulation(duration_hours=HOURS, seed=6).run() # None keeps the schedule
+    assert policy.resets == 1
+    assert [hour for hour, *_ in policy.calls] == list(range(HOURS))
+    for hour, state, scheduled, writeable in policy.calls:
+        assert state.shape == (len(DEPTS), len(STATE_FIELDS)) and not writeable
+        assert state[:, BEDS].tolist() == [CAPACITY[d] for d in DEPTS]
+    # Staff column shows the level applied the hour before
+    assert policy.calls[1][1][:, STAFF].tolist() == policy.calls[0][2]
+
+def test_policy_levels_replace_the_schedule():
+    fixed = HospitalSimulation(duration_hours=HOURS, seed=6, staffing_schedule=array_to_schedule(np.tile(LEVELS, (24, 1))))
+    as_list = HospitalSimulation(duration_hours=HOURS, seed=6, policy=Recorder(LEVELS))
+    as_dict = HospitalSimulation(duration_hours=HOURS, seed=6, policy=Recorder(dict(zip(DEPTS, LEVELS))))
+    assert as_list.run() == as_dict.run() == fixed.run()
+    assert as_list.total_staff_hourly_cost == fixed.total_staff_hourly_cost > 0
+
+def test_evaluate_policy_uses_common_random_numbers():
+    first = evaluate_policy(RuleBasedOptimizer(), replications=6, seed=2, duration_hours=HOURS)
+    assert first.shape == (6,)
+    np.testing.assert_array_equal(first, evaluate_policy(RuleBasedOptimizer(), replications=6, seed=2,
+                                                         duration_hours=HOURS, n_workers=2))
+    plain = [HospitalSimulation(duration_hours=HOURS, seed=(2, r)).run() for r in range(6)]
+    np.testing.assert_array_equal(evaluate_policy(None, replications=6, seed=2, duration_hours=HOURS), plain)
+
+def test_heuristic_hires_on_long_queues_and_resets():
+    policy = RuleBasedOptimizer()
+    state = np.zeros((len(DEPTS), len(STATE_FIELDS)))
+    state[0, 0] = 25 # ER surge
+    state[2, 0] = 6 # CriticalCare over its threshold
+    levels = policy(0, state, [18, 6, 13, 24])
+    assert levels == [23, 6, 14, 24]
+    quiet = np.zeros_like(state)
+    quiet[:, STAFF] = [23, 6, 14, 24]
+    assert policy(1, quiet, [18, 6, 13, 24]) == [22, 6, 13, 24] # Idle temps are let go one at a time
+    policy.reset()
+    assert policy.extra_staff == dict.fromkeys(DEPTS, 0)
+
+def test_heuristic_cuts_cost_of_an_understaffed_schedule():
+    schedule = array_to_schedule(np.tile([14, 4, 9, 18], (24, 1)))
+    without = evaluate_policy(None, replications=20, seed=1, duration_hours=HOURS, staffing_schedule=schedule)
+    with_policy = evaluate_policy(RuleBasedOptimizer(), replications=20, seed=1, duration_hours=HOURS,
+                                  staffing_schedule=schedule)
+    assert with_policy.mean() < without.mean()
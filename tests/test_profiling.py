@@ -0,0 +1,46 @@
+import json
+import pytest
+from simulation.hospital import HospitalSimulation
+from simulation.profiling import SimulationProfiler, TRACE_US_PER_HOUR
+
+HOURS = 48
+
+def _profiled(trace=False):
+    profiler = SimulationProfiler(trace=trace)
+    cost = HospitalSimulation(duration_hours=HOURS, seed=2, profiler=profiler).run()
+    return profiler, cost
+
+def test_profiling_does_not_change_the_run():
+    profiler, cost = _profiled(trace=True)
+    assert cost == HospitalSimulation(duration_hours=HOURS, seed=2).run()
+
+def test_flat_profile_counts_process_types():
+    profiler, _ = _profiled()
+    rows = {r['process']: r for r in profiler.flat_profile()}
+    for name in ('handle_er_arrival', 'transfer_patient', 'transfer_manager', 'random_event_manager',
+                 'hourly_staff_manager'):
+        assert rows[name]['started'] >= 1 and rows[name]['events'] >= 1
+    assert rows['event_blocker']['events'] >= 1 # Staff leave, counted without a process
+    # One resume per event yielded, plus the final one for finished processes
+    for r in rows.values():
+        if r['started']:
+            assert r['resumes'] == r['events'] + r['finished']
+    assert sum(r['share'] for r in rows.values()) == pytest.approx(1.0)
+    walls = [r['wall_time'] for r in profiler.flat_profile()]
+    assert walls == sorted(walls, reverse=True)
+    assert 'handle_er_arrival' in profiler.format_flat_profile()
+    assert all(len(depths) == HOURS for depths in profiler.queue_depths.values())
+
+def test_chrome_trace_pairs_spans_and_samples_queues(tmp_path):
+    profiler, _ = _profiled(trace=True)
+    path = tmp_path / 'trace.json'
+    profiler.write_chrome_trace(str(path))
+    events = json.loads(path.read_text())['traceEvents']
+    begins = {e['id']: e for e in events if e['ph'] == 'b'}
+    ends = {e['id']: e for e in events if e['ph'] == 'e'}
+    assert begins and begins.keys() == ends.keys()
+    assert all(begins[i]['ts'] <= ends[i]['ts'] <= HOURS * TRACE_US_PER_HOUR for i in begins)
+    counters = [e for e in events if e['ph'] == 'C']
+    assert len(counters) == HOURS and set(counters[0]['args']) == {'ER', 'Surgery', 'CriticalCare', 'StepDown'}
+    names = {e['args']['name'] for e in events if e['ph'] == 'M'}
+    assert {'handle_er_arrival', 'transfer_patient'} <= names
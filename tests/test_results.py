@@ -0,0 +1,82 @@
+import json
+import os
+import numpy as np
+import pytest
+from simulation.batch import BatchHospitalSimulation
+from simulation.hospital import HospitalSimulation
+from simulation.results import COLUMNS, COST_COLUMNS, RESULTS_VERSION, ResultsStore, cost_breakdown
+
+def _chunk_dirs(path):
+    return sorted(d for d in os.listdir(path) if d.startswith('chunk-'))
+
+def test_round_trip_across_chunks_and_reopen(tmp_path):
+    path = str(tmp_path / 'store')
+    costs = np.arange(70 * len(COST_COLUMNS), dtype=float).reshape(70, len(COST_COLUMNS))
+    with ResultsStore(path, chunk_rows=32) as store:
+        store.append(costs[:50], schedule='a', scenario='base', seed=7)
+        store.append(costs[50:], schedule='b', seed=8)
+        # Reads see the buffered rows without writing them
+        np.testing.assert_array_equal(store.column('total'), costs[:, -1])
+        assert len(_chunk_dirs(path)) == 2
+        assert len(store.to_frame()) == 70
+    assert len(_chunk_dirs(path)) == 3
+
+    with ResultsStore(path, chunk_rows=32) as store:
+        store.append(costs[:5], schedule='a', scenario='stress')
+        df = store.to_frame()
+    assert len(df) == 75
+    np.testing.assert_array_equal(df[list(COST_COLUMNS)].to_numpy(), np.concatenate([costs, costs[:5]]))
+    assert list(df['schedule'][[0, 50, 70]]) == ['a', 'b', 'a']
+    assert list(df['scenario'][[0, 50, 70]]) == ['base', '', 'stress']
+    np.testing.assert_array_equal(df['replication'][:52], np.r_[np.arange(50), 0, 1])
+
+def test_breakdown_adds_up():
+    sim = BatchHospitalSimulation(20, seed=3)
+    sim.run()
+    costs = cost_breakdown(sim)
+    np.testing.assert_allclose(costs[:, :-1].sum(axis=1), costs[:, -1])
+
+def test_simpy_breakdown_matches_run_cost():
+    sim = HospitalSimulation(duration_hours=72, seed=2)
+    cost = sim.run()
+    costs = cost_breakdown(sim)
+    assert costs.shape == (len(COST_COLUMNS),) and costs[-1] == cost
+    assert costs[:-1].sum() == pytest.approx(cost)
+
+def test_schema_on_disk(tmp_path):
+    path = str(tmp_path / 'store')
+    with ResultsStore(path) as store:
+        store.append(np.ones((3, len(COST_COLUMNS))), schedule='ga', scenario='surge', seed=11)
+        store.append(np.ones(len(COST_COLUMNS)), schedule='baseline', replication=4)
+    with open(os.path.join(path, 'manifest.json')) as f:
+        meta = json.load(f)
+    assert meta['version'] == RESULTS_VERSION and meta['columns'] == list(COLUMNS)
+    assert meta['chunks'] == [4]
+    assert meta['categories'] == {'schedule': ['ga', 'baseline'], 'scenario': ['surge', '']}
+    chunk = os.path.join(path, _chunk_dirs(path)[0])
+    assert sorted(os.listdir(chunk)) == sorted(f"{name}.npy" for name in COLUMNS)
+    dtypes = {name: np.load(os.path.join(chunk, f"{name}.npy")).dtype for name in COLUMNS}
+    assert dtypes['schedule'] == dtypes['scenario'] == np.int32
+    assert dtypes['seed'] == dtypes['replication'] == np.int64
+    assert all(dtypes[name] == np.float64 for name in COST_COLUMNS)
+
+    df = ResultsStore(path).to_frame(['schedule', 'seed', 'replication', 'total'])
+    assert list(df.columns) == ['schedule', 'seed', 'replication', 'total']
+    assert list(df['schedule'].cat.categories) == ['ga', 'baseline']
+    assert df['seed'].tolist() == [11, 11, 11, 0] and df['replication'].tolist() == [0, 1, 2, 4]
+
+def test_store_rejects_bad_input(tmp_path):
+    path = str(tmp_path / 'store')
+    store = ResultsStore(path)
+    with pytest.raises(ValueError, match='cost columns'):
+        store.append(np.ones((2, 3)), schedule='a')
+    assert len(store) == 0 and list(store.to_frame().columns) == list(COLUMNS)
+    store.append(np.ones(len(COST_COLUMNS)), schedule='a')
+    store.close()
+    manifest = os.path.join(path, 'manifest.json')
+    with open(manifest) as f:
+        meta = json.load(f)
+    with open(manifest, 'w') as f:
+        json.dump(dict(meta, version=RESULTS_VERSION + 1), f)
+    with pytest.raises(ValueError, match='version'):
+        ResultsStore(path)
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+from simulation.optimizer import (StaffingOptimizer, array_to_schedule, baseline_array, decode_schedule,
+                                  encode_schedule, schedule_to_array)
+
+def _population(size, seed=0):
+    return StaffingOptimizer(seed=seed).generate_random_population(size)
+
+def test_schedule_round_trips_between_dict_array_and_bytes():
+    grid = _population(1)[0]
+    schedule = array_to_schedule(grid)
+    assert schedule[5]['Surgery'] == grid[5, 1]
+    np.testing.assert_array_equal(schedule_to_array(schedule), grid)
+    assert decode_schedule(encode_schedule(grid)) == schedule
+    assert len(encode_schedule(schedule)) == 24 * 4 * 2
+
+@pytest.mark.parametrize('engine', ['simpy', 'batch'])
+def test_evaluate_population_scores_every_schedule(engine):
+    population = _population(6)
+    population[3] = population[1]
+    costs = StaffingOptimizer(seed=2, crn=True, engine=engine).evaluate_population(population, 3)
+    assert costs.shape == (6,)
+    # Common random numbers: a repeated schedule gets the same cost
+    assert costs[3] == costs[1]
+    expected = StaffingOptimizer(seed=2, crn=True, engine=engine).evaluate_many(list(population), 3)
+    np.testing.assert_allclose(costs, expected)
+
+def test_crossover_and_mutate_work_on_whole_populations():
+    opt = StaffingOptimizer(seed=1, mutation_rate=0.5)
+    first, second = _population(10, seed=1), _population(10, seed=2)
+    children = opt.crossover(first, second)
+    assert children.shape == first.shape
+    assert np.all((children == first) | (children == second))
+
+    mutated = opt.mutate(children)
+    diff = mutated - children
+    assert mutated.shape == children.shape and mutated.min() >= 1
+    # At most one department moves by one staff member per mutated hour
+    assert np.abs(diff).max() <= 1
+    assert np.count_nonzero(diff, axis=-1).max() <= 1
+    assert np.count_nonzero(diff) > 0
+
+def test_random_population_varies_around_baseline():
+    population = _population(50)
+    assert population.shape == (50, 24, 4) and population.dtype == np.int64
+    offsets = population - baseline_array()[None]
+    assert population.min() >= 1 and offsets.max() <= 4
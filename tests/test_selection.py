@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+from simulation.selection import ocba_allocation, probability_correct_selection, race
+
+TRUE_MEANS = [10.0, 12.0, 30.0]
+
+def _simulator(seed):
+    rng = np.random.default_rng(seed)
+    calls = []
+    def simulate(counts):
+        calls.append(list(counts))
+        return [list(rng.normal(m, 3.0, size=c)) for m, c in zip(TRUE_MEANS, counts)]
+    return simulate, calls
+
+def test_race_finds_best_and_reports_python_ints():
+    simulate, calls = _simulator(0)
+    result = race(simulate, len(TRUE_MEANS), n0=5, confidence=0.99, max_total=200)
+    assert result.best == 0
+    assert result.pcs >= 0.99 or result.total == 200
+    assert all(type(c) is int for counts in calls for c in counts)
+    assert type(result.total) is int
+    assert result.total == sum(len(s) for s in result.samples) == sum(result.counts)
+    # The hopeless candidate gets no more than its initial replications
+    assert result.counts[2] == 5
+
+def test_ocba_gives_close_competitors_most_replications():
+    shares = ocba_allocation(TRUE_MEANS, [9.0, 9.0, 9.0], 100)
+    assert shares.sum() == pytest.approx(100)
+    assert shares[2] < shares[1] < shares[0]
+
+def test_probability_correct_selection_grows_with_replications():
+    few = probability_correct_selection([10, 12], [9, 9], [2, 2])
+    many = probability_correct_selection([10, 12], [9, 9], [50, 50])
+    assert 0 <= few < many <= 1
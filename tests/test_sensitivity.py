@@ -0,0 +1,15 @@
+import numpy as np
+import pytest
+from simulation.config import DEPTS
+from simulation.sensitivity import run_sensitivity, scenario_grid
+
+@pytest.mark.parametrize('engine', ['simpy', 'batch'])
+def test_extra_staff_override_changes_cost(engine):
+    # Staffed 22 above the 61 regular staff every hour
+    schedule = np.tile([25, 10, 18, 30], (24, 1))
+    scenarios = scenario_grid(costs={'cheap': {d: {'ExtraStaff': 40} for d in DEPTS},
+                                     'dear': {d: {'ExtraStaff': 200} for d in DEPTS}})
+    result = run_sensitivity({'over': schedule}, scenarios, replications=3, seed=1, engine=engine)
+    cheap, dear = result.set_index('costs')['mean'][['cheap', 'dear']]
+    # 22 temps for 24 hours plus 22 setup hours, at 160 more per hour
+    assert dear - cheap == pytest.approx(22 * 25 * 160)
@@ -0,0 +1,17 @@
+import numpy as np
+import pytest
+from simulation.steady_state import drift, steady_state_cost
+
+def test_drift_flags_trends_and_autocorrelation():
+    noise = np.random.default_rng(0).normal(size=10)
+    assert drift(noise) is None
+    assert 'trend' in drift(noise + np.arange(10))
+    # Slow swing without a net trend
+    assert 'autocorrelation' in drift([0, 1, 2, 3, 3, 3, 3, 2, 1, 0])
+
+def test_steady_state_cost_rejects_growing_queues():
+    # At the default arrival rates the queues grow without bound
+    with pytest.raises(RuntimeError, match='not stationary'):
+        steady_state_cost(days=30, warmup_days=5, n_batches=5, seed=2, engine='batch', on_drift='raise')
+    with pytest.warns(RuntimeWarning):
+        steady_state_cost(days=30, warmup_days=5, n_batches=5, seed=2, engine='batch')
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+from simulation.cache import FitnessCache
+from simulation.optimizer import StaffingOptimizer, baseline_array
+from simulation.surrogate import SurrogateModel, spearman
+
+def _population(size, seed):
+    return StaffingOptimizer(seed=seed).generate_random_population(size)
+
+def _true_cost(grids):
+    # Short-staffing is dear, extra staff cheap
+    offsets = grids - baseline_array()[None]
+    return 50.0 * np.maximum(0, -offsets).sum(axis=(1, 2)) + 5.0 * np.maximum(0, offsets).sum(axis=(1, 2)) + 100.0
+
+def test_spearman_handles_ties_and_degenerate_input():
+    assert spearman([1, 2, 3, 4], [10, 20, 30, 40]) == pytest.approx(1.0)
+    assert spearman([1, 2, 3, 4], [4, 3, 2, 1]) == pytest.approx(-1.0)
+    assert spearman([0, 0, 0, 1], [0, 0, 0, 5]) == pytest.approx(1.0)
+    assert spearman([1, 2], [1, 2]) is None
+    assert spearman([1, 1, 1], [1, 2, 3]) is None
+
+def test_surrogate_learns_to_rank_schedules():
+    model = SurrogateModel(baseline_array(), min_samples=20)
+    with pytest.raises(RuntimeError):
+        model.predict(_population(2, seed=0))
+    train = _population(200, seed=1)
+    model.observe(train[:10], _true_cost(train[:10]))
+    assert not model.ready
+    model.observe(train, _true_cost(train))
+    assert model.ready and len(model) == 200
+    test = _population(100, seed=2)
+    assert spearman(model.predict(test), _true_cost(test)) > 0.9
+    keep = model.screen(test, 10)
+    assert len(keep) == 10 and _true_cost(test[keep]).mean() < _true_cost(test).mean()
+
+def test_surrogate_keeps_the_latest_cost_per_schedule():
+    model = SurrogateModel(baseline_array())
+    grid = baseline_array()[None]
+    model.observe(grid, [5.0], refit=False)
+    model.observe(grid, [7.0], refit=False)
+    assert len(model) == 1 and model._observed[grid[0].astype(np.int16).tobytes()] == 7.0
+
+def test_surrogate_reads_the_optimizers_cache_namespace():
+    opt = StaffingOptimizer(seed=1, engine='batch')
+    cache = FitnessCache()
+    grids = _population(3, seed=4)
+    for grid, cost in zip(grids, (10.0, 20.0, 30.0)):
+        cache.update(opt._cache_key(grid), [cost])
+    cache.update(b'other namespace|' + grids[0].astype(np.int16).tobytes(), [99.0])
+    model = SurrogateModel(baseline_array())
+    assert model.observe_cache(cache, opt._cache_namespace()) == 3
+    assert sorted(model._observed.values()) == [10.0, 20.0, 30.0]
+
+def test_optimizer_screens_children_and_reports():
+    opt = StaffingOptimizer(population_size=12, generations=6, iterations=2, validation_iterations=5, seed=3,
+                            engine='batch', crn=True, surrogate=True, surrogate_pool=4)
+    opt.run()
+    report = opt.surrogate_report()
+    assert report['screened_generations'] > 0
+    assert report['simulations_avoided'] == sum(h['avoided'] for h in opt.surrogate_history)
+    assert 0 < report['fraction_avoided'] < 1
+    assert report['rank_correlation'] is not None
+    for h in opt.surrogate_history:
+        assert h['pool'] == 4 * h['simulated']
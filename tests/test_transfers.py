@@ -0,0 +1,40 @@
+import simpy
+from benchmarks.transfer_stress import ScanningSimulation, scaled_params
+from simulation.config import SimulationConfig
+from simulation.department import Department
+from simulation.hospital import HospitalSimulation
+from simulation.patient import Patient
+
+def _admitted(dept, count):
+    patients = [Patient(i, 0.0) for i in range(count)]
+    for p in patients:
+        dept.log_patient_entry(p)
+        dept.admit_patient(p)
+        dept.mark_transfer_ready(p)
+    return patients
+
+def test_transfer_index_hands_out_oldest_patients_first():
+    dept = Department(simpy.Environment(), 'Surgery')
+    patients = _admitted(dept, 5)
+    dept.discharge_patient(patients[1]) # Left by another route: no longer a candidate
+    assert dept.take_transfer_ready(2) == [patients[0], patients[2]]
+    assert dept.take_transfer_ready(10) == [patients[3], patients[4]]
+    assert dept.take_transfer_ready(1) == []
+    assert list(dept.active_patients) == [patients[0], patients[2], patients[3], patients[4]]
+
+def test_index_holds_exactly_the_untriggered_admitted_patients():
+    sim = HospitalSimulation(duration_hours=72, seed=4)
+    sim.run()
+    for dept in sim.departments.values():
+        ready = list(dept.transfer_ready)
+        assert all(p in dept.active_patients and not p.transfer_event.triggered for p in ready)
+        waiting = [p for p in dept.active_patients if p.transfer_event is not None and not p.transfer_event.triggered]
+        assert ready == waiting
+
+def test_indexed_transfers_match_scanning_transfers_at_scale():
+    params = SimulationConfig.from_params(scaled_params(3))
+    for seed in (0, 1):
+        scanned = ScanningSimulation(duration_hours=48, seed=seed, params=params)
+        indexed = HospitalSimulation(duration_hours=48, seed=seed, params=params)
+        assert indexed.run() == scanned.run()
+        assert indexed.total_patients == scanned.total_patients